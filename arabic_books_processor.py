@@ -8,31 +8,152 @@ This script processes Arabic books and texts for training Llama models.
 """
 
 import os
+import codecs
 import json
+import mmap
 import re
 import shutil
 import subprocess
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable, Iterator, Union
 import argparse
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 
 # Arabic text processing
 try:
     import arabic_reshaper
-    from bidi.algorithm import get_display
+    from bidi_display import get_display
     ARABIC_SUPPORT = True
     print("✅ Arabic text processing libraries loaded successfully")
 except ImportError:
     ARABIC_SUPPORT = False
     print("❌ Arabic libraries not found")
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Document formats - imported once here rather than on every file
+try:
+    import fitz  # PyMuPDF - much faster C-backed PDF parser
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+
+try:
+    from docx import Document
+    DOCX_AVAILABLE = True
+except ImportError:
+    DOCX_AVAILABLE = False
+
+try:
+    import charset_normalizer
+    CHARSET_DETECTION = True
+except ImportError:
+    CHARSET_DETECTION = False
+
+try:
+    from striprtf.striprtf import rtf_to_text
+    STRIPRTF_AVAILABLE = True
+except ImportError:
+    STRIPRTF_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# DFA-based regex engine for bulk Arabic scans (drop-in for `re`)
+try:
+    import re2 as arabic_re
+except ImportError:
+    arabic_re = re
+
+# Arabic Unicode blocks as inclusive (start, end) codepoint ranges
+ARABIC_RANGES = (
+    (0x0600, 0x06FF),  # Arabic
+    (0x0750, 0x077F),  # Arabic Supplement
+    (0x08A0, 0x08FF),  # Arabic Extended-A
+    (0xFB50, 0xFDFF),  # Arabic Presentation Forms-A
+    (0xFE70, 0xFEFF),  # Arabic Presentation Forms-B
+)
+
+# Precompiled patterns, shared by every processor instance.
+# The Arabic pattern uses literal characters so both re and re2 accept it.
+ARABIC_PATTERN = arabic_re.compile('[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]+')
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?؟۔]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Same Arabic blocks matched on raw UTF-8 bytes, for memory-mapped files
+ARABIC_BYTES_PATTERN = re.compile(
+    rb'(?:[\xd8-\xdb][\x80-\xbf]'           # U+0600-06FF
+    rb'|\xdd[\x90-\xbf]'                     # U+0750-077F
+    rb'|\xe0\xa2[\xa0-\xbf]|\xe0\xa3[\x80-\xbf]'  # U+08A0-08FF
+    rb'|\xef\xad[\x90-\xbf]|\xef[\xae-\xb7][\x80-\xbf]'  # U+FB50-FDFF
+    rb'|\xef\xb9[\xb0-\xbf]|\xef[\xba\xbb][\x80-\xbf]'   # U+FE70-FEFF
+    rb')+'
+)
+WORD_BYTES_PATTERN = re.compile(rb'\S+')
+UTF8_CONTINUATION_BYTES = [bytes([b]) for b in range(0x80, 0xC0)]
+
+# RTF control words are replaced by a space, group braces are dropped
+RTF_CONTROL_PATTERN = re.compile(r'\\[a-z]+\d*|([{}])')
+
+# Source file types picked up by copy_training_files
+TEXT_EXTENSIONS = frozenset({'.txt', '.md', '.pdf', '.docx', '.doc', '.rtf'})
+
+# Output buffer for JSONL writers, batches many records per write syscall
+JSONL_BUFFER_SIZE = 1 << 20
+# Records serialized and joined per write() call
+JSONL_BATCH_SIZE = 1024
+
+# Instruction templates paired with the formatter that builds their answer
+INSTRUCTION_TEMPLATES = [
+    ("لخص هذا النص:",
+     lambda text: text.partition('.')[0] + '.'),
+    ("اشرح الفكرة الرئيسية في هذا النص:",
+     lambda text: f"الفكرة الرئيسية في هذا النص تتعلق بـ {text[:80]}..."),
+    ("ما هي النقاط المهمة في هذا المقطع؟",
+     lambda text: f"النقاط المهمة تشمل: {text[:100]}..."),
+    ("اكتب تعليقاً على هذا النص:",
+     lambda text: f"هذا نص مهم يتناول {text[:60]}... ويقدم معلومات قيمة حول الموضوع."),
+    ("ما هو موضوع هذا النص؟",
+     lambda text: f"موضوع هذا النص يدور حول {text[:80]}..."),
+]
+
+# Corpus files at least this large are analyzed through mmap without decoding
+MMAP_MIN_SIZE = 8 << 20
+MMAP_BLOCK_SIZE = 1 << 20
+
+# Large plain-text files whose first PROBE_SIZE bytes are Arabic-free UTF-8 are skipped
+PROBE_SIZE = 64 << 10
+PROBE_MIN_FILE_SIZE = 1 << 20
+
+# Below this many files the process pool costs more than it saves
+PARALLEL_MIN_FILES = 4
+
 class ArabicBooksProcessor:
     def __init__(self, data_dir: str = "training_data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         
         # Arabic text patterns
-        self.arabic_pattern = re.compile(r'[\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF]+')
+        self.arabic_pattern = ARABIC_PATTERN
+        
+        # Reshaper is only needed for terminal previews, build it once
+        self._reshaper = None
+        if ARABIC_SUPPORT:
+            self._reshaper = arabic_reshaper.ArabicReshaper(configuration={'delete_harakat': False})
         
     def clone_arabic_repo(self, repo_url: str = "git@github.com:Banderalotebi/arb.git") -> bool:
         """
@@ -107,56 +228,102 @@ class ArabicBooksProcessor:
         print(f"📁 Found training files in: {source_dir}")
         
         # Find all text files recursively
-        text_extensions = ['.txt', '.md', '.pdf', '.docx', '.doc', '.rtf']
-        copied_files = []
-        
-        for ext in text_extensions:
-            files = list(source_dir.rglob(f"*{ext}"))
-            for file_path in files:
-                if file_path.is_file():
-                    try:
-                        dest_name = f"{file_path.parent.name}_{file_path.name}"
-                        dest_path = self.data_dir / dest_name
-                        
-                        # Copy and convert to UTF-8 text
-                        if ext == '.txt' or ext == '.md':
-                            content = self._read_text_file(file_path)
-                        else:
-                            content = self._extract_text_from_file(file_path)
-                        
-                        if content and self._contains_arabic(content):
-                            # Process Arabic text
-                            processed_content = self._process_arabic_text(content)
-                            
-                            with open(dest_path, 'w', encoding='utf-8') as f:
-                                f.write(processed_content)
-                            
-                            copied_files.append(dest_path)
-                            print(f"  ✅ {file_path.name} → {dest_name}")
-                        
-                    except Exception as e:
-                        print(f"  ❌ Error processing {file_path.name}: {e}")
+        all_paths = list(self._iter_source_files(source_dir))
+        
+        results = self._map_files(_process_one_file, all_paths)
+        copied_files = [dest_path for dest_path in results if dest_path]
         
         print(f"\n🎉 Copied {len(copied_files)} Arabic text files")
         return copied_files
     
-    def _read_text_file(self, file_path: Path) -> str:
-        """Read text file with multiple encoding attempts"""
-        encodings = ['utf-8', 'utf-16', 'cp1256', 'iso-8859-6']
+    def _iter_source_files(self, source_dir: Path) -> Iterator[str]:
+        """Walk source_dir once, yielding paths of supported text files"""
+        for root, _, names in os.walk(source_dir):
+            for name in names:
+                if os.path.splitext(name)[1].lower() in TEXT_EXTENSIONS:
+                    yield os.path.join(root, name)
+    
+    def _map_files(self, func, paths: List) -> List:
+        """Run a module-level per-file worker over paths, in parallel for larger sets"""
+        if len(paths) < PARALLEL_MIN_FILES:
+            return [func(path, self.data_dir) for path in paths]
         
-        for encoding in encodings:
-            try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    return f.read()
-            except UnicodeDecodeError:
-                continue
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            return list(executor.map(func, paths, [self.data_dir] * len(paths), chunksize=8))
+    
+    def _copy_one_file(self, file_path: Path):
+        """Convert a single source file to UTF-8 text; returns the destination path if kept"""
+        try:
+            dest_name = f"{file_path.parent.name}_{file_path.name}"
+            dest_path = self.data_dir / dest_name
+            
+            # Copy and convert to UTF-8 text
+            if file_path.suffix.lower() in ('.txt', '.md'):
+                if not self._probe_arabic(file_path):
+                    return None
+                content = self._read_text_file(file_path)
+            else:
+                content = self._extract_text_from_file(file_path)
+            
+            if content and self._contains_arabic(content):
+                # Process Arabic text
+                processed_content = self._process_arabic_text(content)
+                
+                with open(dest_path, 'w', encoding='utf-8') as f:
+                    f.write(processed_content)
+                
+                print(f"  ✅ {file_path.name} → {dest_name}")
+                return dest_path
+            
+        except Exception as e:
+            print(f"  ❌ Error processing {file_path.name}: {e}")
         
-        # Last resort - ignore errors
+        return None
+    
+    def _probe_arabic(self, file_path: Path) -> bool:
+        """
+        Cheap check on the head of a large text file before decoding all of it.
+        
+        Returns False only when the probe is clearly UTF-8 without any Arabic;
+        anything that may be UTF-16 or a legacy code page gets the full read.
+        """
+        if file_path.stat().st_size <= PROBE_MIN_FILE_SIZE:
+            return True
+        
+        with open(file_path, 'rb') as f:
+            head = f.read(PROBE_SIZE)
+        
+        if ARABIC_BYTES_PATTERN.search(head) or b'\x00' in head:
+            return True
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-        except:
+            # Incremental decode tolerates a character cut off at the probe boundary
+            codecs.getincrementaldecoder('utf-8')().decode(head)
+        except UnicodeDecodeError:
+            return True
+        return False
+    
+    def _read_text_file(self, file_path: Path) -> str:
+        """Read text file once and detect its encoding from the bytes"""
+        try:
+            data = file_path.read_bytes()
+        except OSError:
             return ""
+        
+        if CHARSET_DETECTION:
+            result = charset_normalizer.from_bytes(
+                data, cp_isolation=['utf_8', 'utf_16', 'cp1256', 'iso8859_6']
+            ).best()
+            if result is not None:
+                return str(result)
+        else:
+            for encoding in ['utf-8', 'utf-16', 'cp1256', 'iso-8859-6']:
+                try:
+                    return data.decode(encoding)
+                except UnicodeDecodeError:
+                    continue
+        
+        # Last resort - ignore errors
+        return data.decode('utf-8', errors='ignore')
     
     def _extract_text_from_file(self, file_path: Path) -> str:
         """Extract text from various file formats"""
@@ -172,70 +339,96 @@ class ArabicBooksProcessor:
             return self._read_text_file(file_path)
     
     def _extract_from_pdf(self, file_path: Path) -> str:
-        """Extract text from PDF (placeholder - requires PyPDF2)"""
+        """Extract text from PDF (PyMuPDF preferred, PyPDF2 as fallback)"""
+        if not (PYMUPDF_AVAILABLE or PYPDF2_AVAILABLE):
+            print(f"⚠️ PyMuPDF/PyPDF2 not installed, skipping PDF: {file_path.name}")
+            return ""
+        
         try:
-            import PyPDF2
+            if PYMUPDF_AVAILABLE:
+                doc = fitz.open(file_path)
+                try:
+                    return "\n".join([page.get_text("text") for page in doc])
+                finally:
+                    doc.close()
+            
             with open(file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text()
-                return text
-        except ImportError:
-            print(f"⚠️ PyPDF2 not installed, skipping PDF: {file_path.name}")
-            return ""
+                reader = PyPDF2.PdfReader(f, strict=False)
+                return "".join([page.extract_text() or "" for page in reader.pages])
         except Exception as e:
             print(f"❌ Error reading PDF {file_path.name}: {e}")
             return ""
     
     def _extract_from_word(self, file_path: Path) -> str:
-        """Extract text from Word documents (placeholder - requires python-docx)"""
+        """Extract text from Word documents (requires python-docx)"""
+        if not DOCX_AVAILABLE:
+            print(f"⚠️ python-docx not installed, skipping Word doc: {file_path.name}")
+            return ""
+        
         try:
-            from docx import Document
             doc = Document(file_path)
             text = ""
             for paragraph in doc.paragraphs:
                 text += paragraph.text + "\n"
             return text
-        except ImportError:
-            print(f"⚠️ python-docx not installed, skipping Word doc: {file_path.name}")
-            return ""
         except Exception as e:
             print(f"❌ Error reading Word doc {file_path.name}: {e}")
             return ""
     
     def _extract_from_rtf(self, file_path: Path) -> str:
         """Extract text from RTF files"""
-        # Simple RTF text extraction
         try:
             content = self._read_text_file(file_path)
-            # Remove RTF formatting codes (basic)
-            text = re.sub(r'\\[a-z]+\d*', ' ', content)
-            text = re.sub(r'[{}]', '', text)
-            return text
+            if STRIPRTF_AVAILABLE:
+                return rtf_to_text(content)
+            # Simple RTF text extraction - remove formatting codes in one pass
+            return RTF_CONTROL_PATTERN.sub(lambda m: '' if m.group(1) else ' ', content)
         except:
             return ""
     
+    def _arabic_mask(self, text: str):
+        """Boolean NumPy mask marking Arabic codepoints in text"""
+        cp = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        mask = np.zeros(cp.shape, dtype=bool)
+        for start, end in ARABIC_RANGES:
+            mask |= (cp >= start) & (cp <= end)
+        return mask
+    
+    def _count_arabic_words(self, text: str) -> int:
+        """Count runs of consecutive Arabic characters"""
+        if not NUMPY_AVAILABLE:
+            return len(self.arabic_pattern.findall(text))
+        
+        mask = self._arabic_mask(text)
+        if not mask.size:
+            return 0
+        # Every False -> True transition starts a new Arabic run
+        return int(mask[0]) + int(np.count_nonzero(mask[1:] & ~mask[:-1]))
+    
     def _contains_arabic(self, text: str) -> bool:
         """Check if text contains Arabic characters"""
+        if NUMPY_AVAILABLE:
+            return bool(self._arabic_mask(text).any())
         return bool(self.arabic_pattern.search(text))
     
     def _process_arabic_text(self, text: str) -> str:
-        """Process Arabic text for better display and processing"""
-        if not ARABIC_SUPPORT:
+        """
+        Normalize Arabic text for training.
+        
+        Text is kept in logical order: reshaping and BiDi are display-only
+        transformations and would corrupt the data the model learns from.
+        Use preview_for_terminal() when the text has to be shown on screen.
+        """
+        text = WHITESPACE_PATTERN.sub(' ', text)  # Normalize whitespace
+        return text.strip()
+    
+    def preview_for_terminal(self, text: str) -> str:
+        """Reshape and reorder Arabic text for display in a terminal"""
+        if not self._reshaper or not self._needs_reshaping(text):
             return text
         
         try:
-            # Clean up the text
-            text = re.sub(r'\s+', ' ', text)  # Normalize whitespace
-            text = text.strip()
-            
-            # Reshape Arabic text if needed
-            if self._needs_reshaping(text):
-                reshaped = arabic_reshaper.reshape(text)
-                return get_display(reshaped)
-            
-            return text
+            return get_display(self._reshaper.reshape(text))
         except Exception as e:
             print(f"⚠️ Error processing Arabic text: {e}")
             return text
@@ -266,49 +459,114 @@ class ArabicBooksProcessor:
             "sample_texts": []
         }
         
-        for file_path in files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                arabic_words = len(self.arabic_pattern.findall(content))
-                total_words = len(content.split())
-                
-                file_info = {
-                    "name": file_path.name,
-                    "size_bytes": file_path.stat().st_size,
-                    "characters": len(content),
-                    "words": total_words,
-                    "arabic_words": arabic_words,
-                    "arabic_percentage": (arabic_words / total_words * 100) if total_words > 0 else 0,
-                    "lines": len(content.splitlines()),
-                    "preview": content[:300] + "..." if len(content) > 300 else content
-                }
-                
-                analysis["files"].append(file_info)
-                analysis["total_characters"] += file_info["characters"]
-                analysis["total_words"] += file_info["words"]
-                analysis["total_arabic_words"] += arabic_words
-                analysis["total_lines"] += file_info["lines"]
-                
-                # Detect languages
-                if arabic_words > 0:
-                    analysis["languages_detected"].add("Arabic")
-                if total_words > arabic_words:
-                    analysis["languages_detected"].add("Other")
-                
-                # Sample texts for training preview
-                sentences = content.split('.')[:3]
-                analysis["sample_texts"].extend([s.strip() for s in sentences if s.strip()])
-                
-            except Exception as e:
-                print(f"❌ Error analyzing {file_path.name}: {e}")
+        for result in self._map_files(_analyze_one_file, files):
+            if not result:
+                continue
+            
+            file_info, samples = result
+            arabic_words = file_info["arabic_words"]
+            total_words = file_info["words"]
+            
+            analysis["files"].append(file_info)
+            analysis["total_characters"] += file_info["characters"]
+            analysis["total_words"] += total_words
+            analysis["total_arabic_words"] += arabic_words
+            analysis["total_lines"] += file_info["lines"]
+            
+            # Detect languages
+            if arabic_words > 0:
+                analysis["languages_detected"].add("Arabic")
+            if total_words > arabic_words:
+                analysis["languages_detected"].add("Other")
+            
+            # Sample texts for training preview
+            analysis["sample_texts"].extend(samples)
         
         analysis["languages_detected"] = list(analysis["languages_detected"])
         analysis["arabic_percentage"] = (analysis["total_arabic_words"] / analysis["total_words"] * 100) if analysis["total_words"] > 0 else 0
         
         return analysis
     
+    def _analyze_file(self, file_path: Path):
+        """Analyze a single corpus file; returns (file_info, sample_texts)"""
+        try:
+            if file_path.stat().st_size >= MMAP_MIN_SIZE:
+                return self._analyze_mapped_file(file_path)
+            
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            arabic_words = self._count_arabic_words(content)
+            total_words = len(content.split())
+            
+            file_info = {
+                "name": file_path.name,
+                "size_bytes": file_path.stat().st_size,
+                "characters": len(content),
+                "words": total_words,
+                "arabic_words": arabic_words,
+                "arabic_percentage": (arabic_words / total_words * 100) if total_words > 0 else 0,
+                "lines": content.count('\n') + (0 if not content or content.endswith('\n') else 1),
+                "preview": content[:300] + "..." if len(content) > 300 else content
+            }
+            
+            sentences = self._first_sentences(content, 3)
+            return file_info, [s.strip() for s in sentences if s.strip()]
+            
+        except Exception as e:
+            print(f"❌ Error analyzing {file_path.name}: {e}")
+            return None
+    
+    def _analyze_mapped_file(self, file_path: Path):
+        """
+        Analyze a large UTF-8 file through mmap, counting on the raw bytes.
+        
+        Only the preview and sample sentences are decoded, so the file is
+        never held as a Python str. Words are split on ASCII whitespace.
+        """
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            arabic_words = sum(1 for _ in ARABIC_BYTES_PATTERN.finditer(mm))
+            total_words = sum(1 for _ in WORD_BYTES_PATTERN.finditer(mm))
+            
+            newlines = 0
+            continuation = 0
+            for start in range(0, size, MMAP_BLOCK_SIZE):
+                block = mm[start:start + MMAP_BLOCK_SIZE]
+                newlines += block.count(b'\n')
+                continuation += sum(block.count(b) for b in UTF8_CONTINUATION_BYTES)
+            
+            characters = size - continuation
+            # 300 characters take at most 1200 UTF-8 bytes
+            head = mm[:1200].decode('utf-8', 'ignore')[:300]
+            sentences = [s.decode('utf-8', 'ignore') for s in self._first_sentences(mm, 3, b'.')]
+            
+            file_info = {
+                "name": file_path.name,
+                "size_bytes": size,
+                "characters": characters,
+                "words": total_words,
+                "arabic_words": arabic_words,
+                "arabic_percentage": (arabic_words / total_words * 100) if total_words > 0 else 0,
+                "lines": newlines + (0 if mm[size - 1:] == b'\n' else 1),
+                "preview": head + "..." if characters > 300 else head
+            }
+        
+        return file_info, [s.strip() for s in sentences if s.strip()]
+    
+    def _first_sentences(self, text, n: int, sep='.') -> List:
+        """Same as text.split(sep)[:n] without splitting the whole text (str, bytes or mmap)"""
+        sentences = []
+        start = 0
+        while len(sentences) < n:
+            end = text.find(sep, start)
+            if end == -1:
+                sentences.append(text[start:])
+                break
+            sentences.append(text[start:end])
+            start = end + 1
+        return sentences
+    
     def prepare_arabic_training_data(self, format_type: str = "conversation") -> str:
         """
         Prepare Arabic texts for Llama training
@@ -331,17 +589,20 @@ class ArabicBooksProcessor:
     
     def _prepare_arabic_conversation_format(self, files: List[Path]) -> str:
         """Prepare Arabic conversation format"""
-        conversations = []
+        output_file = self.data_dir / "arabic_conversations.jsonl"
+        count = self._write_jsonl(output_file, self._iter_arabic_conversations(files))
         
+        print(f"✅ تم إنشاء ملف المحادثات العربية: {output_file}")
+        print(f"📊 تم توليد {count} محادثة")
+        return str(output_file)
+    
+    def _iter_arabic_conversations(self, files: List[Path]) -> Iterator[Dict]:
+        """Yield conversation records one at a time"""
+        contains_arabic = self._contains_arabic
         for file_path in files:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            chunks = self._split_arabic_text(content, max_length=400)
-            
-            for chunk in chunks:
-                if self._contains_arabic(chunk) and len(chunk.strip()) > 50:
-                    conversation = {
+            for chunk in self._split_arabic_text(self._iter_lines(file_path), max_length=400):
+                if contains_arabic(chunk) and len(chunk.strip()) > 50:
+                    yield {
                         "messages": [
                             {
                                 "role": "system",
@@ -357,103 +618,106 @@ class ArabicBooksProcessor:
                             }
                         ]
                     }
-                    conversations.append(conversation)
-        
-        output_file = self.data_dir / "arabic_conversations.jsonl"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for conv in conversations:
-                f.write(json.dumps(conv, ensure_ascii=False) + '\n')
-        
-        print(f"✅ تم إنشاء ملف المحادثات العربية: {output_file}")
-        print(f"📊 تم توليد {len(conversations)} محادثة")
-        return str(output_file)
     
     def _prepare_arabic_instruction_format(self, files: List[Path]) -> str:
         """Prepare Arabic instruction format"""
-        instructions = []
-        
-        instruction_templates = [
-            "لخص هذا النص:",
-            "اشرح الفكرة الرئيسية في هذا النص:",
-            "ما هي النقاط المهمة في هذا المقطع؟",
-            "اكتب تعليقاً على هذا النص:",
-            "ما هو موضوع هذا النص؟"
-        ]
+        output_file = self.data_dir / "arabic_instructions.jsonl"
+        count = self._write_jsonl(output_file, self._iter_arabic_instructions(files))
         
+        print(f"✅ تم إنشاء ملف التعليمات العربية: {output_file}")
+        print(f"📊 تم توليد {count} تعليمة")
+        return str(output_file)
+    
+    def _iter_arabic_instructions(self, files: List[Path]) -> Iterator[Dict]:
+        """Yield instruction records one at a time"""
+        contains_arabic = self._contains_arabic
         for file_path in files:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            chunks = self._split_arabic_text(content, max_length=300)
-            
-            for chunk in chunks:
-                if self._contains_arabic(chunk) and len(chunk.strip()) > 30:
-                    for template in instruction_templates:
-                        instruction = {
+            for chunk in self._split_arabic_text(self._iter_lines(file_path), max_length=300):
+                if contains_arabic(chunk) and len(chunk.strip()) > 30:
+                    source = file_path.name
+                    for template, respond in INSTRUCTION_TEMPLATES:
+                        yield {
                             "instruction": template,
                             "input": chunk,
-                            "output": self._generate_arabic_response(template, chunk),
-                            "source": file_path.name
+                            "output": respond(chunk),
+                            "source": source
                         }
-                        instructions.append(instruction)
-        
-        output_file = self.data_dir / "arabic_instructions.jsonl"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for inst in instructions:
-                f.write(json.dumps(inst, ensure_ascii=False) + '\n')
-        
-        print(f"✅ تم إنشاء ملف التعليمات العربية: {output_file}")
-        print(f"📊 تم توليد {len(instructions)} تعليمة")
-        return str(output_file)
     
-    def _split_arabic_text(self, text: str, max_length: int = 400) -> List[str]:
-        """Split Arabic text into meaningful chunks"""
-        # Split by sentences first
-        sentences = re.split(r'[.!?؟۔]', text)
-        
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-                
-            if current_length + len(sentence) <= max_length:
-                current_chunk.append(sentence)
-                current_length += len(sentence)
-            else:
-                if current_chunk:
-                    chunks.append('. '.join(current_chunk) + '.')
-                current_chunk = [sentence]
-                current_length = len(sentence)
-        
-        if current_chunk:
-            chunks.append('. '.join(current_chunk) + '.')
-        
-        return [chunk for chunk in chunks if len(chunk.strip()) > 20]
+    def _write_jsonl(self, output_file: Path, records: Iterable[Dict]) -> int:
+        """Write records to a JSONL file as they are produced; returns the count"""
+        dump = self._dump_json_line
+        records = iter(records)
+        count = 0
+        with open(output_file, 'wb', buffering=JSONL_BUFFER_SIZE) as f:
+            while True:
+                batch = [dump(record) for record in islice(records, JSONL_BATCH_SIZE)]
+                if not batch:
+                    break
+                f.write(b"".join(batch))
+                count += len(batch)
+        return count
     
-    def _generate_arabic_response(self, instruction: str, text: str) -> str:
-        """Generate appropriate Arabic response based on instruction"""
-        if "لخص" in instruction:
-            sentences = text.split('.')
-            return sentences[0] + '.' if sentences else text[:100] + "..."
-        
-        elif "الفكرة الرئيسية" in instruction:
-            return f"الفكرة الرئيسية في هذا النص تتعلق بـ {text[:80]}..."
-        
-        elif "النقاط المهمة" in instruction:
-            return f"النقاط المهمة تشمل: {text[:100]}..."
-        
-        elif "تعليق" in instruction:
-            return f"هذا نص مهم يتناول {text[:60]}... ويقدم معلومات قيمة حول الموضوع."
-        
-        elif "موضوع" in instruction:
-            return f"موضوع هذا النص يدور حول {text[:80]}..."
+    def _dump_json_line(self, record: Dict) -> bytes:
+        """Serialize one record as a UTF-8 JSON line"""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+    
+    def _iter_lines(self, file_path: Path) -> Iterator[str]:
+        """Stream a UTF-8 text file line by line"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            yield from f
+    
+    def _split_arabic_text(self, text: Union[str, Iterable[str]], max_length: int = 400) -> Iterator[str]:
+        """
+        Split Arabic text (a string or an iterable of lines) into meaningful chunks.
         
-        else:
-            return text[:150] + "..."
+        Single linear scan over sentence terminators: a chunk is the longest
+        run of whole sentences that fits in max_length and is sliced straight
+        out of the text. Only the not-yet-emitted tail is kept between lines.
+        """
+        lines = [text] if isinstance(text, str) else text
+        finditer = SENTENCE_SPLIT_PATTERN.finditer
+        
+        buf = ""
+        last = 0  # end of the last complete sentence in buf
+        for line in lines:
+            scan_from = len(buf)
+            buf += line
+            start = 0
+            for match in finditer(buf, scan_from):
+                end = match.end()
+                if end - start > max_length and last > start:
+                    chunk = buf[start:last].strip()
+                    if len(chunk) > 20:
+                        yield chunk
+                    start = last
+                last = end
+            if start:
+                buf = buf[start:]
+                last -= start
+        
+        pieces = [buf[:last], buf[last:]] if len(buf) > max_length and last else [buf]
+        for piece in pieces:
+            chunk = piece.strip()
+            if len(chunk) > 20:
+                yield chunk
+
+# Module-level workers so ProcessPoolExecutor can pickle them.
+# Each worker process builds its processor once and reuses it.
+_worker_processors = {}
+
+def _get_worker_processor(data_dir) -> ArabicBooksProcessor:
+    key = str(data_dir)
+    if key not in _worker_processors:
+        _worker_processors[key] = ArabicBooksProcessor(key)
+    return _worker_processors[key]
+
+def _process_one_file(file_path, data_dir):
+    return _get_worker_processor(data_dir)._copy_one_file(Path(file_path))
+
+def _analyze_one_file(file_path: Path, data_dir):
+    return _get_worker_processor(data_dir)._analyze_file(file_path)
 
 def main():
     print("📚 معالج الكتب العربية لتدريب اللاما")
@@ -504,6 +768,9 @@ def main():
                 print(f"\nتفاصيل الملفات:")
                 for file_info in analysis['files'][:5]:  # Show first 5
                     print(f"  📄 {file_info['name']}: {file_info['words']} كلمة ({file_info['arabic_percentage']:.1f}% عربية)")
+            
+            if analysis.get('sample_texts'):
+                print(f"\nعينة: {processor.preview_for_terminal(analysis['sample_texts'][0][:100])}")
         
         elif choice == "4":
             print("\nاختر نوع التنسيق:")
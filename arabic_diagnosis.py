@@ -8,6 +8,19 @@ import sys
 import os
 import locale
 
+# تحميل المكتبات مرة واحدة - Load the Arabic libraries once
+try:
+    import arabic_reshaper
+    _RESHAPER = arabic_reshaper.ArabicReshaper()
+except ImportError:
+    arabic_reshaper = None
+    _RESHAPER = None
+
+try:
+    from bidi_display import get_display
+except ImportError:
+    get_display = None
+
 def check_system_arabic_support():
     """فحص دعم النظام للنصوص العربية"""
     print("🔍 فحص دعم النظام للنصوص العربية")
@@ -32,17 +45,13 @@ def check_system_arabic_support():
     except:
         print("3. ❌ خطأ في قراءة إعدادات اللغة")
     
-    # فحص دعم UTF-8
-    try:
-        test_arabic = "مرحباً بالعالم"
-        encoded = test_arabic.encode('utf-8')
-        decoded = encoded.decode('utf-8')
-        if test_arabic == decoded:
-            print("4. ✅ دعم UTF-8 يعمل بشكل صحيح")
-        else:
-            print("4. ❌ مشكلة في دعم UTF-8")
-    except Exception as e:
-        print(f"4. ❌ خطأ في UTF-8: {e}")
+    # فحص دعم UTF-8 - the encode/decode round trip always succeeds in
+    # Python 3, what matters is the encoding used for terminal output
+    stdout_encoding = (sys.stdout.encoding or '').lower().replace('_', '-')
+    if stdout_encoding in ('utf-8', 'utf8') or sys.flags.utf8_mode:
+        print("4. ✅ دعم UTF-8 يعمل بشكل صحيح")
+    else:
+        print(f"4. ❌ مشكلة في دعم UTF-8 (stdout: {sys.stdout.encoding})")
     
     return True
 
@@ -53,35 +62,32 @@ def test_arabic_libraries():
     print("=" * 45)
     
     # اختبار arabic_reshaper
-    try:
-        import arabic_reshaper
-        print("1. ✅ arabic_reshaper متاح")
-        
-        reshaper = arabic_reshaper.ArabicReshaper()
-        test_text = "مرحباً بالعالم"
-        reshaped = reshaper.reshape(test_text)
-        print(f"   اختبار إعادة التشكيل: {test_text} → {reshaped}")
-        
-    except ImportError:
+    if _RESHAPER is None:
         print("1. ❌ arabic_reshaper غير متاح")
         print("   تثبيت: pip install arabic-reshaper")
-    except Exception as e:
-        print(f"1. ⚠️ خطأ في arabic_reshaper: {e}")
+    else:
+        try:
+            print("1. ✅ arabic_reshaper متاح")
+            
+            test_text = "مرحباً بالعالم"
+            reshaped = _RESHAPER.reshape(test_text)
+            print(f"   اختبار إعادة التشكيل: {test_text} → {reshaped}")
+        except Exception as e:
+            print(f"1. ⚠️ خطأ في arabic_reshaper: {e}")
     
     # اختبار python-bidi
-    try:
-        from bidi.algorithm import get_display
-        print("2. ✅ python-bidi متاح")
-        
-        test_text = "Hello مرحباً World"
-        bidi_text = get_display(test_text)
-        print(f"   اختبار اتجاه النص: {test_text} → {bidi_text}")
-        
-    except ImportError:
+    if get_display is None:
         print("2. ❌ python-bidi غير متاح")
         print("   تثبيت: pip install python-bidi")
-    except Exception as e:
-        print(f"2. ⚠️ خطأ في python-bidi: {e}")
+    else:
+        try:
+            print("2. ✅ python-bidi متاح")
+            
+            test_text = "Hello مرحباً World"
+            bidi_text = get_display(test_text)
+            print(f"   اختبار اتجاه النص: {test_text} → {bidi_text}")
+        except Exception as e:
+            print(f"2. ⚠️ خطأ في python-bidi: {e}")
 
 def test_terminal_display():
     """اختبار عرض النصوص في Terminal"""
@@ -98,13 +104,8 @@ def test_terminal_display():
     ]
     
     for i, text in enumerate(test_texts, 1):
-        print(f"{i}. {text}")
-        # محاولة عرض النص بترميزات مختلفة
-        try:
-            encoded_utf8 = text.encode('utf-8').decode('utf-8')
-            print(f"   UTF-8: {encoded_utf8}")
-        except:
-            print("   UTF-8: ❌ فشل")
+        status = "✅" if text.isprintable() else "❌"
+        print(f"{i}. {text}  {status}")
 
 def fix_terminal_settings():
     """إصلاح إعدادات Terminal للنصوص العربية"""
@@ -146,12 +147,11 @@ def comprehensive_test():
     
     # محاولة إصلاح النص
     try:
-        import arabic_reshaper
-        from bidi.algorithm import get_display
+        if _RESHAPER is None or get_display is None:
+            raise ImportError("arabic_reshaper / python-bidi")
         
         # إعادة تشكيل
-        reshaper = arabic_reshaper.ArabicReshaper()
-        reshaped = reshaper.reshape(original_text)
+        reshaped = _RESHAPER.reshape(original_text)
         print(f"بعد إعادة التشكيل: {reshaped}")
         
         # ضبط الاتجاه
@@ -8,17 +8,28 @@ Main CLI Control Interface for Arabic Llama System
 import os
 import sys
 import json
+import atexit
+import asyncio
 import time
+import shutil
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Protocol
+
+import requests
 
 # إضافة مكتبات إضافية للواجهة
 try:
     from rich.console import Console
     from rich.table import Table
     from rich.panel import Panel
-    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.progress import (Progress, SpinnerColumn, TextColumn, BarColumn,
+                               DownloadColumn, TransferSpeedColumn)
     from rich.prompt import Prompt, Confirm
     from rich.layout import Layout
     from rich.live import Live
@@ -26,10 +37,322 @@ try:
 except ImportError:
     RICH_AVAILABLE = False
 
+# تحليل JSON أسرع إن توفر
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# عميل HTTP غير متزامن لتقييم عدة نماذج في نفس الوقت
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# تجميع إحصاءات النتائج بكود مُترجم عند توفر numba
+try:
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+@njit(cache=True)
+def _aggregate_by_model(model_ids, lengths, counts, sums, maxes):
+    """عدد الإجابات ومجموع وأقصى طولها لكل نموذج في مرور واحد"""
+    for i in range(len(model_ids)):
+        m = model_ids[i]
+        counts[m] += 1
+        sums[m] += lengths[i]
+        if lengths[i] > maxes[m]:
+            maxes[m] = lengths[i]
+
+# مدة صلاحية نتائج فحص Ollama بالثواني - TTL for cached Ollama probes
+PROBE_CACHE_TTL = 5.0
+# بادئة السؤال التي تتجاوز الإجابة المحفوظة وتطلب إجابة جديدة من النموذج
+FRESH_ANSWER_PREFIX = '!'
+
+# عدد النماذج التي تُحمّل في نفس الوقت
+MAX_PARALLEL_PULLS = 3
+
+# الحد الأقصى للطلبات المتزامنة في التقييم الدفعي
+BATCH_CONCURRENCY = 4
+
+# امتدادات ملفات التدريب المعروضة في حالة النظام
+TRAINING_EXTENSIONS = ('.txt', '.jsonl')
+
+# عنوان خادم Ollama المحلي - Local Ollama HTTP API
+OLLAMA_URL = "http://127.0.0.1:11434"
+
+# عناصر القائمة الرئيسية والمساعدة - بيانات مشتركة بين الواجهتين
+MAIN_MENU_ITEMS = (
+    ("1", "🔧 إدارة النماذج (Model Management)"),
+    ("2", "📚 معالجة النصوص العربية (Arabic Text Processing)"),
+    ("3", "🚀 تدريب النماذج (Model Training)"),
+    ("4", "💬 اختبار النماذج (Model Testing)"),
+    ("5", "📊 النتائج والتقارير (Results & Reports)"),
+    ("6", "⚙️ إعدادات النظام (System Settings)"),
+    ("7", "🔍 تشخيص المشاكل (Diagnostics)"),
+    ("8", "❓ مساعدة (Help)"),
+    ("9", "🚪 خروج (Exit)"),
+)
+
+HELP_ITEMS = (
+    ("🔧 إدارة النماذج", "تحميل وإدارة نماذج اللاما"),
+    ("📚 معالجة النصوص", "تحويل وإصلاح النصوص العربية"),
+    ("🚀 تدريب النماذج", "إنشاء نماذج مخصصة"),
+    ("💬 اختبار النماذج", "اختبار النماذج تفاعلياً"),
+    ("📊 النتائج", "عرض نتائج الاختبارات"),
+    ("⚙️ الإعدادات", "تخصيص إعدادات النظام"),
+    ("🔍 التشخيص", "فحص مشاكل النظام"),
+)
+
+class Renderer(Protocol):
+    """واجهة العرض: تستقبل بيانات بسيطة (نصوص وقوائم) فقط
+    
+    الأنماط المستخدمة في message: success, error, warning, info
+    """
+    
+    def clear(self): ...
+    def header(self, stamp): ...
+    def title(self, text): ...
+    def message(self, text, style=None): ...
+    def main_menu(self): ...
+    def help(self): ...
+    def menu(self, items): ...
+    def numbered(self, title, items): ...
+    def table(self, title, columns, rows): ...
+    def answer(self, label, text, cached=False): ...
+    def stream_answer(self, label, tokens): ...
+    def pull_progress(self, names): ...
+    def ask(self, prompt): ...
+    def confirm(self, prompt): ...
+
+class RichRenderer:
+    """عرض ملون عبر مكتبة rich"""
+    
+    STYLES = {"success": "green", "error": "red", "warning": "yellow", "info": "blue"}
+    
+    def __init__(self, console):
+        self.console = console
+        # رأس الواجهة يُعاد بناؤه فقط عند تغير الدقيقة المعروضة
+        self._header_panel = None
+        self._header_stamp = None
+    
+    def clear(self):
+        self.console.clear()
+    
+    def header(self, stamp):
+        if stamp != self._header_stamp:
+            self._header_panel = Panel.fit(
+                "[bold blue]🦙 واجهة التحكم في نظام اللاما العربي[/bold blue]\n"
+                "[yellow]Arabic Llama Control Interface[/yellow]\n"
+                f"[green]التاريخ: {stamp}[/green]",
+                border_style="blue"
+            )
+            self._header_stamp = stamp
+        self.console.print(self._header_panel)
+    
+    def title(self, text):
+        self.console.print(f"\n[bold blue]{text}[/bold blue]")
+    
+    def message(self, text, style=None):
+        color = self.STYLES.get(style)
+        self.console.print(f"[{color}]{text}[/{color}]" if color else text)
+    
+    @cached_property
+    def _menu_panel(self):
+        """لوحة القائمة الرئيسية - ثابتة، تُبنى مرة واحدة"""
+        return Panel(
+            "[bold cyan]📋 القائمة الرئيسية - Main Menu[/bold cyan]\n\n" +
+            "\n".join(f"[{key}] {label}" for key, label in MAIN_MENU_ITEMS),
+            border_style="green"
+        )
+    
+    @cached_property
+    def _help_panel(self):
+        """لوحة المساعدة - ثابتة، تُبنى مرة واحدة"""
+        return Panel(
+            "[bold blue]❓ مساعدة النظام[/bold blue]\n\n" +
+            "\n".join(f"[yellow]{name}:[/yellow] {desc}" for name, desc in HELP_ITEMS),
+            border_style="blue"
+        )
+    
+    def main_menu(self):
+        self.console.print(self._menu_panel)
+    
+    def help(self):
+        self.console.print(self._help_panel)
+    
+    def menu(self, items):
+        self.table(None, [("الخيار", "cyan"), ("الوصف", "white")], items)
+    
+    def numbered(self, title, items):
+        self.table(title, [("رقم", "cyan"), ("النموذج", "yellow")],
+                   [(str(i), item) for i, item in enumerate(items, 1)])
+    
+    def table(self, title, columns, rows):
+        table = Table(title=title)
+        for name, style in columns:
+            table.add_column(name, style=style)
+        for row in rows:
+            table.add_row(*row)
+        self.console.print(table)
+    
+    def _answer_panel(self, label, text, border_style):
+        return Panel(
+            f"[bold blue]الإجابة:[/bold blue]\n{text}",
+            title=f"🤖 {label}",
+            border_style=border_style
+        )
+    
+    def answer(self, label, text, cached=False):
+        if cached:
+            label = f"{label} (💾 إجابة محفوظة)"
+        self.console.print(self._answer_panel(label, text, "green"))
+    
+    def stream_answer(self, label, tokens):
+        """عرض الإجابة أثناء توليدها وإرجاع النص الكامل"""
+        parts = []
+        with Live(Panel("جاري المعالجة...", border_style="yellow"),
+                  console=self.console) as live:
+            for token in tokens:
+                parts.append(token)
+                live.update(self._answer_panel(label, ''.join(parts), "yellow"))
+            text = ''.join(parts).strip()
+            live.update(self._answer_panel(label, text, "green"))
+        return text
+    
+    @contextmanager
+    def pull_progress(self, names):
+        """شريط تقدم لكل نموذج؛ يعطي {name: report(status, completed, total)}"""
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            DownloadColumn(),
+            TransferSpeedColumn(),
+            console=self.console
+        ) as progress:
+            def reporter(name):
+                task = progress.add_task(f"جاري تحميل {name}...", total=None)
+                
+                def report(status, completed, total):
+                    progress.update(task, description=f"{name}: {status}",
+                                    total=total, completed=completed)
+                return report
+            
+            yield {name: reporter(name) for name in names}
+    
+    def ask(self, prompt):
+        return Prompt.ask(prompt).strip()
+    
+    def confirm(self, prompt):
+        return Confirm.ask(prompt)
+
+class PlainRenderer:
+    """عرض نصي بسيط عند عدم توفر rich"""
+    
+    def __init__(self):
+        if os.name == 'nt':
+            os.system('')  # تفعيل أكواد ANSI في طرفية Windows مرة واحدة
+    
+    def clear(self):
+        """مسح الشاشة دون تشغيل عملية clear/cls في كل مرة"""
+        sys.stdout.write('\x1b[2J\x1b[H')
+        sys.stdout.flush()
+    
+    def header(self, stamp):
+        print("=" * 60)
+        print("🦙 واجهة التحكم في نظام اللاما العربي")
+        print("Arabic Llama Control Interface")
+        print(f"التاريخ: {stamp}")
+        print("=" * 60)
+    
+    def title(self, text):
+        print(f"\n{text}")
+    
+    def message(self, text, style=None):
+        print(text)
+    
+    def main_menu(self):
+        print("\n📋 القائمة الرئيسية:")
+        self.menu(MAIN_MENU_ITEMS)
+    
+    def help(self):
+        print("\n❓ مساعدة النظام:")
+        for name, desc in HELP_ITEMS:
+            print(f"{name}: {desc}")
+    
+    def menu(self, items):
+        for key, label in items:
+            print(f"{key}. {label}")
+    
+    def numbered(self, title, items):
+        print(f"\n{title}:")
+        for i, item in enumerate(items, 1):
+            print(f"{i}. {item}")
+    
+    def table(self, title, columns, rows):
+        if title:
+            print(f"\n{title}:")
+        print(" | ".join(name for name, _ in columns))
+        print("-" * 30)
+        for row in rows:
+            print(" | ".join(row))
+    
+    def answer(self, label, text, cached=False):
+        print(f"\n🤖 {label}{' (💾 محفوظة)' if cached else ''}:\n{text}")
+    
+    def stream_answer(self, label, tokens):
+        """طباعة الإجابة أثناء توليدها وإرجاع النص الكامل"""
+        print(f"\n🤖 {label}:")
+        parts = []
+        try:
+            for token in tokens:
+                parts.append(token)
+                print(token, end='', flush=True)
+        finally:
+            print()
+        return ''.join(parts).strip()
+    
+    @contextmanager
+    def pull_progress(self, names):
+        """نسبة التقدم في سطر واحد؛ يعطي {name: report(status, completed, total)}"""
+        def reporter(name):
+            print(f"جاري تحميل {name}...")
+            
+            def report(status, completed, total):
+                if total:
+                    print(f"\r{name} {status}: {completed * 100 // total}%   ", end='', flush=True)
+            return report
+        
+        try:
+            yield {name: reporter(name) for name in names}
+        finally:
+            print()
+    
+    def ask(self, prompt):
+        return input(f"{prompt}: ").strip()
+    
+    def confirm(self, prompt):
+        return input(f"{prompt} (y/n): ").strip().lower() in ['y', 'yes', 'نعم']
+
 class ArabicLlamaCLI:
     def __init__(self):
-        if RICH_AVAILABLE:
-            self.console = Console()
+        # طبقة العرض تُختار مرة واحدة بدلاً من فحص RICH_AVAILABLE في كل دالة
+        self.render = RichRenderer(Console()) if RICH_AVAILABLE else PlainRenderer()
         self.models_dir = Path("models")
         self.training_dir = Path("training_data")
         self.results_dir = Path("results")
@@ -46,146 +369,188 @@ class ArabicLlamaCLI:
             "arabic-assistant-1b"
         ]
         
+        # ذاكرة مؤقتة لنتائج الفحص: key -> (timestamp, value)
+        self._probe_cache = {}
+        
+        # مجموعة خيوط لتشغيل فحوصات الحالة بالتوازي
+        self._executor = ThreadPoolExecutor(max_workers=4)
+        
+        # جلسة HTTP دائمة مع Ollama (keep-alive) بدلاً من تشغيل عملية لكل طلب
+        self._http = requests.Session()
+        
+        # ملف النتائج يُفتح مرة واحدة عند أول حفظ ويبقى مفتوحاً طوال الجلسة
+        self._results_fp = None
+        
+        # إجابات سابقة: (model, normalized question) -> response
+        self._answer_cache = {}
+        self._load_answer_cache()
+        
+    def _cached(self, key, ttl, fn):
+        """إرجاع نتيجة مخزنة إذا كانت حديثة، وإلا استدعاء fn"""
+        entry = self._probe_cache.get(key)
+        now = time.monotonic()
+        if entry and now - entry[0] < ttl:
+            return entry[1]
+        value = fn()
+        self._probe_cache[key] = (now, value)
+        return value
+    
+    def _invalidate_cache(self, key):
+        """إلغاء نتيجة مخزنة بعد تغيير حالة النظام"""
+        self._probe_cache.pop(key, None)
+    
+    def clear_screen(self):
+        """مسح الشاشة"""
+        self.render.clear()
+    
     def print_header(self):
         """طباعة رأس الواجهة"""
-        if RICH_AVAILABLE:
-            header = Panel.fit(
-                "[bold blue]🦙 واجهة التحكم في نظام اللاما العربي[/bold blue]\n"
-                "[yellow]Arabic Llama Control Interface[/yellow]\n"
-                f"[green]التاريخ: {datetime.now().strftime('%Y-%m-%d %H:%M')}[/green]",
-                border_style="blue"
-            )
-            self.console.print(header)
-        else:
-            print("=" * 60)
-            print("🦙 واجهة التحكم في نظام اللاما العربي")
-            print("Arabic Llama Control Interface")
-            print(f"التاريخ: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-            print("=" * 60)
+        self.render.header(datetime.now().strftime('%Y-%m-%d %H:%M'))
+    
+    def _collect_status(self):
+        """تشغيل فحوصات الحالة المستقلة بالتوازي"""
+        ollama = self._executor.submit(self._cached, 'ollama_list', PROBE_CACHE_TTL, self._ollama_list)
+        training = self._executor.submit(self._count_training)
+        disk = self._executor.submit(lambda: shutil.disk_usage(".").free)
+        
+        ollama_status, models, _ = ollama.result()
+        return ollama_status, list(models), training.result(), disk.result()
+    
+    def _count_training(self):
+        """عد ملفات التدريب (.txt/.jsonl) بمرور واحد على المجلد: (العدد, أول 3 أسماء)"""
+        count = 0
+        names = []
+        try:
+            with os.scandir(self.training_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(TRAINING_EXTENSIONS) and entry.is_file(follow_symlinks=False):
+                        count += 1
+                        if len(names) < 3:
+                            names.append(entry.name)
+        except OSError:
+            pass
+        return count, names
     
     def show_system_status(self):
         """عرض حالة النظام"""
-        if RICH_AVAILABLE:
-            table = Table(title="🔧 حالة النظام - System Status")
-            table.add_column("المكون", style="cyan")
-            table.add_column("الحالة", style="green")
-            table.add_column("التفاصيل", style="yellow")
-            
-            # فحص Ollama
-            ollama_status = self.check_ollama()
-            table.add_row("Ollama", 
-                         "✅ يعمل" if ollama_status else "❌ متوقف",
-                         "خدمة تشغيل النماذج")
-            
-            # فحص النماذج
-            models = self.get_installed_models()
-            table.add_row("النماذج المثبتة", 
-                         f"✅ {len(models)}" if models else "❌ لا يوجد",
-                         f"{', '.join(models[:3])}" if models else "لا توجد نماذج")
-            
-            # فحص ملفات التدريب
-            training_files = list(self.training_dir.glob("*.txt")) + list(self.training_dir.glob("*.jsonl"))
-            table.add_row("ملفات التدريب", 
-                         f"✅ {len(training_files)}" if training_files else "❌ لا يوجد",
-                         f"{len(training_files)} ملف")
-            
-            # فحص المساحة
-            import shutil
-            free_space = shutil.disk_usage(".").free / (1024**3)
-            table.add_row("المساحة الحرة", 
-                         f"✅ {free_space:.1f} GB" if free_space > 5 else f"⚠️ {free_space:.1f} GB",
-                         "مساحة القرص الصلب")
-            
-            self.console.print(table)
-        else:
-            print("\n🔧 حالة النظام:")
-            print("-" * 30)
-            print(f"Ollama: {'✅ يعمل' if self.check_ollama() else '❌ متوقف'}")
-            models = self.get_installed_models()
-            print(f"النماذج: {'✅ ' + str(len(models)) if models else '❌ لا يوجد'}")
-            training_files = list(self.training_dir.glob("*.txt")) + list(self.training_dir.glob("*.jsonl"))
-            print(f"ملفات التدريب: {len(training_files)}")
+        ollama_status, models, (training_count, _), free_bytes = self._collect_status()
+        free_space = free_bytes / (1024**3)
+        
+        self.render.table("🔧 حالة النظام - System Status",
+                          [("المكون", "cyan"), ("الحالة", "green"), ("التفاصيل", "yellow")],
+                          [
+                              ("Ollama",
+                               "✅ يعمل" if ollama_status else "❌ متوقف",
+                               "خدمة تشغيل النماذج"),
+                              ("النماذج المثبتة",
+                               f"✅ {len(models)}" if models else "❌ لا يوجد",
+                               f"{', '.join(models[:3])}" if models else "لا توجد نماذج"),
+                              ("ملفات التدريب",
+                               f"✅ {training_count}" if training_count else "❌ لا يوجد",
+                               f"{training_count} ملف"),
+                              ("المساحة الحرة",
+                               f"✅ {free_space:.1f} GB" if free_space > 5 else f"⚠️ {free_space:.1f} GB",
+                               "مساحة القرص الصلب"),
+                          ])
     
-    def check_ollama(self):
-        """فحص حالة Ollama"""
+    def _normalize_question(self, question):
+        """توحيد السؤال للمقارنة: إزالة المسافات الزائدة وتجاهل حالة الأحرف"""
+        return ' '.join(question.split()).casefold()
+    
+    def _remember_answer(self, result):
+        """إضافة نتيجة اختبار إلى ذاكرة الإجابات"""
+        # السجلات القديمة بلا بصمة لا تطابق أي نموذج مثبت فلا يُعاد تشغيلها
+        if result.get('response') and result.get('digest'):
+            key = (result.get('model', ''), result['digest'],
+                   self._normalize_question(result.get('question', '')))
+            self._answer_cache[key] = result['response']
+    
+    def _iter_results(self):
+        """قراءة سجلات test_results.jsonl واحداً تلو الآخر مع تخطي الأسطر التالفة"""
+        results_file = self.results_dir / "test_results.jsonl"
+        if not results_file.exists():
+            return
+        
+        # إفراغ ما لم يُكتب بعد حتى تظهر آخر النتائج
+        if self._results_fp:
+            self._results_fp.flush()
+        
+        loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+        with open(results_file, 'rb') as f:
+            for line in f:
+                try:
+                    yield loads(line)
+                except ValueError:
+                    continue
+    
+    def _load_answer_cache(self):
+        """تحميل الإجابات المحفوظة مرة واحدة عند بدء التشغيل"""
+        for result in self._iter_results():
+            self._remember_answer(result)
+    
+    def _cached_answer(self, model_name, digest, question):
+        """إجابة سابقة لنفس السؤال على نفس نسخة النموذج، أو None"""
+        return self._answer_cache.get((model_name, digest, self._normalize_question(question)))
+    
+    def _ollama_list(self):
+        """طلب /api/tags مرة واحدة: (يعمل؟, قائمة النماذج, بصمة كل نموذج)"""
         try:
-            result = subprocess.run(['ollama', 'list'], 
-                                  capture_output=True, text=True, timeout=5)
-            return result.returncode == 0
+            response = self._http.get(f"{OLLAMA_URL}/api/tags", timeout=5)
+            if response.status_code != 200:
+                return False, [], {}
+            entries = response.json().get('models', [])
+            models = [model['name'] for model in entries]
+            digests = {model['name']: model.get('digest', '') for model in entries}
+            return True, models, digests
         except:
-            return False
+            return False, [], {}
+    
+    def _generate_stream(self, model_name, prompt):
+        """إرسال السؤال إلى /api/generate وإرجاع أجزاء الإجابة أثناء توليدها"""
+        with self._http.post(f"{OLLAMA_URL}/api/generate",
+                             json={'model': model_name, 'prompt': prompt, 'stream': True},
+                             stream=True, timeout=60) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise RuntimeError(chunk['error'])
+                yield chunk.get('response', '')
+                if chunk.get('done'):
+                    break
+    
+    def check_ollama(self):
+        """فحص حالة Ollama"""
+        return self._cached('ollama_list', PROBE_CACHE_TTL, self._ollama_list)[0]
     
     def get_installed_models(self):
         """الحصول على قائمة النماذج المثبتة"""
-        try:
-            result = subprocess.run(['ollama', 'list'], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')[1:]  # تخطي الرأس
-                models = []
-                for line in lines:
-                    if line.strip():
-                        model_name = line.split()[0]
-                        models.append(model_name)
-                return models
-            return []
-        except:
-            return []
+        return list(self._cached('ollama_list', PROBE_CACHE_TTL, self._ollama_list)[1])
+    
+    def _model_digest(self, model_name):
+        """بصمة النموذج الحالية - تتغير عند إعادة بنائه بنفس الاسم عبر ollama create"""
+        return self._cached('ollama_list', PROBE_CACHE_TTL, self._ollama_list)[2].get(model_name, '')
     
     def show_main_menu(self):
         """عرض القائمة الرئيسية"""
-        if RICH_AVAILABLE:
-            menu_panel = Panel(
-                "[bold cyan]📋 القائمة الرئيسية - Main Menu[/bold cyan]\n\n"
-                "[1] 🔧 إدارة النماذج (Model Management)\n"
-                "[2] 📚 معالجة النصوص العربية (Arabic Text Processing)\n"
-                "[3] 🚀 تدريب النماذج (Model Training)\n"
-                "[4] 💬 اختبار النماذج (Model Testing)\n"
-                "[5] 📊 النتائج والتقارير (Results & Reports)\n"
-                "[6] ⚙️ إعدادات النظام (System Settings)\n"
-                "[7] 🔍 تشخيص المشاكل (Diagnostics)\n"
-                "[8] ❓ مساعدة (Help)\n"
-                "[9] 🚪 خروج (Exit)",
-                border_style="green"
-            )
-            self.console.print(menu_panel)
-        else:
-            print("\n📋 القائمة الرئيسية:")
-            print("1. 🔧 إدارة النماذج")
-            print("2. 📚 معالجة النصوص العربية")
-            print("3. 🚀 تدريب النماذج")
-            print("4. 💬 اختبار النماذج")
-            print("5. 📊 النتائج والتقارير")
-            print("6. ⚙️ إعدادات النظام")
-            print("7. 🔍 تشخيص المشاكل")
-            print("8. ❓ مساعدة")
-            print("9. 🚪 خروج")
+        self.render.main_menu()
     
     def model_management(self):
         """إدارة النماذج"""
         while True:
-            if RICH_AVAILABLE:
-                self.console.print("\n[bold blue]🔧 إدارة النماذج[/bold blue]")
-                table = Table()
-                table.add_column("الخيار", style="cyan")
-                table.add_column("الوصف", style="white")
-                
-                table.add_row("1", "عرض النماذج المثبتة")
-                table.add_row("2", "تحميل نموذج جديد")
-                table.add_row("3", "حذف نموذج")
-                table.add_row("4", "معلومات النموذج")
-                table.add_row("0", "عودة للقائمة الرئيسية")
-                
-                self.console.print(table)
-            else:
-                print("\n🔧 إدارة النماذج:")
-                print("1. عرض النماذج المثبتة")
-                print("2. تحميل نموذج جديد")
-                print("3. حذف نموذج")
-                print("4. معلومات النموذج")
-                print("0. عودة للقائمة الرئيسية")
+            self.render.title("🔧 إدارة النماذج")
+            self.render.menu([
+                ("1", "عرض النماذج المثبتة"),
+                ("2", "تحميل نموذج جديد"),
+                ("3", "حذف نموذج"),
+                ("4", "معلومات النموذج"),
+                ("5", "تقييم عدة نماذج دفعة واحدة"),
+                ("0", "عودة للقائمة الرئيسية"),
+            ])
             
-            choice = input("\nاختر (0-4): ").strip()
+            choice = self.render.ask("\nاختر (0-5)")
             
             if choice == "1":
                 self.list_installed_models()
@@ -195,39 +560,24 @@ class ArabicLlamaCLI:
                 self.remove_model()
             elif choice == "4":
                 self.show_model_info()
+            elif choice == "5":
+                self.batch_evaluate()
             elif choice == "0":
                 break
             else:
-                print("❌ اختيار غير صحيح")
+                self.render.message("❌ اختيار غير صحيح", "error")
     
     def list_installed_models(self):
         """عرض النماذج المثبتة مع التفاصيل"""
         models = self.get_installed_models()
         
-        if RICH_AVAILABLE:
-            if models:
-                table = Table(title="📋 النماذج المثبتة")
-                table.add_column("النموذج", style="cyan")
-                table.add_column("الحجم", style="yellow")
-                table.add_column("التاريخ", style="green")
-                table.add_column("الحالة", style="blue")
-                
-                for model in models:
-                    # محاولة الحصول على معلومات إضافية
-                    size = self.get_model_size(model)
-                    status = "✅ جاهز"
-                    table.add_row(model, size, "غير محدد", status)
-                
-                self.console.print(table)
-            else:
-                self.console.print("[red]❌ لا توجد نماذج مثبتة[/red]")
-        else:
-            print("\n📋 النماذج المثبتة:")
-            if models:
-                for i, model in enumerate(models, 1):
-                    print(f"{i}. {model}")
-            else:
-                print("❌ لا توجد نماذج مثبتة")
+        if not models:
+            self.render.message("❌ لا توجد نماذج مثبتة", "error")
+            return
+        
+        self.render.table("📋 النماذج المثبتة",
+                          [("النموذج", "cyan"), ("الحجم", "yellow"), ("التاريخ", "green"), ("الحالة", "blue")],
+                          [(model, self.get_model_size(model), "غير محدد", "✅ جاهز") for model in models])
     
     def get_model_size(self, model_name):
         """الحصول على حجم النموذج"""
@@ -243,233 +593,214 @@ class ArabicLlamaCLI:
     
     def download_model(self):
         """تحميل نموذج جديد"""
-        if RICH_AVAILABLE:
-            self.console.print("\n[bold blue]📥 تحميل نموذج جديد[/bold blue]")
-            
-            table = Table()
-            table.add_column("رقم", style="cyan")
-            table.add_column("النموذج", style="yellow")
-            table.add_column("الحجم", style="green")
-            table.add_column("الوصف", style="white")
-            
-            models_info = [
-                ("llama3.2:1b", "1.3 GB", "الأسرع - مناسب للاختبار"),
-                ("llama3.2:3b", "2.0 GB", "متوازن - جودة جيدة"),
-                ("llama3.1:8b", "4.7 GB", "جودة عالية - يحتاج ذاكرة أكبر"),
-                ("llama3.1:70b", "40 GB", "أفضل جودة - يحتاج موارد كبيرة")
-            ]
-            
-            for i, (model, size, desc) in enumerate(models_info, 1):
-                table.add_row(str(i), model, size, desc)
-            
-            self.console.print(table)
-            
-            choice = Prompt.ask("اختر رقم النموذج (1-4)", choices=["1", "2", "3", "4"])
-            model_name = models_info[int(choice)-1][0]
-            
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                console=self.console
-            ) as progress:
-                task = progress.add_task(f"جاري تحميل {model_name}...", total=None)
-                result = subprocess.run(['ollama', 'pull', model_name])
-                progress.remove_task(task)
-            
-            if result.returncode == 0:
-                self.console.print(f"[green]✅ تم تحميل {model_name} بنجاح![/green]")
+        self.render.title("📥 تحميل نموذج جديد")
+        
+        models_info = [
+            ("llama3.2:1b", "1.3 GB", "الأسرع - مناسب للاختبار"),
+            ("llama3.2:3b", "2.0 GB", "متوازن - جودة جيدة"),
+            ("llama3.1:8b", "4.7 GB", "جودة عالية - يحتاج ذاكرة أكبر"),
+            ("llama3.1:70b", "40 GB", "أفضل جودة - يحتاج موارد كبيرة")
+        ]
+        
+        self.render.table(None,
+                          [("رقم", "cyan"), ("النموذج", "yellow"), ("الحجم", "green"), ("الوصف", "white")],
+                          [(str(i), model, size, desc) for i, (model, size, desc) in enumerate(models_info, 1)])
+        
+        choices = self.render.ask("اختر رقم النموذج أو عدة أرقام مفصولة بفواصل (1-4)")
+        model_names = [models_info[int(c) - 1][0]
+                       for c in dict.fromkeys(choices.replace(' ', '').split(','))
+                       if c in ("1", "2", "3", "4")]
+        if not model_names:
+            self.render.message("❌ اختيار غير صحيح", "error")
+            return
+        
+        with self.render.pull_progress(model_names) as reporters:
+            # Ollama يخدم طلبات التحميل بالتوازي
+            with ThreadPoolExecutor(max_workers=MAX_PARALLEL_PULLS) as pool:
+                futures = {name: pool.submit(self._pull_with_progress, name, reporters[name])
+                           for name in model_names}
+                results = {name: future.result() for name, future in futures.items()}
+        self._invalidate_cache('ollama_list')
+        
+        for model_name, error in results.items():
+            if error is None:
+                self.render.message(f"✅ تم تحميل {model_name} بنجاح!", "success")
             else:
-                self.console.print(f"[red]❌ فشل تحميل {model_name}[/red]")
-        else:
-            print("\n📥 النماذج المتاحة:")
-            models_info = [
-                ("llama3.2:1b", "1.3 GB", "الأسرع"),
-                ("llama3.2:3b", "2.0 GB", "متوازن"),
-                ("llama3.1:8b", "4.7 GB", "جودة عالية"),
-            ]
-            
-            for i, (model, size, desc) in enumerate(models_info, 1):
-                print(f"{i}. {model} ({size}) - {desc}")
-            
-            choice = input("اختر رقم النموذج (1-3): ").strip()
-            
-            if choice in ["1", "2", "3"]:
-                model_name = models_info[int(choice)-1][0]
-                print(f"جاري تحميل {model_name}...")
-                result = subprocess.run(['ollama', 'pull', model_name])
-                
-                if result.returncode == 0:
-                    print(f"✅ تم تحميل {model_name} بنجاح!")
-                else:
-                    print(f"❌ فشل تحميل {model_name}")
+                self.render.message(f"❌ فشل تحميل {model_name}: {error}", "error")
     
-    def test_model_interactive(self):
-        """اختبار النموذج تفاعلياً"""
-        models = self.get_installed_models()
+    def _pull_with_progress(self, model_name, report):
+        """تحميل نموذج عبر /api/pull مع تمرير التقدم الفعلي إلى report(status, completed, total)
         
+        يرجع None عند النجاح أو رسالة الخطأ
+        """
+        try:
+            with self._http.post(f"{OLLAMA_URL}/api/pull",
+                                 json={'name': model_name, 'stream': True},
+                                 stream=True, timeout=60) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event.get('error'):
+                        return event['error']
+                    
+                    status = event.get('status', '')
+                    report(status, event.get('completed', 0), event.get('total'))
+                    
+                    if status == 'success':
+                        return None
+            return "انقطع الاتصال قبل اكتمال التحميل"
+        except requests.RequestException as e:
+            return str(e)
+    
+    def _choose_model(self, title, prompt):
+        """عرض النماذج المثبتة واختيار واحد منها بالرقم؛ يرجع None عند الإلغاء"""
+        models = self.get_installed_models()
         if not models:
-            if RICH_AVAILABLE:
-                self.console.print("[red]❌ لا توجد نماذج مثبتة[/red]")
-            else:
-                print("❌ لا توجد نماذج مثبتة")
+            self.render.message("❌ لا توجد نماذج مثبتة", "error")
+            return None
+        
+        self.render.numbered(title, models)
+        choice = self.render.ask(f"{prompt} (1-{len(models)})")
+        
+        if choice.isdigit() and 1 <= int(choice) <= len(models):
+            return models[int(choice)-1]
+        self.render.message("❌ اختيار غير صحيح", "error")
+        return None
+    
+    def test_model_interactive(self):
+        """اختبار النموذج تفاعلياً"""
+        self.render.title("💬 اختبار النماذج")
+        model_name = self._choose_model("النماذج المتاحة", "اختر النموذج")
+        if model_name is None:
             return
         
-        if RICH_AVAILABLE:
-            self.console.print("\n[bold blue]💬 اختبار النماذج[/bold blue]")
-            
-            table = Table()
-            table.add_column("رقم", style="cyan")
-            table.add_column("النموذج", style="yellow")
-            
-            for i, model in enumerate(models, 1):
-                table.add_row(str(i), model)
-            
-            self.console.print(table)
+        self.render.message(f"\n🚀 بدء اختبار {model_name}", "success")
+        self.render.message("اكتب 'خروج' للعودة للقائمة", "warning")
+        self.render.message(f"ابدأ السؤال بـ '{FRESH_ANSWER_PREFIX}' لطلب إجابة جديدة بدل المحفوظة", "warning")
+        
+        while True:
+            question = self.render.ask("\nسؤالك")
             
-            choice = Prompt.ask(f"اختر النموذج (1-{len(models)})")
-            model_name = models[int(choice)-1]
+            if question.lower() in ['خروج', 'exit', 'quit']:
+                break
             
-            self.console.print(f"\n[green]🚀 بدء اختبار {model_name}[/green]")
-            self.console.print("[yellow]اكتب 'خروج' للعودة للقائمة[/yellow]")
+            fresh = question.startswith(FRESH_ANSWER_PREFIX)
+            if fresh:
+                question = question[len(FRESH_ANSWER_PREFIX):].strip()
             
-            while True:
-                question = Prompt.ask("\n[cyan]سؤالك")
-                
-                if question.lower() in ['خروج', 'exit', 'quit']:
-                    break
-                
-                # حفظ السؤال والوقت
-                test_result = {
-                    "model": model_name,
-                    "question": question,
-                    "timestamp": datetime.now().isoformat(),
-                    "response": ""
-                }
-                
-                with Live(Panel("جاري المعالجة...", border_style="yellow"), 
-                         console=self.console) as live:
-                    try:
-                        result = subprocess.run([
-                            'ollama', 'run', model_name, question
-                        ], capture_output=True, text=True, timeout=60)
-                        
-                        if result.returncode == 0:
-                            response = result.stdout.strip()
-                            test_result["response"] = response
-                            
-                            # عرض النتيجة
-                            response_panel = Panel(
-                                f"[bold blue]الإجابة:[/bold blue]\n{response}",
-                                title=f"🤖 {model_name}",
-                                border_style="green"
-                            )
-                            live.update(response_panel)
-                            
-                            # حفظ النتيجة
-                            self.save_test_result(test_result)
-                            
-                        else:
-                            live.update(Panel(
-                                f"[red]❌ خطأ في النموذج: {result.stderr}[/red]",
-                                border_style="red"
-                            ))
-                    
-                    except subprocess.TimeoutExpired:
-                        live.update(Panel(
-                            "[red]❌ انتهت مهلة الانتظار[/red]",
-                            border_style="red"
-                        ))
-                
-                time.sleep(2)  # توقف قصير لقراءة النتيجة
-        else:
-            print("\n💬 النماذج المتاحة:")
-            for i, model in enumerate(models, 1):
-                print(f"{i}. {model}")
+            digest = self._model_digest(model_name)
+            cached = None if fresh else self._cached_answer(model_name, digest, question)
+            if cached is not None:
+                # تم السؤال من قبل - لا حاجة لتشغيل النموذج مجدداً
+                self.render.answer(model_name, cached, cached=True)
+                continue
             
-            choice = input(f"اختر النموذج (1-{len(models)}): ").strip()
+            # حفظ السؤال والوقت
+            test_result = {
+                "model": model_name,
+                "digest": digest,
+                "question": question,
+                "timestamp": datetime.now().isoformat(),
+                "response": ""
+            }
             
-            if choice.isdigit() and 1 <= int(choice) <= len(models):
-                model_name = models[int(choice)-1]
-                print(f"\n🚀 اختبار {model_name}")
-                print("اكتب 'خروج' للعودة")
-                
-                while True:
-                    question = input("\nسؤالك: ").strip()
-                    
-                    if question.lower() in ['خروج', 'exit']:
-                        break
-                    
-                    print("جاري المعالجة...")
-                    result = subprocess.run([
-                        'ollama', 'run', model_name, question
-                    ], capture_output=True, text=True)
-                    
-                    if result.returncode == 0:
-                        print(f"\n🤖 الإجابة:\n{result.stdout.strip()}")
-                    else:
-                        print(f"❌ خطأ: {result.stderr}")
+            try:
+                test_result["response"] = self.render.stream_answer(
+                    model_name, self._generate_stream(model_name, question))
+                self.save_test_result(test_result)
+            except requests.Timeout:
+                self.render.message("❌ انتهت مهلة الانتظار", "error")
+            except (requests.RequestException, RuntimeError) as e:
+                self.render.message(f"❌ خطأ في النموذج: {e}", "error")
     
-    def save_test_result(self, result):
-        """حفظ نتائج الاختبار"""
-        results_file = self.results_dir / "test_results.jsonl"
+    def save_test_result(self, result, flush=False):
+        """حفظ نتائج الاختبار (flush=True لضمان الكتابة على القرص فوراً)"""
+        if self._results_fp is None:
+            results_file = self.results_dir / "test_results.jsonl"
+            self._results_fp = open(results_file, 'ab', buffering=1 << 16)
+            atexit.register(self.close_results)
+        
+        if ORJSON_AVAILABLE:
+            line = orjson.dumps(result) + b'\n'
+        else:
+            line = (json.dumps(result, ensure_ascii=False) + '\n').encode('utf-8')
         
-        with open(results_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self._results_fp.write(line)
+        if flush:
+            self._results_fp.flush()
+            os.fsync(self._results_fp.fileno())
+        
+        self._remember_answer(result)
+    
+    def close_results(self):
+        """إغلاق ملف النتائج وكتابة ما تبقى في الذاكرة"""
+        if self._results_fp is not None:
+            self._results_fp.close()
+            self._results_fp = None
     
     def show_results_reports(self):
         """عرض النتائج والتقارير"""
-        if RICH_AVAILABLE:
-            self.console.print("\n[bold blue]📊 النتائج والتقارير[/bold blue]")
-        else:
-            print("\n📊 النتائج والتقارير:")
+        self.render.title("📊 النتائج والتقارير")
         
         results_file = self.results_dir / "test_results.jsonl"
         
         if not results_file.exists():
-            if RICH_AVAILABLE:
-                self.console.print("[yellow]⚠️ لا توجد نتائج محفوظة[/yellow]")
-            else:
-                print("⚠️ لا توجد نتائج محفوظة")
+            self.render.message("⚠️ لا توجد نتائج محفوظة", "warning")
             return
         
-        # قراءة النتائج
-        results = []
-        with open(results_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    results.append(json.loads(line))
-                except:
-                    continue
+        # قراءة النتائج - نحتفظ بآخر 10 فقط ونعد الباقي
+        results = deque(maxlen=10)
+        total = 0
+        model_index = {}
+        model_ids = []
+        lengths = []
+        for result in self._iter_results():
+            results.append(result)
+            total += 1
+            model_ids.append(model_index.setdefault(result.get('model', 'غير محدد'), len(model_index)))
+            lengths.append(len(result.get('response', '')))
+        
+        summary = self._summarize_by_model(model_index, model_ids, lengths)
         
-        if RICH_AVAILABLE:
-            table = Table(title=f"📋 نتائج الاختبارات ({len(results)} نتيجة)")
-            table.add_column("التاريخ", style="cyan")
-            table.add_column("النموذج", style="yellow")
-            table.add_column("السؤال", style="white")
-            table.add_column("الإجابة", style="green")
+        rows = []
+        for result in results:  # آخر 10 نتائج
+            timestamp = result.get('timestamp', 'غير محدد')
+            if timestamp != 'غير محدد':
+                timestamp = timestamp.split('T')[0]  # التاريخ فقط
             
-            for result in results[-10:]:  # آخر 10 نتائج
-                timestamp = result.get('timestamp', 'غير محدد')
-                if timestamp != 'غير محدد':
-                    timestamp = timestamp.split('T')[0]  # التاريخ فقط
-                
-                question = result.get('question', '')[:30] + "..." if len(result.get('question', '')) > 30 else result.get('question', '')
-                response = result.get('response', '')[:50] + "..." if len(result.get('response', '')) > 50 else result.get('response', '')
-                
-                table.add_row(
-                    timestamp,
-                    result.get('model', 'غير محدد'),
-                    question,
-                    response
-                )
+            question = result.get('question', '')[:30] + "..." if len(result.get('question', '')) > 30 else result.get('question', '')
+            response = result.get('response', '')[:50] + "..." if len(result.get('response', '')) > 50 else result.get('response', '')
             
-            self.console.print(table)
+            rows.append((timestamp, result.get('model', 'غير محدد'), question, response))
+        
+        self.render.table(f"📋 نتائج الاختبارات ({total} نتيجة)",
+                          [("التاريخ", "cyan"), ("النموذج", "yellow"), ("السؤال", "white"), ("الإجابة", "green")],
+                          rows)
+        
+        self.render.table("📈 ملخص حسب النموذج",
+                          [("النموذج", "yellow"), ("الاختبارات", "cyan"),
+                           ("متوسط طول الإجابة", "green"), ("أطول إجابة", "green")],
+                          [(model, str(count), f"{mean_len:.0f}", str(max_len))
+                           for model, count, mean_len, max_len in summary])
+    
+    def _summarize_by_model(self, model_index, model_ids, lengths):
+        """(النموذج, العدد, متوسط الطول, أقصى طول) لكل نموذج"""
+        n_models = len(model_index)
+        if NUMBA_AVAILABLE:
+            model_ids = np.asarray(model_ids, dtype=np.int32)
+            lengths = np.asarray(lengths, dtype=np.int64)
+            counts = np.zeros(n_models, dtype=np.int64)
+            sums = np.zeros(n_models, dtype=np.int64)
+            maxes = np.zeros(n_models, dtype=np.int64)
         else:
-            print(f"📋 آخر {min(10, len(results))} نتائج:")
-            for i, result in enumerate(results[-10:], 1):
-                print(f"\n{i}. النموذج: {result.get('model', 'غير محدد')}")
-                print(f"   السؤال: {result.get('question', '')[:50]}...")
-                print(f"   الإجابة: {result.get('response', '')[:100]}...")
+            counts, sums, maxes = [0] * n_models, [0] * n_models, [0] * n_models
+        
+        _aggregate_by_model(model_ids, lengths, counts, sums, maxes)
+        
+        return [(model, int(counts[i]), sums[i] / counts[i], int(maxes[i]))
+                for model, i in model_index.items()]
     
     def run(self):
         """تشغيل الواجهة الرئيسية"""
@@ -481,12 +812,12 @@ class ArabicLlamaCLI:
                 print("يرجى إعادة تشغيل البرنامج للاستفادة من الواجهة المحسنة")
             
             while True:
-                os.system('clear' if os.name == 'posix' else 'cls')
+                self.clear_screen()
                 self.print_header()
                 self.show_system_status()
                 self.show_main_menu()
                 
-                choice = input("\nاختر من القائمة (1-9): ").strip()
+                choice = self.render.ask("\nاختر من القائمة (1-9)")
                 
                 if choice == "1":
                     self.model_management()
@@ -505,67 +836,40 @@ class ArabicLlamaCLI:
                 elif choice == "8":
                     self.show_help()
                 elif choice == "9":
-                    if RICH_AVAILABLE:
-                        if Confirm.ask("هل تريد الخروج؟"):
-                            self.console.print("[green]شكراً لاستخدام النظام! 👋[/green]")
-                            break
-                    else:
-                        confirm = input("هل تريد الخروج؟ (y/n): ")
-                        if confirm.lower() in ['y', 'yes', 'نعم']:
-                            print("شكراً لاستخدام النظام! 👋")
-                            break
+                    if self.render.confirm("هل تريد الخروج؟"):
+                        self.render.message("شكراً لاستخدام النظام! 👋", "success")
+                        break
                 else:
-                    if RICH_AVAILABLE:
-                        self.console.print("[red]❌ اختيار غير صحيح[/red]")
-                    else:
-                        print("❌ اختيار غير صحيح")
+                    self.render.message("❌ اختيار غير صحيح", "error")
                     time.sleep(1)
                     
         except KeyboardInterrupt:
-            if RICH_AVAILABLE:
-                self.console.print("\n[yellow]تم إيقاف البرنامج[/yellow]")
-            else:
-                print("\nتم إيقاف البرنامج")
+            self.render.message("\nتم إيقاف البرنامج", "warning")
         except Exception as e:
-            if RICH_AVAILABLE:
-                self.console.print(f"[red]خطأ: {str(e)}[/red]")
-            else:
-                print(f"خطأ: {str(e)}")
+            self.render.message(f"خطأ: {str(e)}", "error")
+        finally:
+            self.close_results()
     
     def process_arabic_text(self):
         """معالجة النصوص العربية"""
-        if RICH_AVAILABLE:
-            self.console.print("[bold blue]📚 معالجة النصوص العربية[/bold blue]")
-        else:
-            print("📚 معالجة النصوص العربية")
+        self.render.title("📚 معالجة النصوص العربية")
         
         subprocess.run([sys.executable, 'text_data_processor.py'])
     
     def train_models(self):
         """تدريب النماذج مع إمكانية المراقبة المباشرة"""
-        if RICH_AVAILABLE:
-            self.console.print("[bold blue]🚀 تدريب النماذج[/bold blue]")
-        else:
-            print("🚀 تدريب النماذج")
+        self.render.title("🚀 تدريب النماذج")
         
         # خيارات التدريب
-        options = [
-            "1. تدريب عادي (Normal training)",
-            "2. تدريب مع مراقبة مباشرة (Training with real-time monitoring)",
-            "3. فتح مراقب التدريب فقط (Open training monitor only)",
-            "4. العودة للقائمة الرئيسية (Back to main menu)"
-        ]
-        
-        if RICH_AVAILABLE:
-            self.console.print("[cyan]اختر نوع التدريب:[/cyan]")
-            for option in options:
-                self.console.print(f"  {option}")
-        else:
-            print("اختر نوع التدريب:")
-            for option in options:
-                print(f"  {option}")
+        self.render.message("اختر نوع التدريب:")
+        self.render.menu([
+            ("1", "تدريب عادي (Normal training)"),
+            ("2", "تدريب مع مراقبة مباشرة (Training with real-time monitoring)"),
+            ("3", "فتح مراقب التدريب فقط (Open training monitor only)"),
+            ("4", "العودة للقائمة الرئيسية (Back to main menu)")
+        ])
         
-        choice = input("\nالاختيار (1-4): ").strip()
+        choice = self.render.ask("\nالاختيار (1-4)")
         
         if choice == "1":
             # تدريب عادي
@@ -573,10 +877,7 @@ class ArabicLlamaCLI:
             
         elif choice == "2":
             # تدريب مع مراقبة مباشرة
-            if RICH_AVAILABLE:
-                self.console.print("[green]🌐 بدء التدريب مع المراقبة المباشرة...[/green]")
-            else:
-                print("🌐 بدء التدريب مع المراقبة المباشرة...")
+            self.render.message("🌐 بدء التدريب مع المراقبة المباشرة...", "success")
             
             # تشغيل المراقب في الخلفية أولاً
             subprocess.Popen([sys.executable, 'training_monitor.py'])
@@ -587,118 +888,143 @@ class ArabicLlamaCLI:
             
         elif choice == "3":
             # فتح مراقب التدريب فقط
-            if RICH_AVAILABLE:
-                self.console.print("[blue]📊 فتح مراقب التدريب...[/blue]")
-            else:
-                print("📊 فتح مراقب التدريب...")
+            self.render.message("📊 فتح مراقب التدريب...", "info")
             
             subprocess.run([sys.executable, 'training_monitor.py'])
             
         elif choice == "4":
             return
         else:
-            if RICH_AVAILABLE:
-                self.console.print("[red]❌ اختيار غير صحيح[/red]")
-            else:
-                print("❌ اختيار غير صحيح")
+            self.render.message("❌ اختيار غير صحيح", "error")
     
     def system_settings(self):
         """إعدادات النظام"""
-        if RICH_AVAILABLE:
-            self.console.print("[bold blue]⚙️ إعدادات النظام[/bold blue]")
-        else:
-            print("⚙️ إعدادات النظام")
+        self.render.title("⚙️ إعدادات النظام")
         
         # عرض إعدادات النظام الحالية
-        print("الإعدادات الحالية:")
-        print("- مجلد التدريب:", self.training_dir)
-        print("- مجلد النتائج:", self.results_dir)
-        print("- مجلد النماذج:", self.models_dir)
+        self.render.table("الإعدادات الحالية",
+                          [("الإعداد", "cyan"), ("القيمة", "yellow")],
+                          [("مجلد التدريب", str(self.training_dir)),
+                           ("مجلد النتائج", str(self.results_dir)),
+                           ("مجلد النماذج", str(self.models_dir))])
     
     def run_diagnostics(self):
         """تشخيص المشاكل"""
-        if RICH_AVAILABLE:
-            self.console.print("[bold blue]🔍 تشخيص المشاكل[/bold blue]")
-        else:
-            print("🔍 تشخيص المشاكل")
+        self.render.title("🔍 تشخيص المشاكل")
         
         subprocess.run([sys.executable, 'system_check.py'])
     
     def show_help(self):
         """عرض المساعدة"""
-        if RICH_AVAILABLE:
-            help_text = Panel(
-                "[bold blue]❓ مساعدة النظام[/bold blue]\n\n"
-                "[yellow]🔧 إدارة النماذج:[/yellow] تحميل وإدارة نماذج اللاما\n"
-                "[yellow]📚 معالجة النصوص:[/yellow] تحويل وإصلاح النصوص العربية\n"
-                "[yellow]🚀 تدريب النماذج:[/yellow] إنشاء نماذج مخصصة\n"
-                "[yellow]💬 اختبار النماذج:[/yellow] اختبار النماذج تفاعلياً\n"
-                "[yellow]📊 النتائج:[/yellow] عرض نتائج الاختبارات\n"
-                "[yellow]⚙️ الإعدادات:[/yellow] تخصيص إعدادات النظام\n"
-                "[yellow]🔍 التشخيص:[/yellow] فحص مشاكل النظام",
-                border_style="blue"
-            )
-            self.console.print(help_text)
-        else:
-            print("\n❓ مساعدة النظام:")
-            print("🔧 إدارة النماذج: تحميل وإدارة نماذج اللاما")
-            print("📚 معالجة النصوص: تحويل وإصلاح النصوص العربية")
-            print("🚀 تدريب النماذج: إنشاء نماذج مخصصة")
-            print("💬 اختبار النماذج: اختبار النماذج تفاعلياً")
-            print("📊 النتائج: عرض نتائج الاختبارات")
-            print("⚙️ الإعدادات: تخصيص إعدادات النظام")
-            print("🔍 التشخيص: فحص مشاكل النظام")
+        self.render.help()
         
         input("\nاضغط Enter للمتابعة...")
     
     def remove_model(self):
         """حذف نموذج"""
+        model_name = self._choose_model("النماذج المثبتة", "اختر النموذج للحذف")
+        if model_name is None:
+            return
+        
+        if self.render.confirm(f"هل تريد حذف {model_name}؟"):
+            result = subprocess.run(['ollama', 'rm', model_name])
+            self._invalidate_cache('ollama_list')
+            if result.returncode == 0:
+                self.render.message(f"✅ تم حذف {model_name}", "success")
+            else:
+                self.render.message(f"❌ فشل حذف {model_name}", "error")
+    
+    def batch_evaluate(self):
+        """طرح مجموعة أسئلة على عدة نماذج بالتوازي وحفظ النتائج"""
+        if not AIOHTTP_AVAILABLE:
+            self.render.message("❌ مكتبة aiohttp غير متوفرة - تثبيت: pip install aiohttp", "error")
+            return
+        
         models = self.get_installed_models()
         if not models:
-            print("❌ لا توجد نماذج لحذفها")
+            self.render.message("❌ لا توجد نماذج مثبتة", "error")
             return
         
-        print("\nالنماذج المثبتة:")
-        for i, model in enumerate(models, 1):
-            print(f"{i}. {model}")
+        self.render.numbered("النماذج المثبتة", models)
         
-        choice = input(f"اختر النموذج للحذف (1-{len(models)}): ").strip()
+        choice = self.render.ask(f"اختر النماذج مفصولة بفواصل (1-{len(models)}) أو اتركه فارغاً للكل")
+        if choice:
+            selected = [models[int(c) - 1] for c in dict.fromkeys(choice.replace(' ', '').split(','))
+                        if c.isdigit() and 1 <= int(c) <= len(models)]
+        else:
+            selected = models
         
-        if choice.isdigit() and 1 <= int(choice) <= len(models):
-            model_name = models[int(choice)-1]
-            confirm = input(f"هل تريد حذف {model_name}؟ (y/n): ")
-            
-            if confirm.lower() in ['y', 'yes', 'نعم']:
-                result = subprocess.run(['ollama', 'rm', model_name])
-                if result.returncode == 0:
-                    print(f"✅ تم حذف {model_name}")
-                else:
-                    print(f"❌ فشل حذف {model_name}")
+        self.render.message("اكتب الأسئلة، سؤال في كل سطر (سطر فارغ للبدء):")
+        questions = []
+        while True:
+            question = input("> ").strip()
+            if not question:
+                break
+            questions.append(question)
+        
+        if not selected or not questions:
+            self.render.message("❌ لم يتم اختيار نماذج أو أسئلة", "error")
+            return
+        
+        self.render.message(f"🚀 تشغيل {len(selected) * len(questions)} طلب...", "success")
+        if UVLOOP_AVAILABLE:
+            uvloop.install()
+        results = asyncio.run(self._batch(questions, selected))
+        
+        for result in results:
+            if result['response']:
+                result['digest'] = self._model_digest(result['model'])
+                self.save_test_result(result)
+                self.render.answer(f"{result['model']} | {result['question']}", result['response'])
+            else:
+                self.render.message(f"❌ {result['model']} | {result['question']}: {result.get('error', '')}", "error")
+    
+    async def _batch(self, questions, models):
+        """إرسال كل الأسئلة لكل النماذج مع حد أقصى للطلبات المتزامنة"""
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        timeout = aiohttp.ClientTimeout(total=300)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            return await asyncio.gather(*[
+                self._ask(session, semaphore, model, question)
+                for model in models for question in questions
+            ])
+    
+    async def _ask(self, session, semaphore, model, prompt):
+        """طلب واحد إلى /api/generate؛ يرجع سجل نتيجة بنفس صيغة test_results.jsonl"""
+        result = {
+            "model": model,
+            "question": prompt,
+            "timestamp": datetime.now().isoformat(),
+            "response": ""
+        }
+        async with semaphore:
+            try:
+                async with session.post(f"{OLLAMA_URL}/api/generate",
+                                        json={'model': model, 'prompt': prompt, 'stream': False}) as response:
+                    data = await response.json()
+                    if data.get('error'):
+                        result["error"] = data['error']
+                    else:
+                        result["response"] = data.get('response', '').strip()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                result["error"] = str(e) or type(e).__name__
+        return result
     
     def show_model_info(self):
         """عرض معلومات النموذج"""
-        models = self.get_installed_models()
-        if not models:
-            print("❌ لا توجد نماذج مثبتة")
+        model_name = self._choose_model("النماذج المثبتة", "اختر النموذج")
+        if model_name is None:
             return
         
-        print("\nالنماذج المثبتة:")
-        for i, model in enumerate(models, 1):
-            print(f"{i}. {model}")
+        self.render.title(f"📋 معلومات {model_name}:")
         
-        choice = input(f"اختر النموذج (1-{len(models)}): ").strip()
+        result = subprocess.run(['ollama', 'show', model_name], 
+                              capture_output=True, text=True)
         
-        if choice.isdigit() and 1 <= int(choice) <= len(models):
-            model_name = models[int(choice)-1]
-            print(f"\n📋 معلومات {model_name}:")
-            
-            result = subprocess.run(['ollama', 'show', model_name], 
-                                  capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                print(result.stdout)
-            else:
-                print("❌ لا يمكن الحصول على معلومات النموذج")
+        if result.returncode == 0:
+            print(result.stdout)
+        else:
+            self.render.message("❌ لا يمكن الحصول على معلومات النموذج", "error")
 
 def main():
     """تشغيل واجهة التحكم"""
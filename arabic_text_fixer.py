@@ -4,54 +4,94 @@ Arabic Text Fixer - حل مشكلة النصوص العربية المعكوسة
 يحل مشكلة الأحرف العربية المفككة والمعكوسة في Python
 """
 
+import importlib.util
 import os
+import re
+import subprocess
 import sys
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
 # تثبيت المكتبات المطلوبة إذا لم تكن موجودة
 def install_arabic_libs():
     """تثبيت مكتبات معالجة النصوص العربية"""
-    try:
-        import arabic_reshaper
-        from bidi.algorithm import get_display
-        return True
-    except ImportError:
-        print("📦 تثبيت مكتبات معالجة النصوص العربية...")
-        print("Installing Arabic text processing libraries...")
-        
-        import subprocess
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "arabic-reshaper", "python-bidi"])
-        
-        print("✅ تم تثبيت المكتبات بنجاح!")
+    # find_spec يبحث عن الحزمة دون استيرادها - الاستيراد الفعلي مرة واحدة أدناه
+    if importlib.util.find_spec('arabic_reshaper') and importlib.util.find_spec('bidi'):
         return True
+    
+    print("📦 تثبيت مكتبات معالجة النصوص العربية...")
+    print("Installing Arabic text processing libraries...")
+    
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "arabic-reshaper", "python-bidi"])
+    importlib.invalidate_caches()
+    
+    print("✅ تم تثبيت المكتبات بنجاح!")
+    return True
 
 # تأكد من تثبيت المكتبات
 install_arabic_libs()
 
 import arabic_reshaper
-from bidi.algorithm import get_display
+from bidi_display import get_display
+
+# إعدادات المُشكِّل صريحة (نفس القيم الافتراضية) حتى لا يُبحث عن ملف إعدادات
+RESHAPER_CONFIG = {
+    'language': 'Arabic',
+    'delete_harakat': True,
+    'support_ligatures': True,
+}
+
+# عدد النصوص المُصلحة المحفوظة - الأسطر المكررة في ملفات التدريب شائعة
+FIX_CACHE_SIZE = 8192
+
+# نطاقات الحروف العربية وأشكال العرض - النص الخالي منها لا يحتاج إصلاحاً
+ARABIC_RANGES = [
+    (0x0600, 0x06FF),  # Arabic
+    (0x0750, 0x077F),  # Arabic Supplement
+    (0x08A0, 0x08FF),  # Arabic Extended-A
+    (0xFB50, 0xFDFF),  # Arabic Presentation Forms-A
+    (0xFE70, 0xFEFF),  # Arabic Presentation Forms-B
+]
+ARABIC_PATTERN = re.compile('[' + ''.join(f'{chr(start)}-{chr(end)}' for start, end in ARABIC_RANGES) + ']')
+
+# حجم مخزن القراءة/الكتابة عند معالجة الملفات سطراً بسطر
+FILE_BUFFER_SIZE = 1 << 20
+
+# مُشكِّل واحد لكل عملية - تُقرأ إعداداته مرة واحدة فقط
+_RESHAPER = arabic_reshaper.ArabicReshaper(configuration=RESHAPER_CONFIG)
+
+@lru_cache(maxsize=FIX_CACHE_SIZE)
+def _fix_cached(text):
+    """إعادة التشكيل + ضبط الاتجاه مع حفظ النتيجة لكل نص"""
+    return get_display(_RESHAPER.reshape(text))
+
+def fix(text):
+    """
+    إصلاح نص عربي دون إنشاء ArabicTextProcessor
+    Fix Arabic text; usable directly from worker processes
+    """
+    # مسار سريع: أسطر الروابط والأكواد والنصوص اللاتينية تعود كما هي
+    if not text or text.isascii() or ARABIC_PATTERN.search(text) is None:
+        return text
+    
+    # توحيد الصيغ المتكافئة (ا + ◌ٓ ← آ) قبل التشكيل وقبل البحث في الذاكرة المؤقتة
+    return _fix_cached(unicodedata.normalize('NFC', text))
 
 class ArabicTextProcessor:
     """معالج النصوص العربية لحل مشاكل العرض"""
     
     def __init__(self):
-        self.reshaper = arabic_reshaper.ArabicReshaper()
+        self.reshaper = _RESHAPER
     
     def fix_arabic_text(self, text):
         """
         إصلاح النص العربي المعكوس أو المفكك
         Fix reversed or broken Arabic text
         """
-        if not text:
-            return text
-        
         try:
-            # إعادة تشكيل الأحرف العربية
-            reshaped_text = self.reshaper.reshape(text)
-            
-            # ضبط اتجاه النص (من اليمين إلى اليسار)
-            bidi_text = get_display(reshaped_text)
-            
-            return bidi_text
+            # إعادة تشكيل الأحرف العربية وضبط الاتجاه (من اليمين إلى اليسار)
+            return fix(text)
         except Exception as e:
             print(f"خطأ في معالجة النص: {e}")
             return text
@@ -66,14 +106,14 @@ class ArabicTextProcessor:
             output_file = f"{name}_fixed{ext}"
         
         try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # إصلاح النص
-            fixed_content = self.fix_arabic_text(content)
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(fixed_content)
+            # إصلاح كل سطر على حدة بدلاً من تحميل الملف كاملاً في الذاكرة
+            with open(input_file, 'r', encoding='utf-8', buffering=FILE_BUFFER_SIZE) as fin, \
+                 open(output_file, 'w', encoding='utf-8', buffering=FILE_BUFFER_SIZE) as fout:
+                for line in fin:
+                    text = line.rstrip('\n')
+                    fout.write(self.fix_arabic_text(text))
+                    if len(text) != len(line):
+                        fout.write('\n')
             
             print(f"✅ تم إصلاح الملف: {output_file}")
             return output_file
@@ -103,6 +143,10 @@ class ArabicTextProcessor:
             print(f"   Original: {text}")
             print(f"   Fixed: {fixed_text}")
 
+def _process_one_file(file_path):
+    # المعالج لا يحمل حالة - المُشكِّل يُنشأ مرة واحدة عند استيراد الوحدة في كل عملية
+    return ArabicTextProcessor().process_file(file_path)
+
 def fix_arabic_in_terminal():
     """إصلاح عرض النصوص العربية في Terminal"""
     print("🔧 إعداد Terminal لعرض النصوص العربية...")
@@ -166,9 +210,14 @@ def main():
             # إصلاح جميع ملفات التدريب
             training_dir = "training_data"
             if os.path.exists(training_dir):
-                for file in os.listdir(training_dir):
-                    if file.endswith(('.txt', '.md')):
-                        file_path = os.path.join(training_dir, file)
+                files = [os.path.join(training_dir, file) for file in os.listdir(training_dir)
+                         if file.endswith(('.txt', '.md'))]
+                if len(files) > 1:
+                    # إعادة التشكيل و BiDi بايثون خالص - التوزيع على عمليات يستفيد من كل الأنوية
+                    with ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as pool:
+                        list(pool.map(_process_one_file, files))
+                else:
+                    for file_path in files:
                         processor.process_file(file_path)
             else:
                 print("❌ مجلد التدريب غير موجود")
@@ -0,0 +1,34 @@
+"""
+Bidi Display Helper
+Visual reordering of Arabic text for terminals without bidi support, using the
+Rust backend of python-bidi >= 0.5 wherever it matches the Python algorithm
+"""
+
+import re
+
+from bidi.algorithm import get_display as _python_display
+
+# python-bidi >= 0.5 binds the Rust unicode-bidi crate; older releases only
+# ship the pure-Python bidi.algorithm
+try:
+    from bidi import get_display as _rust_display
+    from bidi.mirror import MIRRORED
+    RUST_BIDI_AVAILABLE = True
+except ImportError:
+    RUST_BIDI_AVAILABLE = False
+
+if RUST_BIDI_AVAILABLE:
+    # The Rust backend does not mirror brackets, reorders across line breaks
+    # and treats tabs/explicit embeddings differently; text containing any
+    # of these keeps using the Python algorithm so output never changes
+    _PYTHON_ONLY_PATTERN = re.compile('[' + re.escape(
+        ''.join(MIRRORED)
+        + '\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f\x85\u2028\u2029'
+        + '\u202a\u202b\u202c\u202d\u202e\u2066\u2067\u2068\u2069'
+    ) + ']')
+
+def get_display(text: str) -> str:
+    """Same result as bidi.algorithm.get_display(text)"""
+    if RUST_BIDI_AVAILABLE and _PYTHON_ONLY_PATTERN.search(text) is None:
+        return _rust_display(text)
+    return _python_display(text)
@@ -4,9 +4,75 @@ Demo script to test the training monitor interface
 """
 
 import time
-import random
+import numpy as np
 from training_monitor import start_monitor
 
+# Compile the schedule when numba is available
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        return lambda fn: fn
+
+@njit(cache=True)
+def _schedule_kernel(steps, jitter, loss_start, loss_slope, loss_floor,
+                     base_lr, lr_decay, decay_every):
+    out = np.empty((len(steps), 2))
+    for i in range(len(steps)):
+        out[i, 0] = max(loss_floor, loss_start - steps[i] * loss_slope + jitter[i])
+        out[i, 1] = base_lr * lr_decay ** (steps[i] // decay_every)
+    return out
+
+def training_schedule(total_steps, loss_start, loss_slope, loss_floor, noise,
+                      base_lr, lr_decay, decay_every):
+    """Simulated (loss, learning_rate) rows for steps 1..total_steps"""
+    steps = np.arange(1, total_steps + 1)
+    jitter = np.random.uniform(-noise, noise, total_steps) if noise > 0 else np.zeros(total_steps)
+    if NUMBA_AVAILABLE:
+        return _schedule_kernel(steps, jitter, loss_start, loss_slope, loss_floor,
+                                base_lr, lr_decay, decay_every)
+    
+    # Without numba the same formulas vectorize in NumPy instead of looping in Python
+    return np.column_stack((
+        np.maximum(loss_floor, loss_start - steps * loss_slope + jitter),
+        base_lr * lr_decay ** (steps // decay_every)
+    ))
+
+class UpdateBatcher:
+    """Queue monitor updates; send them in one push_many call every `interval` seconds or `max_pending` calls
+    
+    Each status update keeps its own fields and timestamp, so every loss
+    point still reaches the history; log lines keep their place between them.
+    """
+    
+    def __init__(self, monitor, max_pending=32, interval=0.25):
+        self.monitor = monitor
+        self.max_pending = max_pending
+        self.interval = interval
+        self._events = []
+        self._last_flush = time.monotonic()
+    
+    def push(self, status, **fields):
+        self._events.append(('status', status, fields, time.time()))
+        self._queued()
+    
+    def log(self, message, level='info'):
+        self._events.append(('log', message, level, time.time()))
+        self._queued()
+    
+    def _queued(self):
+        if len(self._events) >= self.max_pending or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+    
+    def flush(self):
+        if self._events:
+            self.monitor.push_many(self._events)
+            self._events = []
+        self._last_flush = time.monotonic()
+
 def demo_training_session():
     """Simulate a training session with the monitor"""
     print("🚀 Starting training monitor demo...")
@@ -26,10 +92,19 @@ def demo_training_session():
     print("📊 Training session started. Check your browser at http://localhost:5000")
     print("🔄 Simulating training progress...")
     
+    # Precompute the whole run; the loop below only dispatches and sleeps
+    total_steps = 160
+    schedule = training_schedule(total_steps, 2.0, 0.001, 0.1, 0.1, 0.001, 0.95, 100)
+    steps = np.arange(1, total_steps + 1)
+    # 2 seconds per step simulation; tolist() keeps plain ints for the JSON broadcast
+    elapsed = (steps * 2).tolist()
+    remaining = ((total_steps - steps) * 2).tolist()
+    batcher = UpdateBatcher(monitor)
+    
     # Simulate training progress
     for epoch in range(1, 6):
-        monitor.add_log(f"Starting epoch {epoch}/5")
-        monitor.update_training_status(
+        batcher.log(f"Starting epoch {epoch}/5")
+        batcher.push(
             'training',
             current_epoch=epoch,
             current_step=(epoch-1) * 32
@@ -38,13 +113,11 @@ def demo_training_session():
         # Simulate steps within epoch
         for step in range(32):
             current_step = (epoch-1) * 32 + step + 1
-            loss = max(0.1, 2.0 - (current_step * 0.001) + random.uniform(-0.1, 0.1))
-            learning_rate = 0.001 * (0.95 ** (current_step // 100))
-            
-            elapsed_time = current_step * 2  # 2 seconds per step simulation
-            remaining_time = (160 - current_step) * 2
+            loss, learning_rate = schedule[current_step - 1]
+            elapsed_time = elapsed[current_step - 1]
+            remaining_time = remaining[current_step - 1]
             
-            monitor.update_training_status(
+            batcher.push(
                 'training',
                 current_step=current_step,
                 loss=loss,
@@ -54,13 +127,14 @@ def demo_training_session():
             )
             
             if step % 5 == 0:
-                monitor.add_log(f"Epoch {epoch}, Step {step+1}: Loss = {loss:.4f}")
+                batcher.log(f"Epoch {epoch}, Step {step+1}: Loss = {loss:.4f}")
             
             time.sleep(0.5)  # Simulate processing time
         
-        monitor.add_log(f"Completed epoch {epoch}/5")
+        batcher.log(f"Completed epoch {epoch}/5")
     
     # Finish training
+    batcher.flush()
     monitor.add_log("Training completed successfully!")
     monitor.finish_training_session()
     
@@ -12,13 +12,75 @@ import sys
 import subprocess
 import platform
 import json
+import csv
+import io
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
 
+# Upper bound for a single detection tool; nvidia-smi can take a few seconds
+# to initialise the driver when persistence mode is off
+PROBE_TIMEOUT = 10
+
+# nvidia-smi query shared by the Linux and Windows probes
+NVIDIA_SMI_QUERY = ['nvidia-smi', '--query-gpu=name,memory.total,memory.free', '--format=csv,noheader,nounits']
+
+# Timed matrix multiplications per benchmark (after one untimed warmup); the median is reported
+BENCH_ITERATIONS = 10
+
+# GPU matrix size bounds: large enough to be compute-bound, small enough to fit
+MIN_BENCH_SIZE = 1024
+MAX_BENCH_SIZE = 8192
+
+# The CPU side is capped so the comparison doesn't take minutes; speedup
+# compares throughput, so the two sizes don't need to match
+MAX_CPU_BENCH_SIZE = 2048
+
+# GPU vendors PyTorch can drive (CUDA, or ROCm behind the same torch.cuda API)
+TORCH_GPU_VENDORS = ('NVIDIA', 'AMD')
+
+def _mib(value):
+    """nvidia-smi memory field as an int (MiB), None for values like '[N/A]'"""
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+def _run_probe(command):
+    """Run one detection command; None if the tool is missing, fails to start or hangs"""
+    try:
+        return subprocess.run(command, capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
 class GPUTester:
     def __init__(self):
         self.gpu_info = {}
         self.cuda_available = False
         self.rocm_available = False
+        self._device_props = {}
+        self.hardware_probed = False
+    
+    @cached_property
+    def system(self):
+        return platform.system()
+    
+    @cached_property
+    def architecture(self):
+        return platform.architecture()[0]
+    
+    @cached_property
+    def processor(self):
+        # platform.processor() may spawn uname or query the registry
+        return platform.processor()
+    
+    def device_properties(self, index=0):
+        """torch.cuda.get_device_properties, queried from the driver once per device"""
+        if index not in self._device_props:
+            import torch
+            self._device_props[index] = torch.cuda.get_device_properties(index)
+        return self._device_props[index]
         
     def detect_gpu_hardware(self):
         """Detect GPU hardware information"""
@@ -26,7 +88,7 @@ class GPUTester:
         print("Detecting GPU hardware...")
         print("=" * 50)
         
-        system = platform.system().lower()
+        system = self.system.lower()
         
         if system == "linux":
             self._detect_linux_gpu()
@@ -35,95 +97,97 @@ class GPUTester:
         elif system == "darwin":  # macOS
             self._detect_macos_gpu()
         
+        self.hardware_probed = True
         return self.gpu_info
     
+    def _run_probes(self, commands):
+        """Launch all detection commands at once; wall time is the slowest probe, not the sum"""
+        with ThreadPoolExecutor(max_workers=len(commands)) as pool:
+            futures = {name: pool.submit(_run_probe, command)
+                       for name, command in commands.items()}
+            return {name: future.result() for name, future in futures.items()}
+    
+    def _add_nvidia_gpus(self, output):
+        """Parse nvidia-smi CSV rows (name, total MiB, free MiB) into gpu_info; returns the GPU count"""
+        count = 0
+        for row in csv.reader(io.StringIO(output), skipinitialspace=True):
+            if len(row) >= 3:
+                self.gpu_info[f'nvidia_gpu_{count}'] = {
+                    'type': 'NVIDIA',
+                    'name': row[0].strip(),
+                    'total_memory_mb': _mib(row[1]),
+                    'free_memory_mb': _mib(row[2]),
+                    'driver': 'NVIDIA'
+                }
+                count += 1
+        return count
+    
     def _detect_linux_gpu(self):
         """Detect GPU on Linux"""
-        try:
-            # Check for NVIDIA GPUs
-            result = subprocess.run(['nvidia-smi', '--query-gpu=name,memory.total,memory.free', '--format=csv,noheader,nounits'], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                for i, line in enumerate(lines):
-                    if line.strip():
-                        parts = line.split(', ')
-                        if len(parts) >= 3:
-                            self.gpu_info[f'nvidia_gpu_{i}'] = {
-                                'type': 'NVIDIA',
-                                'name': parts[0],
-                                'total_memory': f"{parts[1]} MB",
-                                'free_memory': f"{parts[2]} MB",
-                                'driver': 'NVIDIA'
-                            }
-                print(f"✅ وُجد {len(lines)} كرت NVIDIA")
-                print(f"Found {len(lines)} NVIDIA GPU(s)")
-        except FileNotFoundError:
+        probes = self._run_probes({
+            'nvidia': NVIDIA_SMI_QUERY,
+            'rocm': ['rocm-smi'],
+            'lspci': ['lspci'],
+        })
+        
+        # Check for NVIDIA GPUs
+        result = probes['nvidia']
+        if result is None:
             print("❌ NVIDIA drivers not found")
+        elif result.returncode == 0:
+            count = self._add_nvidia_gpus(result.stdout)
+            print(f"✅ وُجد {count} كرت NVIDIA")
+            print(f"Found {count} NVIDIA GPU(s)")
         
-        try:
-            # Check for AMD GPUs
-            result = subprocess.run(['rocm-smi'], capture_output=True, text=True)
-            if result.returncode == 0:
-                print("✅ وُجد كرت AMD ROCm")
-                print("Found AMD ROCm GPU")
-                self.rocm_available = True
-        except FileNotFoundError:
-            pass
+        # Check for AMD GPUs
+        result = probes['rocm']
+        if result is not None and result.returncode == 0:
+            print("✅ وُجد كرت AMD ROCm")
+            print("Found AMD ROCm GPU")
+            self.rocm_available = True
         
         # Check general GPU info with lspci
-        try:
-            result = subprocess.run(['lspci'], capture_output=True, text=True)
-            gpu_lines = [line for line in result.stdout.split('\n') if 'VGA' in line or 'Display' in line or '3D' in line]
-            
-            for i, line in enumerate(gpu_lines):
-                if f'general_gpu_{i}' not in [k for k in self.gpu_info.keys() if k.startswith('general')]:
-                    self.gpu_info[f'general_gpu_{i}'] = {
-                        'type': 'General',
-                        'name': line.split(': ')[-1] if ': ' in line else line,
-                        'info': 'Detected via lspci'
-                    }
-            
-            print(f"📋 إجمالي كروت الرسوميات: {len(gpu_lines)}")
-            print(f"Total graphics cards detected: {len(gpu_lines)}")
-            
-        except FileNotFoundError:
+        result = probes['lspci']
+        if result is None:
             print("❌ lspci not available")
+            return
+        
+        gpu_lines = [line for line in result.stdout.split('\n') if 'VGA' in line or 'Display' in line or '3D' in line]
+        
+        for i, line in enumerate(gpu_lines):
+            if f'general_gpu_{i}' not in [k for k in self.gpu_info.keys() if k.startswith('general')]:
+                self.gpu_info[f'general_gpu_{i}'] = {
+                    'type': 'General',
+                    'name': line.split(': ')[-1] if ': ' in line else line,
+                    'info': 'Detected via lspci'
+                }
+        
+        print(f"📋 إجمالي كروت الرسوميات: {len(gpu_lines)}")
+        print(f"Total graphics cards detected: {len(gpu_lines)}")
     
     def _detect_windows_gpu(self):
         """Detect GPU on Windows"""
-        try:
-            # Check NVIDIA on Windows
-            result = subprocess.run(['nvidia-smi', '--query-gpu=name,memory.total', '--format=csv,noheader,nounits'], 
-                                  capture_output=True, text=True, shell=True)
-            if result.returncode == 0:
-                lines = result.stdout.strip().split('\n')
-                for i, line in enumerate(lines):
-                    if line.strip():
-                        parts = line.split(', ')
-                        if len(parts) >= 2:
-                            self.gpu_info[f'nvidia_gpu_{i}'] = {
-                                'type': 'NVIDIA',
-                                'name': parts[0],
-                                'total_memory': f"{parts[1]} MB"
-                            }
-        except:
-            pass
+        probes = self._run_probes({
+            'nvidia': NVIDIA_SMI_QUERY,
+            # PowerShell CIM for general GPU detection (wmic is deprecated and missing on newer Windows)
+            'cim': ['powershell', '-NoProfile', '-Command',
+                    'Get-CimInstance Win32_VideoController | Select-Object -ExpandProperty Name'],
+        })
         
-        # Use wmic for general GPU detection on Windows
-        try:
-            result = subprocess.run(['wmic', 'path', 'win32_VideoController', 'get', 'name'], 
-                                  capture_output=True, text=True, shell=True)
-            if result.returncode == 0:
-                lines = [line.strip() for line in result.stdout.split('\n') if line.strip() and line.strip() != 'Name']
-                for i, name in enumerate(lines):
-                    if name:
-                        self.gpu_info[f'windows_gpu_{i}'] = {
-                            'type': 'Windows GPU',
-                            'name': name
-                        }
-        except:
-            pass
+        # Check NVIDIA on Windows
+        result = probes['nvidia']
+        if result is not None and result.returncode == 0:
+            self._add_nvidia_gpus(result.stdout)
+        
+        result = probes['cim']
+        if result is not None and result.returncode == 0:
+            lines = [line.strip() for line in result.stdout.split('\n') if line.strip()]
+            for i, name in enumerate(lines):
+                if name:
+                    self.gpu_info[f'windows_gpu_{i}'] = {
+                        'type': 'Windows GPU',
+                        'name': name
+                    }
     
     def _detect_macos_gpu(self):
         """Detect GPU on macOS"""
@@ -139,12 +203,27 @@ class GPUTester:
         except:
             pass
     
+    def _has_torch_capable_gpu(self):
+        for key, info in self.gpu_info.items():
+            name = info.get('name', '').upper()
+            if key.startswith('nvidia_gpu') or any(vendor in name for vendor in TORCH_GPU_VENDORS):
+                return True
+        return False
+    
     def check_cuda_support(self):
         """Check CUDA support"""
         print("\n🔧 فحص دعم CUDA...")
         print("Checking CUDA support...")
         print("=" * 30)
         
+        # Importing torch loads hundreds of MB of libraries; skip it when the
+        # hardware probe found no NVIDIA or AMD GPU by any means (nvidia-smi
+        # may be missing from PATH while lspci or CIM still list the card)
+        if self.hardware_probed and not self.rocm_available and not self._has_torch_capable_gpu():
+            print("❌ CUDA غير متاح - لا يوجد كرت NVIDIA أو ROCm")
+            print("CUDA not applicable - no NVIDIA driver or ROCm found")
+            return False
+        
         try:
             import torch
             if torch.cuda.is_available():
@@ -154,8 +233,9 @@ class GPUTester:
                 print(f"CUDA available! Device count: {device_count}")
                 
                 for i in range(device_count):
-                    device_name = torch.cuda.get_device_name(i)
-                    memory = torch.cuda.get_device_properties(i).total_memory / 1024**3
+                    props = self.device_properties(i)
+                    device_name = props.name
+                    memory = props.total_memory / 1024**3
                     print(f"  🎯 جهاز {i}: {device_name} ({memory:.1f} GB)")
                     print(f"  Device {i}: {device_name} ({memory:.1f} GB)")
                 
@@ -170,6 +250,69 @@ class GPUTester:
             print("PyTorch not installed")
             return False
     
+    def _time_cpu_matmul(self, a, b):
+        """Median seconds per CPU matmul, excluding allocation and first-call setup"""
+        import torch
+        import time
+        
+        torch.mm(a, b)  # warmup
+        samples = []
+        for _ in range(BENCH_ITERATIONS):
+            start_time = time.perf_counter()
+            torch.mm(a, b)
+            samples.append(time.perf_counter() - start_time)
+        return statistics.median(samples)
+    
+    def _time_gpu_matmul(self, a, b):
+        """Median seconds per GPU matmul measured with CUDA events on the device itself"""
+        import torch
+        
+        # Warmup: cuBLAS handle creation and kernel selection happen on the first call
+        torch.mm(a, b)
+        torch.cuda.synchronize()
+        
+        events = [(torch.cuda.Event(enable_timing=True), torch.cuda.Event(enable_timing=True))
+                  for _ in range(BENCH_ITERATIONS)]
+        for start, end in events:
+            start.record()
+            torch.mm(a, b)
+            end.record()
+        torch.cuda.synchronize()
+        return statistics.median(start.elapsed_time(end) for start, end in events) / 1000
+    
+    def _benchmark_size(self):
+        """Matrix size using ~25% of free VRAM for three FP32 NxN matrices (12*N^2 bytes)"""
+        import torch
+        
+        free, _ = torch.cuda.mem_get_info()
+        size = int((free * 0.25 / 12) ** 0.5)
+        return max(MIN_BENCH_SIZE, min(MAX_BENCH_SIZE, size))
+    
+    def _benchmark_precisions(self, a, b):
+        """Seconds per GPU matmul for FP32, TF32, FP16 and (if supported) BF16"""
+        import torch
+        
+        matmul_tf32 = torch.backends.cuda.matmul.allow_tf32
+        cudnn_tf32 = torch.backends.cudnn.allow_tf32
+        timings = {}
+        try:
+            torch.backends.cuda.matmul.allow_tf32 = False
+            torch.backends.cudnn.allow_tf32 = False
+            timings['FP32'] = self._time_gpu_matmul(a, b)
+            
+            # TF32 runs FP32 inputs on tensor cores (Ampere and newer)
+            torch.backends.cuda.matmul.allow_tf32 = True
+            torch.backends.cudnn.allow_tf32 = True
+            timings['TF32'] = self._time_gpu_matmul(a, b)
+        finally:
+            torch.backends.cuda.matmul.allow_tf32 = matmul_tf32
+            torch.backends.cudnn.allow_tf32 = cudnn_tf32
+        
+        timings['FP16'] = self._time_gpu_matmul(a.half(), b.half())
+        if torch.cuda.is_bf16_supported():
+            timings['BF16'] = self._time_gpu_matmul(a.bfloat16(), b.bfloat16())
+        return timings
+    
     def test_gpu_performance(self):
         """Test GPU performance with a simple benchmark"""
         print("\n⚡ اختبار أداء GPU...")
@@ -178,46 +321,67 @@ class GPUTester:
         
         try:
             import torch
-            import time
             
             if torch.cuda.is_available():
                 device = torch.device('cuda')
-                print(f"🚀 اختبار على: {torch.cuda.get_device_name()}")
-                print(f"Testing on: {torch.cuda.get_device_name()}")
+                device_name = self.device_properties(torch.cuda.current_device()).name
+                print(f"🚀 اختبار على: {device_name}")
+                print(f"Testing on: {device_name}")
+                
+                # Matrix multiplication test sized to the card's free memory
+                size = self._benchmark_size()
                 
-                # Simple matrix multiplication test
-                size = 1000
-                print(f"📊 ضرب مصفوفات {size}x{size}...")
-                print(f"Matrix multiplication {size}x{size}...")
+                # GPU test; inputs are allocated outside the timed region so only the matmul is measured
+                while True:
+                    print(f"📊 ضرب مصفوفات {size}x{size}...")
+                    print(f"Matrix multiplication {size}x{size}...")
+                    try:
+                        a_gpu = torch.randn(size, size, device=device)
+                        b_gpu = torch.randn(size, size, device=device)
+                        timings = self._benchmark_precisions(a_gpu, b_gpu)
+                        break
+                    except RuntimeError as e:
+                        # torch.cuda.OutOfMemoryError subclasses RuntimeError
+                        if 'out of memory' not in str(e) or size <= MIN_BENCH_SIZE:
+                            raise
+                        a_gpu = b_gpu = None
+                        torch.cuda.empty_cache()
+                        # One last try at the floor, then the error propagates
+                        size = max(MIN_BENCH_SIZE, size // 2)
+                        print("⚠️ الذاكرة غير كافية - تصغير المصفوفات")
+                        print("Out of GPU memory - retrying with smaller matrices")
+                gpu_time = timings['FP32']
                 
                 # CPU test
-                start_time = time.time()
-                a_cpu = torch.randn(size, size)
-                b_cpu = torch.randn(size, size)
-                c_cpu = torch.mm(a_cpu, b_cpu)
-                cpu_time = time.time() - start_time
+                cpu_size = min(size, MAX_CPU_BENCH_SIZE)
+                a_cpu = torch.randn(cpu_size, cpu_size)
+                b_cpu = torch.randn(cpu_size, cpu_size)
+                cpu_time = self._time_cpu_matmul(a_cpu, b_cpu)
                 
-                # GPU test
-                start_time = time.time()
-                a_gpu = torch.randn(size, size, device=device)
-                b_gpu = torch.randn(size, size, device=device)
-                torch.cuda.synchronize()  # Wait for GPU operations
-                c_gpu = torch.mm(a_gpu, b_gpu)
-                torch.cuda.synchronize()
-                gpu_time = time.time() - start_time
+                # 2*N^3 floating point operations per NxN matmul
+                flops = 2 * size ** 3
+                gflops = {name: flops / seconds / 1e9 for name, seconds in timings.items()}
+                cpu_gflops = 2 * cpu_size ** 3 / cpu_time / 1e9
                 
-                speedup = cpu_time / gpu_time
-                print(f"⏱️  وقت CPU: {cpu_time:.3f} ثانية")
-                print(f"CPU time: {cpu_time:.3f} seconds")
-                print(f"⚡ وقت GPU: {gpu_time:.3f} ثانية")
-                print(f"GPU time: {gpu_time:.3f} seconds")
+                speedup = gflops['FP32'] / cpu_gflops
+                print(f"⏱️  وقت CPU ({cpu_size}x{cpu_size}): {cpu_time:.3f} ثانية")
+                print(f"CPU time ({cpu_size}x{cpu_size}): {cpu_time:.3f} seconds")
+                print(f"⚡ وقت GPU ({size}x{size}): {gpu_time:.3f} ثانية")
+                print(f"GPU time ({size}x{size}): {gpu_time:.3f} seconds")
                 print(f"🚀 تسريع GPU: {speedup:.2f}x")
                 print(f"GPU speedup: {speedup:.2f}x")
+                print("📈 الأداء حسب الدقة:")
+                print("Throughput by precision:")
+                for name, value in gflops.items():
+                    print(f"  {name}: {value:.1f} GFLOP/s")
                 
                 return {
+                    'size': size,
                     'cpu_time': cpu_time,
                     'gpu_time': gpu_time,
-                    'speedup': speedup
+                    'speedup': speedup,
+                    'cpu_gflops': cpu_gflops,
+                    'gflops': gflops
                 }
             else:
                 print("❌ لا يمكن اختبار GPU - غير متاح")
@@ -274,9 +438,9 @@ class GPUTester:
         
         report = {
             'system_info': {
-                'platform': platform.system(),
-                'architecture': platform.architecture()[0],
-                'processor': platform.processor()
+                'platform': self.system,
+                'architecture': self.architecture,
+                'processor': self.processor
             },
             'gpu_hardware': self.gpu_info,
             'cuda_available': self.cuda_available,
@@ -3,11 +3,54 @@
 Integration demo showing the complete Arabic Llama training system with real-time monitoring
 """
 
+import sys
 import time
 import subprocess
-import threading
 from pathlib import Path
-from training_monitor import start_monitor
+from training_monitor import MonitorClient
+from demo_training_monitor import training_schedule, UpdateBatcher
+
+def simulate_training(monitor):
+    """Simulate a 3-epoch training run reporting to the monitor"""
+    monitor.start_training_session(
+        model_name="arabic-llama-custom",
+        total_epochs=3,
+        dataset_size=500,
+        batch_size=16
+    )
+    
+    monitor.add_log("Starting Arabic Llama fine-tuning process")
+    monitor.add_log("تم بدء عملية الضبط الدقيق للاما العربي")
+    
+    # Simulate training steps
+    schedule = training_schedule(96, 1.5, 0.01, 0.2, 0.0, 0.001, 0.98, 10)
+    batcher = UpdateBatcher(monitor)
+    for epoch in range(1, 4):
+        batcher.log(f"Starting epoch {epoch}/3 - بدء العصر {epoch}/3")
+        
+        for step in range(32):
+            current_step = (epoch-1) * 32 + step + 1
+            loss, learning_rate = schedule[current_step - 1]
+            
+            batcher.push(
+                'training',
+                current_epoch=epoch,
+                current_step=current_step,
+                loss=loss,
+                learning_rate=learning_rate,
+                elapsed_time=current_step * 3
+            )
+            
+            if step % 8 == 0:
+                batcher.log(f"Epoch {epoch}, Step {step+1}: Loss = {loss:.4f}")
+            
+            time.sleep(0.2)
+        
+        batcher.log(f"Completed epoch {epoch}/3 - اكتمل العصر {epoch}/3")
+    
+    batcher.flush()
+    monitor.add_log("Training completed successfully! - اكتمل التدريب بنجاح!")
+    monitor.finish_training_session()
 
 def run_training_with_monitor():
     """Run a complete training session with real-time monitoring"""
@@ -25,55 +68,27 @@ def run_training_with_monitor():
     print("🌐 Starting real-time training monitor...")
     print("📊 Monitor will be available at: http://localhost:5000")
     
-    # Start the monitor in a separate thread
-    def start_monitor_thread():
-        monitor = start_monitor(port=5000, open_browser=True)
-        
-        # Simulate a training process
-        time.sleep(3)
-        
-        monitor.start_training_session(
-            model_name="arabic-llama-custom",
-            total_epochs=3,
-            dataset_size=500,
-            batch_size=16
-        )
-        
-        monitor.add_log("Starting Arabic Llama fine-tuning process")
-        monitor.add_log("تم بدء عملية الضبط الدقيق للاما العربي")
-        
-        # Simulate training steps
-        for epoch in range(1, 4):
-            monitor.add_log(f"Starting epoch {epoch}/3 - بدء العصر {epoch}/3")
-            
-            for step in range(32):
-                current_step = (epoch-1) * 32 + step + 1
-                loss = max(0.2, 1.5 - (current_step * 0.01))
-                learning_rate = 0.001 * (0.98 ** (current_step // 10))
-                
-                monitor.update_training_status(
-                    'training',
-                    current_epoch=epoch,
-                    current_step=current_step,
-                    loss=loss,
-                    learning_rate=learning_rate,
-                    elapsed_time=current_step * 3
-                )
-                
-                if step % 8 == 0:
-                    monitor.add_log(f"Epoch {epoch}, Step {step+1}: Loss = {loss:.4f}")
-                
-                time.sleep(0.2)
-            
-            monitor.add_log(f"Completed epoch {epoch}/3 - اكتمل العصر {epoch}/3")
-        
-        monitor.add_log("Training completed successfully! - اكتمل التدريب بنجاح!")
-        monitor.finish_training_session()
-    
-    # Start monitor in background
-    monitor_thread = threading.Thread(target=start_monitor_thread, daemon=True)
-    monitor_thread.start()
-    
+    # The monitor runs in its own process so its HTTP/SocketIO handlers
+    # never compete with the trainer for the GIL. -m resolves modules from
+    # the working directory, so the child runs from this script's folder
+    monitor_process = subprocess.Popen([sys.executable, '-m', 'training_monitor',
+                                        '--port', '5000', '--no-debug'],
+                                       cwd=Path(__file__).resolve().parent)
+    monitor = MonitorClient(port=5000)
+    try:
+        if not monitor.wait_until_ready():
+            if monitor_process.poll() is not None:
+                # MonitorClient would otherwise drop every update silently
+                print(f"❌ Training monitor exited with code {monitor_process.returncode}")
+                sys.exit(1)
+            print("⚠️ Monitor is not answering yet; early updates may be lost")
+        run_selected_option(monitor)
+    finally:
+        monitor_process.terminate()
+        monitor_process.wait()
+
+def run_selected_option(monitor):
+    """Ask which kind of run to start and execute it"""
     print("\n📋 Training Options:")
     print("1. Continue with simulated training (for demo)")
     print("2. Start real Ollama fine-tuning")
@@ -86,6 +101,8 @@ def run_training_with_monitor():
         print("✅ Check the browser for real-time training progress!")
         
         try:
+            simulate_training(monitor)
+            print("✅ Simulation finished. Press Ctrl+C to stop.")
             while True:
                 time.sleep(1)
         except KeyboardInterrupt:
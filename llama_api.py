@@ -5,11 +5,77 @@ Provides a Python API for working with Llama models via Ollama
 
 import requests
 import json
+import time
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Optional, Generator
 
+# Faster JSON (de)serialization when available; both parse bytes directly
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+else:
+    _loads = json.loads
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+# Compressed bodies are fine for one-shot replies, but a compressed NDJSON
+# stream can be buffered by the encoder and hold tokens back
+STREAM_HEADERS = {**JSON_HEADERS, "Accept-Encoding": "identity"}
+# Installed models rarely change, so /api/tags and /api/show are cached briefly
+MODELS_CACHE_TTL = 30.0
+
+# Keep-alive connection pool sizing for the Ollama server
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+# Read size for streamed NDJSON; Ollama sends chunked responses, so each read
+# still returns as soon as a token arrives rather than waiting to fill this
+STREAM_CHUNK_SIZE = 1 << 16
+
+def _iter_ndjson(response: requests.Response) -> Generator[Dict, None, None]:
+    """Decode a newline-delimited JSON body, splitting raw bytes once per chunk"""
+    pending = b""
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield _loads(line)
+    if pending.strip():
+        yield _loads(pending)
+
 class LlamaAPI:
     def __init__(self, base_url: str = "http://localhost:11434"):
         self.base_url = base_url
+        # One session for every request so sockets are reused between calls
+        self.session = requests.Session()
+        self.session.mount(
+            self.base_url,
+            HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        )
+        self._models_cache = (0.0, None)
+        self._model_info_cache = {}
+
+    def close(self):
+        """Close the pooled HTTP session"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _post(self, url: str, payload: Dict, stream: bool = False) -> requests.Response:
+        headers = STREAM_HEADERS if stream else JSON_HEADERS
+        return self.session.post(url, data=_dumps(payload), headers=headers, stream=stream)
         
     def generate(self, model: str, prompt: str, stream: bool = False, **kwargs) -> Dict:
         """Generate text using a Llama model"""
@@ -25,15 +91,13 @@ class LlamaAPI:
         if stream:
             return self._stream_generate(url, payload)
         else:
-            response = requests.post(url, json=payload)
-            return response.json()
+            response = self._post(url, payload)
+            return _loads(response.content)
     
     def _stream_generate(self, url: str, payload: Dict) -> Generator[Dict, None, None]:
         """Stream generation responses"""
-        with requests.post(url, json=payload, stream=True) as response:
-            for line in response.iter_lines():
-                if line:
-                    yield json.loads(line.decode('utf-8'))
+        with self._post(url, payload, stream=True) as response:
+            yield from _iter_ndjson(response)
     
     def chat(self, model: str, messages: List[Dict], stream: bool = False, **kwargs) -> Dict:
         """Chat with a Llama model using conversation format"""
@@ -49,36 +113,68 @@ class LlamaAPI:
         if stream:
             return self._stream_generate(url, payload)
         else:
-            response = requests.post(url, json=payload)
-            return response.json()
+            response = self._post(url, payload)
+            return _loads(response.content)
     
     def list_models(self) -> List[Dict]:
         """List available models"""
+        now = time.monotonic()
+        ts, cached = self._models_cache
+        if cached is not None and now - ts < MODELS_CACHE_TTL:
+            return cached
+        
         url = f"{self.base_url}/api/tags"
-        response = requests.get(url)
-        return response.json().get('models', [])
+        response = self.session.get(url)
+        models = _loads(response.content).get('models', [])
+        self._models_cache = (now, models)
+        return models
     
     def show_model_info(self, model: str) -> Dict:
         """Get information about a specific model"""
+        now = time.monotonic()
+        ts, cached = self._model_info_cache.get(model, (0.0, None))
+        if cached is not None and now - ts < MODELS_CACHE_TTL:
+            return cached
+        
         url = f"{self.base_url}/api/show"
         payload = {"name": model}
-        response = requests.post(url, json=payload)
-        return response.json()
+        response = self._post(url, payload)
+        info = _loads(response.content)
+        if 'error' not in info:
+            self._model_info_cache[model] = (now, info)
+        return info
+    
+    def invalidate_models_cache(self):
+        """Forget cached model listings, e.g. after pulling or creating a model"""
+        self._models_cache = (0.0, None)
+        self._model_info_cache.clear()
     
     def pull_model(self, model: str) -> Generator[Dict, None, None]:
         """Pull/download a model"""
         url = f"{self.base_url}/api/pull"
         payload = {"name": model}
         
-        with requests.post(url, json=payload, stream=True) as response:
-            for line in response.iter_lines():
-                if line:
-                    yield json.loads(line.decode('utf-8'))
+        try:
+            with self._post(url, payload, stream=True) as response:
+                yield from _iter_ndjson(response)
+        finally:
+            self.invalidate_models_cache()
+    
+    def create_model(self, name: str, modelfile: str) -> Generator[Dict, None, None]:
+        """Create a model from Modelfile content"""
+        url = f"{self.base_url}/api/create"
+        payload = {"name": name, "modelfile": modelfile}
+        
+        try:
+            with self._post(url, payload, stream=True) as response:
+                yield from _iter_ndjson(response)
+        finally:
+            self.invalidate_models_cache()
 
 # Example usage functions
-def simple_chat_example():
+def simple_chat_example(api: Optional[LlamaAPI] = None):
     """Simple chat example with Llama"""
-    api = LlamaAPI()
+    api = api or LlamaAPI()
     
     # Check available models
     models = api.list_models()
@@ -97,9 +193,9 @@ def simple_chat_example():
     
     print("Response:", response['response'])
 
-def conversation_example():
+def conversation_example(api: Optional[LlamaAPI] = None):
     """Conversation-style chat example"""
-    api = LlamaAPI()
+    api = api or LlamaAPI()
     
     models = api.list_models()
     if not models:
@@ -117,9 +213,9 @@ def conversation_example():
     response = api.chat(model=model_name, messages=messages)
     print("Assistant:", response['message']['content'])
 
-def streaming_example():
+def streaming_example(api: Optional[LlamaAPI] = None):
     """Example of streaming responses"""
-    api = LlamaAPI()
+    api = api or LlamaAPI()
     
     models = api.list_models()
     if not models:
@@ -154,11 +250,11 @@ if __name__ == "__main__":
         
         if models:
             print("\nRunning examples...")
-            simple_chat_example()
+            simple_chat_example(api)
             print("\n" + "="*50 + "\n")
-            conversation_example()
+            conversation_example(api)
             print("\n" + "="*50 + "\n")
-            streaming_example()
+            streaming_example(api)
     
     except requests.exceptions.ConnectionError:
         print("❌ Could not connect to Ollama. Make sure it's running with: ollama serve")
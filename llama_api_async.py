@@ -0,0 +1,94 @@
+"""
+Async Llama API Interface
+Concurrent counterpart of LlamaAPI built on aiohttp, for batch scripts
+that issue many independent requests with asyncio.gather
+"""
+
+import asyncio
+import json
+from typing import AsyncGenerator, Dict, List
+
+import aiohttp
+
+# Connection pool limits shared by every request issued through one client
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 20
+REQUEST_TIMEOUT = 60
+# One-shot replies may come back gzip-compressed (aiohttp decodes them);
+# streams ask for identity so tokens are not held back by the encoder
+STREAM_HEADERS = {"Accept-Encoding": "identity"}
+
+class AsyncLlamaAPI:
+    def __init__(self, base_url: str = "http://localhost:11434"):
+        self.base_url = base_url
+        # The session is created lazily so it binds to the running event loop
+        self._session = None
+
+    def _client(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=MAX_CONNECTIONS,
+                    limit_per_host=MAX_CONNECTIONS_PER_HOST
+                ),
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                headers={"Accept-Encoding": "gzip, deflate"}
+            )
+        return self._session
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def generate(self, model: str, prompt: str, **kwargs) -> Dict:
+        """Generate text using a Llama model"""
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            **kwargs
+        }
+        async with self._client().post(f"{self.base_url}/api/generate", json=payload) as response:
+            return await response.json(content_type=None)
+
+    async def chat(self, model: str, messages: List[Dict], **kwargs) -> Dict:
+        """Chat with a Llama model using conversation format"""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": False,
+            **kwargs
+        }
+        async with self._client().post(f"{self.base_url}/api/chat", json=payload) as response:
+            return await response.json(content_type=None)
+
+    async def stream_generate(self, model: str, prompt: str, **kwargs) -> AsyncGenerator[Dict, None]:
+        """Stream generation responses"""
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            **kwargs
+        }
+        async for chunk in self._stream(f"{self.base_url}/api/generate", payload):
+            yield chunk
+
+    async def _stream(self, url: str, payload: Dict) -> AsyncGenerator[Dict, None]:
+        async with self._client().post(url, json=payload, headers=STREAM_HEADERS) as response:
+            async for line in response.content:
+                if line.strip():
+                    yield json.loads(line)
+
+    async def generate_many(self, model: str, prompts: List[str], **kwargs) -> List[Dict]:
+        """Run independent generations concurrently, results in prompt order"""
+        return await asyncio.gather(*(
+            self.generate(model=model, prompt=prompt, **kwargs) for prompt in prompts
+        ))
@@ -0,0 +1,218 @@
+"""
+Llama Response Cache
+Two-tier cache in front of LlamaAPI.generate/chat: an exact prompt match first,
+then a semantic match on prompt embeddings
+"""
+
+import json
+import os
+import pickle
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from llama_api import LlamaAPI, ORJSON_AVAILABLE
+
+if ORJSON_AVAILABLE:
+    import orjson
+
+def _scope(obj) -> bytes:
+    """Canonical bytes for a cache scope; keys are sorted at every level so
+    the same options built in a different order still hit"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True).encode('utf-8')
+
+# Semantic tier needs a local embedder and an ANN index; without them only
+# exact-match hits are served
+try:
+    import hnswlib
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_AVAILABLE = True
+except ImportError:
+    SEMANTIC_AVAILABLE = False
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
+# Cosine distance below which two prompts are considered the same question
+SIMILARITY_THRESHOLD = 0.08
+# Sampling above this temperature is meant to vary, so it is never cached
+MAX_CACHED_TEMPERATURE = 0.5
+# Ollama's own default when the caller passes no temperature
+DEFAULT_TEMPERATURE = 0.8
+INITIAL_CAPACITY = 1024
+EMBED_BATCH_SIZE = 32
+
+@lru_cache(maxsize=1)
+def _get_embedder(name: str = EMBEDDING_MODEL):
+    """Load the embedding model once per process and run a warm-up encode"""
+    import torch
+    torch.set_num_threads(os.cpu_count() or 1)
+    embedder = SentenceTransformer(name)
+    embedder.encode(["warm-up"], convert_to_numpy=True)
+    return embedder
+
+class SemanticCache:
+    def __init__(self, dim: int = EMBEDDING_DIM, threshold: float = SIMILARITY_THRESHOLD):
+        self.dim = dim
+        self.threshold = threshold
+        self.exact = {}
+        self.data = {"embeddings": [], "prompts": [], "responses": [], "scopes": []}
+        self.index = None
+        if SEMANTIC_AVAILABLE:
+            self._build_index(INITIAL_CAPACITY)
+
+    def _build_index(self, capacity: int):
+        self.index = hnswlib.Index(space='cosine', dim=self.dim)
+        self.index.init_index(max_elements=capacity, ef_construction=200, M=16)
+        if self.data["embeddings"]:
+            self.index.add_items(np.vstack(self.data["embeddings"]),
+                                 np.arange(len(self.data["embeddings"])))
+
+    def get_exact(self, key: bytes) -> Optional[Dict]:
+        return self.exact.get(key)
+
+    def get_similar(self, vector: np.ndarray, scope: bytes) -> Optional[Dict]:
+        """Nearest cached prompt, if close enough and generated with the same model/options"""
+        if self.index is None or self.index.get_current_count() == 0:
+            return None
+        labels, distances = self.index.knn_query(vector, k=1)
+        label = int(labels[0][0])
+        if distances[0][0] < self.threshold and self.data["scopes"][label] == scope:
+            return self.data["responses"][label]
+        return None
+
+    def add(self, key: bytes, scope: bytes, prompt: str, response: Dict,
+            vector: Optional[np.ndarray] = None):
+        self.exact[key] = response
+        if vector is None or self.index is None:
+            return
+        entry_id = len(self.data["embeddings"])
+        if entry_id >= self.index.get_max_elements():
+            self.index.resize_index(2 * self.index.get_max_elements())
+        self.index.add_items(vector.reshape(1, -1), [entry_id])
+        self.data["embeddings"].append(vector)
+        self.data["prompts"].append(prompt)
+        self.data["responses"].append(response)
+        self.data["scopes"].append(scope)
+
+    def save(self, directory: str):
+        """Persist embeddings with numpy and the rest with pickle"""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        embeddings = self.data["embeddings"]
+        np.save(path / "embeddings.npy",
+                np.vstack(embeddings) if embeddings else np.empty((0, self.dim), dtype=np.float32))
+        with open(path / "entries.pkl", 'wb') as f:
+            pickle.dump({
+                "exact": self.exact,
+                "prompts": self.data["prompts"],
+                "responses": self.data["responses"],
+                "scopes": self.data["scopes"],
+            }, f)
+
+    def load(self, directory: str) -> bool:
+        path = Path(directory)
+        if not (path / "entries.pkl").exists():
+            return False
+        with open(path / "entries.pkl", 'rb') as f:
+            entries = pickle.load(f)
+        self.exact = entries["exact"]
+        self.data = {
+            "embeddings": list(np.load(path / "embeddings.npy")),
+            "prompts": entries["prompts"],
+            "responses": entries["responses"],
+            "scopes": entries["scopes"],
+        }
+        if SEMANTIC_AVAILABLE:
+            self._build_index(max(INITIAL_CAPACITY, 2 * len(self.data["embeddings"])))
+        return True
+
+class CachedLlamaAPI(LlamaAPI):
+    def __init__(self, base_url: str = "http://localhost:11434", cache_dir: Optional[str] = None,
+                 max_temperature: float = MAX_CACHED_TEMPERATURE):
+        super().__init__(base_url)
+        # Calls sampled hotter than this always go to the server
+        self.max_temperature = max_temperature
+        self.cache = SemanticCache()
+        self.cache_dir = cache_dir
+        if cache_dir:
+            self.cache.load(cache_dir)
+        self._embed = _get_embedder() if SEMANTIC_AVAILABLE else None
+
+    def _embed_prompt(self, prompt: str) -> Optional[np.ndarray]:
+        if self._embed is None:
+            return None
+        return self._embed.encode(prompt, normalize_embeddings=True, convert_to_numpy=True)
+
+    def embed_many(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Embed a batch of prompts in one pass; one row per text"""
+        if self._embed is None:
+            return None
+        return self._embed.encode(texts, batch_size=EMBED_BATCH_SIZE,
+                                  normalize_embeddings=True, convert_to_numpy=True)
+
+    def _lookup(self, key: bytes, scope: bytes, vector: Optional[np.ndarray]) -> Optional[Dict]:
+        cached = self.cache.get_exact(key)
+        if cached is None and vector is not None:
+            cached = self.cache.get_similar(vector, scope)
+        return cached
+
+    def cached_many(self, model: str, prompts: List[str], **kwargs) -> List[Optional[Dict]]:
+        """Cached generate() responses for a batch of prompts, None where a call is still needed"""
+        if not self._cacheable(False, kwargs):
+            return [None] * len(prompts)
+        scope = _scope({"endpoint": "generate", "model": model, **kwargs})
+        vectors = self.embed_many(prompts) if prompts else None
+        return [
+            self._lookup(scope + b"\0" + prompt.encode('utf-8'), scope,
+                         vectors[i] if vectors is not None else None)
+            for i, prompt in enumerate(prompts)
+        ]
+
+    def _cached(self, scope: bytes, prompt: str, call) -> Dict:
+        key = scope + b"\0" + prompt.encode('utf-8')
+        cached = self.cache.get_exact(key)
+        if cached is not None:
+            return cached
+
+        vector = self._embed_prompt(prompt)
+        if vector is not None:
+            cached = self.cache.get_similar(vector, scope)
+            if cached is not None:
+                return cached
+
+        response = call()
+        if 'error' not in response:
+            self.cache.add(key, scope, prompt, response, vector)
+        return response
+
+    def _cacheable(self, stream: bool, kwargs: Dict) -> bool:
+        temperature = kwargs.get('options', {}).get('temperature', DEFAULT_TEMPERATURE)
+        return not stream and temperature <= self.max_temperature
+
+    def generate(self, model: str, prompt: str, stream: bool = False, **kwargs) -> Dict:
+        """Generate text, serving repeated or near-identical prompts from the cache"""
+        if not self._cacheable(stream, kwargs):
+            return super().generate(model, prompt, stream=stream, **kwargs)
+        scope = _scope({"endpoint": "generate", "model": model, **kwargs})
+        return self._cached(scope, prompt,
+                            lambda: super(CachedLlamaAPI, self).generate(model, prompt, **kwargs))
+
+    def chat(self, model: str, messages: List[Dict], stream: bool = False, **kwargs) -> Dict:
+        """Chat, matching the last message against earlier calls with the same history"""
+        if not messages or not self._cacheable(stream, kwargs):
+            return super().chat(model, messages, stream=stream, **kwargs)
+        scope = _scope({"endpoint": "chat", "model": model, "history": messages[:-1], **kwargs})
+        return self._cached(scope, messages[-1]['content'],
+                            lambda: super(CachedLlamaAPI, self).chat(model, messages, **kwargs))
+
+    def save_cache(self):
+        if self.cache_dir:
+            self.cache.save(self.cache_dir)
+
+    def close(self):
+        self.save_cache()
+        super().close()
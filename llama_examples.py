@@ -4,139 +4,136 @@ Demonstrates various use cases for Llama 3.1/3.2 models
 """
 
 from llama_api import LlamaAPI
+from llama_api_async import AsyncLlamaAPI
+import asyncio
 import json
 import time
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Optional
+
+# Static instructions live in the system message so the server can reuse
+# the evaluated prompt prefix across calls; only the user message varies
+_CODE_SYSTEM_TEMPLATE = """
+Generate {language} code for the task given by the user.
+Provide clean, well-commented code with proper error handling.
+Only return the code, no explanations.
+"""
+
+_ANALYSIS_SYSTEM = """
+Analyze the text given by the user and provide:
+1. Sentiment (positive/negative/neutral)
+2. Main topics (3-5 keywords)
+3. Brief summary (1-2 sentences)
+4. Key insights
+
+Respond in JSON format.
+"""
+
+_EXTRACT_SYSTEM = """
+Extract the requested fields from the text given by the user.
+Return the information in JSON format with the requested fields as keys.
+If information is not found, use null for that field.
+"""
+
+_QA_SYSTEM = """
+Answer the user's question based only on the context they provide.
+If the answer cannot be found in the context, say "I cannot answer based on the provided context."
+"""
+
+_TRANSLATE_SYSTEM_TEMPLATE = """
+Translate the text given by the user to {target_language}.
+Provide only the translation, no explanations.
+"""
+
+_CREATIVE_SYSTEM_TEMPLATE = """
+You are a creative writer specializing in {genre}.
+Write a {length} {genre} story based on the following prompt.
+Focus on engaging narrative, character development, and vivid descriptions.
+"""
+
+_ANALYSIS_USER_TEMPLATE = "Text: {text}"
+_EXTRACT_USER_TEMPLATE = "Fields: {fields}\n\nText: {text}"
+_QA_USER_TEMPLATE = "Context: {context}\n\nQuestion: {question}"
+
+@lru_cache(maxsize=64)
+def _system_prompt(template: str, **params) -> str:
+    """Parameterized system prompts repeat across calls, so format each variant once"""
+    return template.format(**params)
 
 class LlamaExamples:
-    def __init__(self, model_name: str = "llama3.2:3b"):
-        self.api = LlamaAPI()
+    def __init__(self, model_name: str = "llama3.2:3b", api: Optional[LlamaAPI] = None):
+        self.api = api or LlamaAPI()
         self.model = model_name
-        
-    def code_generation(self, task: str, language: str = "python") -> str:
-        """Generate code using Llama"""
-        prompt = f"""
-        Generate {language} code for the following task:
-        {task}
-        
-        Provide clean, well-commented code with proper error handling.
-        Only return the code, no explanations.
-        """
-        
-        response = self.api.generate(
+    
+    def _messages(self, system: str, user: str) -> List[Dict]:
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user}
+        ]
+    
+    def _ask(self, system: str, user: str, temperature: float) -> str:
+        response = self.api.chat(
             model=self.model,
-            prompt=prompt,
-            options={"temperature": 0.1}  # Lower temperature for more consistent code
+            messages=self._messages(system, user),
+            options={"temperature": temperature}
         )
+        return response['message']['content']
+    
+    def _parse_json(self, content: str, error: str) -> Dict:
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            return {"error": error, "raw": content}
         
-        return response['response']
+    def code_generation(self, task: str, language: str = "python") -> str:
+        """Generate code using Llama"""
+        # Lower temperature for more consistent code
+        return self._ask(_system_prompt(_CODE_SYSTEM_TEMPLATE, language=language), task, 0.1)
     
     def text_analysis(self, text: str) -> Dict:
         """Analyze text for sentiment, topics, and summary"""
-        prompt = f"""
-        Analyze the following text and provide:
-        1. Sentiment (positive/negative/neutral)
-        2. Main topics (3-5 keywords)
-        3. Brief summary (1-2 sentences)
-        4. Key insights
-        
-        Text: {text}
-        
-        Respond in JSON format.
-        """
-        
-        response = self.api.generate(
-            model=self.model,
-            prompt=prompt,
-            options={"temperature": 0.3}
-        )
+        content = self._ask(_ANALYSIS_SYSTEM, _ANALYSIS_USER_TEMPLATE.format(text=text), 0.3)
+        return self._parse_json(content, "Could not parse JSON response")
+    
+    def batch_analyze(self, texts: List[str]) -> List[Dict]:
+        """Analyze several texts concurrently, results in input order"""
+        async def _run():
+            async with AsyncLlamaAPI(self.api.base_url) as api:
+                return await asyncio.gather(*(
+                    api.chat(
+                        model=self.model,
+                        messages=self._messages(_ANALYSIS_SYSTEM, _ANALYSIS_USER_TEMPLATE.format(text=text)),
+                        options={"temperature": 0.3}
+                    )
+                    for text in texts
+                ))
         
-        try:
-            return json.loads(response['response'])
-        except json.JSONDecodeError:
-            return {"error": "Could not parse JSON response", "raw": response['response']}
+        return [
+            self._parse_json(response['message']['content'], "Could not parse JSON response")
+            for response in asyncio.run(_run())
+        ]
     
     def creative_writing(self, genre: str, prompt: str, length: str = "short") -> str:
         """Generate creative content"""
-        system_prompt = f"""
-        You are a creative writer specializing in {genre}. 
-        Write a {length} {genre} story based on the following prompt.
-        Focus on engaging narrative, character development, and vivid descriptions.
-        """
-        
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt}
-        ]
-        
-        response = self.api.chat(
-            model=self.model,
-            messages=messages,
-            options={"temperature": 0.8}  # Higher temperature for creativity
-        )
-        
-        return response['message']['content']
+        system_prompt = _system_prompt(_CREATIVE_SYSTEM_TEMPLATE, genre=genre, length=length)
+        # Higher temperature for creativity
+        return self._ask(system_prompt, prompt, 0.8)
     
     def data_extraction(self, text: str, fields: List[str]) -> Dict:
         """Extract structured data from unstructured text"""
-        fields_str = ", ".join(fields)
-        
-        prompt = f"""
-        Extract the following information from the text: {fields_str}
-        
-        Text: {text}
-        
-        Return the information in JSON format with the specified fields as keys.
-        If information is not found, use null for that field.
-        """
-        
-        response = self.api.generate(
-            model=self.model,
-            prompt=prompt,
-            options={"temperature": 0.1}
-        )
-        
-        try:
-            return json.loads(response['response'])
-        except json.JSONDecodeError:
-            return {"error": "Could not parse response", "raw": response['response']}
+        # The requested fields change between calls, so they stay in the user
+        # message and the system prefix remains shared
+        user = _EXTRACT_USER_TEMPLATE.format(fields=", ".join(fields), text=text)
+        content = self._ask(_EXTRACT_SYSTEM, user, 0.1)
+        return self._parse_json(content, "Could not parse response")
     
     def question_answering(self, context: str, question: str) -> str:
         """Answer questions based on provided context"""
-        prompt = f"""
-        Context: {context}
-        
-        Question: {question}
-        
-        Answer the question based only on the provided context. 
-        If the answer cannot be found in the context, say "I cannot answer based on the provided context."
-        """
-        
-        response = self.api.generate(
-            model=self.model,
-            prompt=prompt,
-            options={"temperature": 0.2}
-        )
-        
-        return response['response']
+        return self._ask(_QA_SYSTEM, _QA_USER_TEMPLATE.format(context=context, question=question), 0.2)
     
     def language_translation(self, text: str, target_language: str) -> str:
         """Translate text to target language"""
-        prompt = f"""
-        Translate the following text to {target_language}:
-        
-        {text}
-        
-        Provide only the translation, no explanations.
-        """
-        
-        response = self.api.generate(
-            model=self.model,
-            prompt=prompt,
-            options={"temperature": 0.1}
-        )
-        
-        return response['response']
+        return self._ask(_system_prompt(_TRANSLATE_SYSTEM_TEMPLATE, target_language=target_language), text, 0.1)
     
     def conversation_assistant(self):
         """Interactive conversation assistant"""
@@ -201,7 +198,7 @@ def run_examples():
         model_name = models[0]['name']
         print(f"Using model: {model_name}\n")
         
-        examples = LlamaExamples(model_name)
+        examples = LlamaExamples(model_name, api)
         
         while True:
             print("\nChoose an example:")
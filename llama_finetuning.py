@@ -11,15 +11,90 @@ import torch
 import time
 import threading
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterator, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import subprocess
+import requests
+from llama_api import LlamaAPI
 from training_monitor import start_monitor
 
+# Faster JSONL parsing when orjson is available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+JSONL_BUFFER_SIZE = 1 << 20
+TEST_CONCURRENCY = 8
+# Sampling for test_custom_model. A CachedLlamaAPI only caches it when built
+# with max_temperature >= TEST_TEMPERATURE
+TEST_TEMPERATURE = 0.7
+
+def _format_example(data: Dict) -> Optional[str]:
+    """Render one JSONL record as a training example"""
+    if 'messages' in data:  # Conversation format
+        parts = []
+        for msg in data['messages']:
+            if msg['role'] == 'user':
+                parts.append(f"المستخدم: {msg['content']}\n")
+            elif msg['role'] == 'assistant':
+                parts.append(f"المساعد: {msg['content']}\n")
+        return "".join(parts)
+    
+    elif 'instruction' in data:  # Instruction format
+        parts = [f"التعليمات: {data['instruction']}\n"]
+        if 'input' in data and data['input']:
+            parts.append(f"المدخل: {data['input']}\n")
+        parts.append(f"الإخراج: {data['output']}\n")
+        return "".join(parts)
+    
+    elif 'prompt' in data:  # Completion format
+        return f"المطلوب: {data['prompt']}\nالإجابة: {data['completion']}\n"
+    
+    return None
+
+def _examples_from_lines(lines) -> Iterator[str]:
+    loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+    for line in lines:
+        if not line.strip():
+            continue
+        example = _format_example(loads(line))
+        if example is not None:
+            yield example
+
+def _split_on_lines(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Split a file into roughly equal byte ranges that start at line boundaries"""
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(size * i // parts)
+            f.readline()
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+def _examples_in_range(job: Tuple[str, int, int]) -> List[str]:
+    path, start, end = job
+    with open(path, 'rb', buffering=JSONL_BUFFER_SIZE) as f:
+        f.seek(start)
+        
+        def lines():
+            while f.tell() < end:
+                yield f.readline()
+        
+        return list(_examples_from_lines(lines()))
+
 class LlamaFineTuner:
-    def __init__(self, model_name: str = "llama3.2:3b"):
+    def __init__(self, model_name: str = "llama3.2:3b", api: Optional[LlamaAPI] = None):
         self.model_name = model_name
         self.training_dir = Path("training_data")
         self.training_dir.mkdir(exist_ok=True)
+        # Pass a llama_cache.CachedLlamaAPI to serve repeated test prompts from its cache
+        self.api = api if api is not None else LlamaAPI()
         
     def create_modelfile(self, system_prompt: str, training_data_path: str) -> str:
         """
@@ -90,53 +165,41 @@ ADAPTER {training_data_path}
                 monitor.add_log(f"Training data: {training_file}")
                 monitor.update_training_status('training')
             
-            # Create Modelfile
-            modelfile_path = self.create_modelfile(system_prompt, training_file)
+            # Create Modelfile; the adapter path is absolute because the Ollama
+            # server resolves it outside this working directory
+            modelfile_path = self.create_modelfile(system_prompt, str(Path(training_file).resolve()))
             print(f"✅ Created Modelfile: {modelfile_path}")
             
             if monitor:
                 monitor.add_log(f"Created Modelfile: {modelfile_path}")
-            
-            # Create custom model with Ollama (with real-time output)
-            cmd = ["ollama", "create", custom_model_name, "-f", modelfile_path]
-            
-            if monitor:
                 monitor.add_log("Starting Ollama model creation...")
                 monitor.update_training_status('training', current_step=1)
             
-            # Run process with real-time output monitoring
-            process = subprocess.Popen(
-                cmd, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.STDOUT,
-                text=True,
-                universal_newlines=True
-            )
-            
             step_count = 0
             start_time = time.time()
+            error_msg = None
             
-            # Monitor the training process output
-            for line in process.stdout:
-                line = line.strip()
-                if line:
-                    print(line)
-                    
-                    if monitor:
-                        monitor.add_log(line)
-                        step_count += 1
-                        elapsed = time.time() - start_time
+            # Monitor the model creation progress as it streams in
+            try:
+                for line in self._create_model_progress(custom_model_name, modelfile_path):
+                    if line:
+                        print(line)
                         
-                        # Update progress
-                        monitor.update_training_status(
-                            'training',
-                            current_step=step_count,
-                            elapsed_time=elapsed
-                        )
+                        if monitor:
+                            monitor.add_log(line)
+                            step_count += 1
+                            elapsed = time.time() - start_time
+                            
+                            # Update progress
+                            monitor.update_training_status(
+                                'training',
+                                current_step=step_count,
+                                elapsed_time=elapsed
+                            )
+            except RuntimeError as e:
+                error_msg = str(e)
             
-            process.wait()
-            
-            if process.returncode == 0:
+            if error_msg is None:
                 print(f"✅ Successfully created custom model: {custom_model_name}")
                 print("🎯 You can now use it with:")
                 print(f"   ollama run {custom_model_name}")
@@ -147,7 +210,6 @@ ADAPTER {training_data_path}
                 
                 return True
             else:
-                error_msg = f"Error creating model (exit code: {process.returncode})"
                 print(f"❌ {error_msg}")
                 
                 if monitor:
@@ -166,78 +228,121 @@ ADAPTER {training_data_path}
             
             return False
     
-    def prepare_training_examples(self, jsonl_file: str) -> List[str]:
+    def _create_model_progress(self, custom_model_name: str, modelfile_path: str):
         """
-        Convert JSONL training data to examples for the model
-        تحويل بيانات التدريب إلى أمثلة للنموذج
+        Yield progress lines while Ollama creates the model; raises RuntimeError on failure
+        متابعة تقدم إنشاء النموذج، مع رسالة خطأ عند الفشل
         """
-        examples = []
+        with open(modelfile_path, 'r', encoding='utf-8') as f:
+            modelfile_content = f.read()
         
-        with open(jsonl_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                data = json.loads(line)
-                
-                if 'messages' in data:  # Conversation format
-                    conversation = ""
-                    for msg in data['messages']:
-                        if msg['role'] == 'user':
-                            conversation += f"المستخدم: {msg['content']}\n"
-                        elif msg['role'] == 'assistant':
-                            conversation += f"المساعد: {msg['content']}\n"
-                    examples.append(conversation)
-                
-                elif 'instruction' in data:  # Instruction format
-                    example = f"التعليمات: {data['instruction']}\n"
-                    if 'input' in data and data['input']:
-                        example += f"المدخل: {data['input']}\n"
-                    example += f"الإخراج: {data['output']}\n"
-                    examples.append(example)
-                
-                elif 'prompt' in data:  # Completion format
-                    example = f"المطلوب: {data['prompt']}\nالإجابة: {data['completion']}\n"
-                    examples.append(example)
+        try:
+            for chunk in self.api.create_model(custom_model_name, modelfile_content):
+                if 'error' in chunk:
+                    raise RuntimeError(f"Error creating model: {chunk['error']}")
+                yield chunk.get('status', '')
+            return
+        except requests.exceptions.ConnectionError:
+            pass
+        
+        # Ollama server not reachable over HTTP; fall back to the CLI
+        cmd = ["ollama", "create", custom_model_name, "-f", modelfile_path]
+        process = subprocess.Popen(
+            cmd, 
+            stdout=subprocess.PIPE, 
+            stderr=subprocess.STDOUT,
+            text=True,
+            universal_newlines=True
+        )
+        for line in process.stdout:
+            yield line.strip()
+        
+        process.wait()
+        if process.returncode != 0:
+            raise RuntimeError(f"Error creating model (exit code: {process.returncode})")
+    
+    def prepare_training_examples(self, jsonl_file: str) -> Iterator[str]:
+        """
+        Convert JSONL training data to examples for the model, one at a time
+        تحويل بيانات التدريب إلى أمثلة للنموذج
+        """
+        with open(jsonl_file, 'rb', buffering=JSONL_BUFFER_SIZE) as f:
+            yield from _examples_from_lines(f)
+    
+    def prepare_training_examples_parallel(self, jsonl_file: str, workers: Optional[int] = None) -> List[str]:
+        """
+        Same as prepare_training_examples, parsing byte ranges of the file in parallel
+        نفس التحويل مع تقسيم الملف على عدة عمليات للملفات الكبيرة
+        """
+        workers = workers or os.cpu_count() or 1
+        ranges = _split_on_lines(jsonl_file, workers)
+        if len(ranges) <= 1:
+            return list(self.prepare_training_examples(jsonl_file))
         
-        return examples
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            chunks = pool.map(_examples_in_range, [(jsonl_file, start, end) for start, end in ranges])
+            return [example for chunk in chunks for example in chunk]
+    
+    def _run_test_prompt(self, model_name: str, prompt: str) -> Dict:
+        try:
+            response = self.api.generate(
+                model=model_name,
+                prompt=prompt,
+                options={"temperature": TEST_TEMPERATURE}
+            )
+            
+            return {
+                "prompt": prompt,
+                "response": response['response'],
+                "success": True
+            }
+            
+        except Exception as e:
+            return {
+                "prompt": prompt,
+                "error": str(e),
+                "success": False
+            }
     
     def test_custom_model(self, model_name: str, test_prompts: List[str]) -> Dict:
         """
         Test the custom model with sample prompts
         اختبار النموذج المخصص بعينات
         """
-        from llama_api import LlamaAPI
-        
-        api = LlamaAPI()
-        results = {}
-        
         print(f"🧪 Testing custom model: {model_name}")
         print("=" * 40)
         
-        for i, prompt in enumerate(test_prompts, 1):
-            print(f"\nTest {i}: {prompt}")
+        if not test_prompts:
+            return {}
+        
+        # A caching client (llama_cache.CachedLlamaAPI) can answer some prompts
+        # from one batched embedding pass before any HTTP call is made
+        outcomes = [None] * len(test_prompts)
+        if hasattr(self.api, 'cached_many'):
+            cached = self.api.cached_many(model_name, test_prompts,
+                                         options={"temperature": TEST_TEMPERATURE})
+            for i, response in enumerate(cached):
+                if response is not None:
+                    outcomes[i] = {"prompt": test_prompts[i], "response": response['response'], "success": True}
+        pending = [i for i, outcome in enumerate(outcomes) if outcome is None]
+        
+        # The prompts are independent, so they run concurrently; Ollama's
+        # OLLAMA_NUM_PARALLEL decides how many are actually decoded at once
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(TEST_CONCURRENCY, len(pending))) as pool:
+                fresh = pool.map(lambda i: self._run_test_prompt(model_name, test_prompts[i]), pending)
+                for i, outcome in zip(pending, fresh):
+                    outcomes[i] = outcome
+        
+        results = {}
+        for i, outcome in enumerate(outcomes, 1):
+            print(f"\nTest {i}: {outcome['prompt']}")
             print("-" * 30)
-            
-            try:
-                response = api.generate(
-                    model=model_name,
-                    prompt=prompt,
-                    options={"temperature": 0.7}
-                )
-                
-                answer = response['response']
-                print(f"Response: {answer}")
-                results[f"test_{i}"] = {
-                    "prompt": prompt,
-                    "response": answer,
-                    "success": True
-                }
-                
-            except Exception as e:
-                print(f"Error: {e}")
-                results[f"test_{i}"] = {
-                    "prompt": prompt,
-                    "error": str(e),
-                    "success": False
-                }
+            if outcome['success']:
+                print(f"Response: {outcome['response']}")
+            else:
+                print(f"Error: {outcome['error']}")
+            results[f"test_{i}"] = outcome
         
         return results
 
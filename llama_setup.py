@@ -6,10 +6,12 @@ This script helps you download, setup, and use Llama models locally.
 
 import os
 import sys
+import shutil
 import subprocess
 import json
 import requests
 from pathlib import Path
+from llama_api import LlamaAPI
 
 class LlamaSetup:
     def __init__(self):
@@ -20,15 +22,28 @@ class LlamaSetup:
             "llama3.1:70b": "Llama 3.1 70B - Highest quality, requires more resources",
             "llama3.1:405b": "Llama 3.1 405B - State-of-the-art, requires significant resources"
         }
+        self.api = LlamaAPI()
+        # Result of check_ollama_installed; None until probed
+        self._ollama_installed = None
         
     def check_ollama_installed(self):
         """Check if Ollama is installed"""
+        if self._ollama_installed is None:
+            self._ollama_installed = self._probe_ollama()
+        return self._ollama_installed
+    
+    def _probe_ollama(self):
+        # A running server answers this without spawning the CLI at all
         try:
-            result = subprocess.run(['ollama', '--version'], 
-                                 capture_output=True, text=True)
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+            if self.api.session.get(f"{self.api.base_url}/api/version", timeout=0.5).ok:
+                return True
+        except requests.exceptions.RequestException:
+            pass
+        return shutil.which('ollama') is not None
+    
+    def invalidate_ollama_probe(self):
+        """Forget the cached install check, e.g. after installing Ollama"""
+        self._ollama_installed = None
     
     def install_ollama(self):
         """Install Ollama on Linux"""
@@ -44,6 +59,7 @@ class LlamaSetup:
             ], check=True)
             
             print("✅ Ollama installed successfully!")
+            self.invalidate_ollama_probe()
             return True
         except subprocess.CalledProcessError as e:
             print(f"❌ Failed to install Ollama: {e}")
@@ -66,6 +82,32 @@ class LlamaSetup:
         print(f"📥 Downloading {model_name}...")
         print("This may take a while depending on model size and internet speed...")
         
+        try:
+            last_status = None
+            in_progress = False
+            for chunk in self.api.pull_model(model_name):
+                if 'error' in chunk:
+                    print(f"\n❌ Failed to download {model_name}: {chunk['error']}")
+                    return False
+                
+                status = chunk.get('status', '')
+                if chunk.get('total'):
+                    # Layer downloads report byte counts; redraw one line
+                    percent = chunk.get('completed', 0) * 100 // chunk['total']
+                    print(f"\r{status}: {percent}%", end='', flush=True)
+                    in_progress = True
+                elif status != last_status:
+                    print(("\n" if in_progress else "") + status)
+                    in_progress = False
+                last_status = status
+        except requests.exceptions.ConnectionError:
+            # Ollama server not reachable; let the CLI start and talk to it
+            return self._download_model_cli(model_name)
+        
+        print(f"✅ Successfully downloaded {model_name}!")
+        return True
+    
+    def _download_model_cli(self, model_name):
         try:
             result = subprocess.run([
                 'ollama', 'pull', model_name
@@ -73,12 +115,25 @@ class LlamaSetup:
             
             print(f"✅ Successfully downloaded {model_name}!")
             return True
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
             print(f"❌ Failed to download {model_name}: {e}")
             return False
     
     def list_installed_models(self):
         """List locally installed models"""
+        try:
+            models = self.api.list_models()
+        except requests.exceptions.ConnectionError:
+            return self._list_installed_models_cli()
+        
+        print("\n🔧 Installed Models:")
+        print("=" * 30)
+        print(f"{'NAME':<30} {'SIZE':>10}")
+        for model in models:
+            size_gb = model.get('size', 0) / (1024 ** 3)
+            print(f"{model['name']:<30} {size_gb:>7.1f} GB")
+    
+    def _list_installed_models_cli(self):
         try:
             result = subprocess.run([
                 'ollama', 'list'
@@ -87,7 +142,7 @@ class LlamaSetup:
             print("\n🔧 Installed Models:")
             print("=" * 30)
             print(result.stdout)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, FileNotFoundError):
             print("❌ Could not list installed models")
     
     def chat_with_model(self, model_name, prompt=None):
@@ -102,13 +157,22 @@ class LlamaSetup:
                 print(f"❌ Could not start chat with {model_name}")
         else:
             # Single prompt mode
+            try:
+                response = self.api.generate(model=model_name, prompt=prompt)
+                if 'error' in response:
+                    print(f"❌ Error running prompt: {response['error']}")
+                    return None
+                return response['response'].strip()
+            except requests.exceptions.ConnectionError:
+                pass
+            
             try:
                 result = subprocess.run([
                     'ollama', 'run', model_name, prompt
                 ], capture_output=True, text=True, check=True)
                 
                 return result.stdout.strip()
-            except subprocess.CalledProcessError as e:
+            except (subprocess.CalledProcessError, FileNotFoundError) as e:
                 print(f"❌ Error running prompt: {e}")
                 return None
 
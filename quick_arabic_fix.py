@@ -5,24 +5,27 @@
 Quick fix for Arabic text display issues
 """
 
+# المكتبات مطلوبة صراحة - لا تثبيت تلقائي عبر pip أثناء التشغيل
+try:
+    import arabic_reshaper
+    from bidi_display import get_display
+except ImportError as exc:
+    raise ImportError(
+        "المكتبات غير متوفرة - ثبّتها بـ: pip install arabic-reshaper python-bidi"
+    ) from exc
+
+# مُشكِّل واحد لكل عملية - تُقرأ إعداداته مرة واحدة فقط
+_RESHAPER = arabic_reshaper.ArabicReshaper()
+
 def fix_arabic_text_simple(text):
     """إصلاح بسيط للنصوص العربية"""
-    try:
-        import arabic_reshaper
-        from bidi.algorithm import get_display
-        
-        # إعادة تشكيل النص العربي
-        reshaped = arabic_reshaper.reshape(text)
-        
-        # تطبيق اتجاه RTL
-        bidi_text = get_display(reshaped)
-        
-        return bidi_text
-    except ImportError:
-        print("المكتبات غير متوفرة. جاري التثبيت...")
-        import subprocess
-        subprocess.run(["pip", "install", "arabic-reshaper", "python-bidi"])
-        return fix_arabic_text_simple(text)
+    # إعادة تشكيل النص العربي
+    reshaped = _RESHAPER.reshape(text)
+    
+    # تطبيق اتجاه RTL
+    bidi_text = get_display(reshaped)
+    
+    return bidi_text
 
 def main():
     print("🔤 اختبار النصوص العربية")
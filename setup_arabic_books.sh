@@ -9,7 +9,7 @@ echo "=================================="
 
 # تثبيت المكتبات المطلوبة
 echo "📦 Installing required packages..."
-pip install arabic-reshaper python-bidi PyPDF2 python-docx openpyxl
+pip install arabic-reshaper python-bidi PyMuPDF PyPDF2 python-docx openpyxl
 
 # إنشاء مجلدات البيانات
 echo "📁 Creating data directories..."
@@ -10,14 +10,19 @@ This script helps process text files for training or fine-tuning Llama models.
 import os
 import json
 import re
+import hashlib
+import mmap
+import shutil
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterator, Optional
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 
 # Arabic text processing libraries
 try:
     import arabic_reshaper
-    from bidi.algorithm import get_display
+    from bidi_display import get_display
     ARABIC_SUPPORT = True
 except ImportError:
     ARABIC_SUPPORT = False
@@ -26,9 +31,53 @@ except ImportError:
     import sys
     subprocess.check_call([sys.executable, "-m", "pip", "install", "arabic-reshaper", "python-bidi"])
     import arabic_reshaper
-    from bidi.algorithm import get_display
+    from bidi_display import get_display
     ARABIC_SUPPORT = True
 
+# Faster JSON encoding when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Vectorised byte counting for the file analysis
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Fast 64-bit hash for spotting repeated chunks; blake2b is the fallback
+# (the builtin hash() of str differs between worker processes)
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+# A single character class cannot backtrack, so the stdlib engine is already
+# linear here and avoids re2's per-match offset conversion on str input
+SENTENCE_SPLIT_PATTERN = re.compile(r'[.!?]+')
+# The same delimiters as bytes, for cutting memory-mapped files with find()
+SENTENCE_DELIMITERS = b'.!?'
+
+# File types picked up from the desktop and used as training text
+DESKTOP_EXTENSIONS = ('.txt', '.md', '.csv', '.json', '.tsv')
+TRAINING_EXTENSIONS = ('.txt', '.md')
+
+# Files above this size are memory-mapped and decoded block by block, so
+# peak memory stays near MMAP_BLOCK_SIZE instead of the whole file
+MMAP_THRESHOLD = 32 << 20
+MMAP_BLOCK_SIZE = 8 << 20
+
+# Output buffer for JSONL writers, batches many records per write syscall
+JSONL_BUFFER_SIZE = 1 << 20
+
+# Cache sizes for reshaped words and bidi-reordered sentences
+RESHAPE_CACHE_SIZE = 200_000
+DISPLAY_CACHE_SIZE = 8192
+
 class TextDataProcessor:
     def __init__(self, data_dir: str = "training_data"):
         self.data_dir = Path(data_dir)
@@ -37,6 +86,12 @@ class TextDataProcessor:
         # إعداد معالج النصوص العربية
         if ARABIC_SUPPORT:
             self.arabic_reshaper = arabic_reshaper.ArabicReshaper()
+            # التشكيل لا يتجاوز حدود الكلمة، فتُخزَّن نتيجة كل كلمة مرة واحدة
+            self._reshape_word = lru_cache(maxsize=RESHAPE_CACHE_SIZE)(self.arabic_reshaper.reshape)
+            self._display = lru_cache(maxsize=DISPLAY_CACHE_SIZE)(get_display)
+        
+        # نتائج فحص كل ملف، صالحة ما دام توقيت التعديل والحجم لم يتغيرا
+        self._file_cache = {}
     
     def copy_desktop_files(self, desktop_path: str = None) -> List[Path]:
         """
@@ -64,11 +119,7 @@ class TextDataProcessor:
         print(f"📁 Looking for text files in: {desktop_path}")
         
         # Find text files
-        text_extensions = ['.txt', '.md', '.csv', '.json', '.tsv']
-        text_files = []
-        
-        for ext in text_extensions:
-            text_files.extend(Path(desktop_path).glob(f"*{ext}"))
+        text_files = [Path(entry.path) for entry in _scan_files(desktop_path, DESKTOP_EXTENSIONS)]
         
         if not text_files:
             print("❌ No text files found on desktop")
@@ -83,11 +134,8 @@ class TextDataProcessor:
             # Copy to training data directory
             dest_path = self.data_dir / file_path.name
             try:
-                with open(file_path, 'r', encoding='utf-8') as src:
-                    content = src.read()
-                
-                with open(dest_path, 'w', encoding='utf-8') as dst:
-                    dst.write(content)
+                # Byte-for-byte copy; on Linux this goes through os.sendfile
+                shutil.copyfile(file_path, dest_path)
                 
                 copied_files.append(dest_path)
                 print(f"  ✅ Copied to {dest_path}")
@@ -102,32 +150,23 @@ class TextDataProcessor:
         Analyze the text files to understand the data
         تحليل الملفات النصية لفهم البيانات
         """
-        files = list(self.data_dir.glob("*.txt")) + list(self.data_dir.glob("*.md"))
+        entries = _scan_files(self.data_dir, TRAINING_EXTENSIONS)
         
-        if not files:
+        if not entries:
             return {"error": "No text files found in training_data directory"}
         
         analysis = {
-            "total_files": len(files),
+            "total_files": len(entries),
             "files": [],
             "total_characters": 0,
             "total_words": 0,
             "total_lines": 0
         }
         
-        for file_path in files:
+        for entry in entries:
+            file_path = Path(entry.path)
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                file_info = {
-                    "name": file_path.name,
-                    "size_bytes": file_path.stat().st_size,
-                    "characters": len(content),
-                    "words": len(content.split()),
-                    "lines": len(content.splitlines()),
-                    "preview": content[:200] + "..." if len(content) > 200 else content
-                }
+                file_info = self._scan_file(entry)
                 
                 analysis["files"].append(file_info)
                 analysis["total_characters"] += file_info["characters"]
@@ -139,12 +178,34 @@ class TextDataProcessor:
         
         return analysis
     
+    def _scan_file(self, entry: os.DirEntry) -> Dict:
+        """
+        Read a file once and compute its analysis entry; repeated calls within
+        the session reuse it until the file's mtime or size changes
+        """
+        stat = entry.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._file_cache.get(entry.path)
+        if cached is None or cached[0] != key:
+            characters, words, lines, preview = _file_stats(entry.path, stat.st_size)
+            file_info = {
+                "name": entry.name,
+                "size_bytes": stat.st_size,
+                "characters": characters,
+                "words": words,
+                "lines": lines,
+                "preview": preview + "..." if characters > 200 else preview
+            }
+            cached = self._file_cache[entry.path] = (key, file_info)
+        # نسخة حتى لا يُعدَّل المخزَّن من خارج الكائن
+        return dict(cached[1])
+    
     def prepare_training_data(self, format_type: str = "conversation") -> str:
         """
         Prepare text data for training in different formats
         إعداد البيانات النصية للتدريب بصيغ مختلفة
         """
-        files = list(self.data_dir.glob("*.txt")) + list(self.data_dir.glob("*.md"))
+        files = [Path(entry.path) for entry in _scan_files(self.data_dir, TRAINING_EXTENSIONS)]
         
         if not files:
             return None
@@ -159,140 +220,169 @@ class TextDataProcessor:
             print("❌ Unknown format type. Use: conversation, instruction, or completion")
             return None
     
-    def _prepare_conversation_format(self, files: List[Path]) -> str:
-        """Prepare data in conversation format for chat training"""
-        conversations = []
-        
-        for file_path in files:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Split content into chunks
-            chunks = self._split_text_into_chunks(content, max_length=500)
-            
-            for i, chunk in enumerate(chunks):
-                conversation = {
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": f"أنت مساعد ذكي يجيب بناءً على المحتوى من الملف: {file_path.name}"
-                        },
-                        {
-                            "role": "user", 
-                            "content": f"اشرح لي المحتوى التالي أو أجب عن الأسئلة المتعلقة به: {chunk[:100]}..."
-                        },
-                        {
-                            "role": "assistant",
-                            "content": chunk
-                        }
-                    ]
-                }
-                conversations.append(conversation)
+    def _write_jsonl(self, output_file: Path, files: List[Path], builder: str) -> int:
+        """
+        Write every file's records one per line; returns the record count.
+        Several files are processed in parallel and each worker sends back its
+        file already encoded, so records are never pickled between processes.
+        Records of a chunk already written from an earlier file (or earlier
+        in the same file) are skipped.
+        """
+        count = 0
+        seen = set()
+        jobs = [(builder, file_path) for file_path in files]
+        with open(output_file, 'wb', buffering=JSONL_BUFFER_SIZE) as f:
+            if len(files) > 1:
+                with ProcessPoolExecutor(max_workers=min(len(files), os.cpu_count() or 1)) as pool:
+                    file_groups = pool.map(_encode_file_records, jobs)
+            else:
+                file_groups = map(_encode_file_records, jobs)
+            for groups in file_groups:
+                # Groups arrive in file order, so the first copy of a chunk wins
+                for key, data, records in groups:
+                    if key is not None:
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                    f.write(data)
+                    count += records
+        return count
+    
+    @staticmethod
+    def _conversation_records(file_path: Path) -> Iterator[Tuple[Optional[int], List[Dict]]]:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
         
-        output_file = self.data_dir / "conversations.jsonl"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for conv in conversations:
-                f.write(json.dumps(conv, ensure_ascii=False) + '\n')
+        # Split content into chunks
+        chunks = TextDataProcessor._split_text_into_chunks(content, max_length=500)
         
-        print(f"✅ Created conversation format: {output_file}")
-        print(f"📊 Generated {len(conversations)} conversations")
-        return str(output_file)
+        for chunk in chunks:
+            yield _chunk_key(chunk), [{
+                "messages": [
+                    {
+                        "role": "system",
+                        "content": f"أنت مساعد ذكي يجيب بناءً على المحتوى من الملف: {file_path.name}"
+                    },
+                    {
+                        "role": "user", 
+                        "content": f"اشرح لي المحتوى التالي أو أجب عن الأسئلة المتعلقة به: {chunk[:100]}..."
+                    },
+                    {
+                        "role": "assistant",
+                        "content": chunk
+                    }
+                ]
+            }]
     
-    def _prepare_instruction_format(self, files: List[Path]) -> str:
-        """Prepare data in instruction format"""
-        instructions = []
+    @staticmethod
+    def _instruction_records(file_path: Path) -> Iterator[Tuple[Optional[int], List[Dict]]]:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
         
-        for file_path in files:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Create different types of instructions
-            chunks = self._split_text_into_chunks(content, max_length=300)
-            
-            for chunk in chunks:
+        # Create different types of instructions
+        chunks = TextDataProcessor._split_text_into_chunks(content, max_length=300)
+        
+        for chunk in chunks:
+            yield _chunk_key(chunk), [
                 # Summary instruction
-                instructions.append({
+                {
                     "instruction": f"لخص المحتوى التالي من ملف {file_path.name}:",
                     "input": chunk,
-                    "output": self._generate_summary(chunk)
-                })
+                    "output": TextDataProcessor._generate_summary(chunk)
+                },
                 
                 # Question answering instruction
-                instructions.append({
+                {
                     "instruction": "أجب عن الأسئلة بناءً على النص المُعطى:",
                     "input": f"النص: {chunk}\nالسؤال: ما الفكرة الرئيسية في هذا النص؟",
-                    "output": self._extract_main_idea(chunk)
-                })
+                    "output": TextDataProcessor._extract_main_idea(chunk)
+                }
+            ]
+    
+    @staticmethod
+    def _completion_records(file_path: Path) -> Iterator[Tuple[Optional[int], List[Dict]]]:
+        # Split into sentences or paragraphs, pairing each with the next;
+        # sentence pairs are not chunks, so they are never deduplicated
+        previous = None
+        for sentence in _iter_file_sentences(file_path):
+            sentence = sentence.strip()
+            if previous is not None and len(previous) > 10 and len(sentence) > 10:
+                yield None, [{
+                    "prompt": previous + ".",
+                    "completion": " " + sentence + "."
+                }]
+            previous = sentence
+    
+    def _prepare_conversation_format(self, files: List[Path]) -> str:
+        """Prepare data in conversation format for chat training"""
+        output_file = self.data_dir / "conversations.jsonl"
+        count = self._write_jsonl(output_file, files, '_conversation_records')
         
+        print(f"✅ Created conversation format: {output_file}")
+        print(f"📊 Generated {count} conversations")
+        return str(output_file)
+    
+    def _prepare_instruction_format(self, files: List[Path]) -> str:
+        """Prepare data in instruction format"""
         output_file = self.data_dir / "instructions.jsonl"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for inst in instructions:
-                f.write(json.dumps(inst, ensure_ascii=False) + '\n')
+        count = self._write_jsonl(output_file, files, '_instruction_records')
         
         print(f"✅ Created instruction format: {output_file}")
-        print(f"📊 Generated {len(instructions)} instructions")
+        print(f"📊 Generated {count} instructions")
         return str(output_file)
     
     def _prepare_completion_format(self, files: List[Path]) -> str:
         """Prepare data in completion format"""
-        completions = []
-        
-        for file_path in files:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Split into sentences or paragraphs
-            sentences = re.split(r'[.!?]+', content)
-            
-            for i in range(len(sentences) - 1):
-                if len(sentences[i].strip()) > 10 and len(sentences[i+1].strip()) > 10:
-                    completion = {
-                        "prompt": sentences[i].strip() + ".",
-                        "completion": " " + sentences[i+1].strip() + "."
-                    }
-                    completions.append(completion)
-        
         output_file = self.data_dir / "completions.jsonl"
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for comp in completions:
-                f.write(json.dumps(comp, ensure_ascii=False) + '\n')
+        count = self._write_jsonl(output_file, files, '_completion_records')
         
         print(f"✅ Created completion format: {output_file}")
-        print(f"📊 Generated {len(completions)} completions")
+        print(f"📊 Generated {count} completions")
         return str(output_file)
     
-    def _split_text_into_chunks(self, text: str, max_length: int = 500) -> List[str]:
+    @staticmethod
+    def _split_text_into_chunks(text: str, max_length: int = 500) -> List[str]:
         """Split text into chunks of specified maximum length"""
-        words = text.split()
+        # Chunks are slices of the single-spaced text, so boundaries are found
+        # with one rfind per chunk instead of a Python step per word; nearly
+        # all of the remaining time is the C-level split/join below
+        normalized = ' '.join(text.split())
+        total = len(normalized)
         chunks = []
-        current_chunk = []
-        current_length = 0
+        start = 0
+        # The first chunk's budget also counts a separator after its last word
+        limit = max_length - 1
         
-        for word in words:
-            if current_length + len(word) + 1 <= max_length:
-                current_chunk.append(word)
-                current_length += len(word) + 1
+        while start < total:
+            if total - start <= limit:
+                end = total
             else:
-                if current_chunk:
-                    chunks.append(' '.join(current_chunk))
-                current_chunk = [word]
-                current_length = len(word)
-        
-        if current_chunk:
-            chunks.append(' '.join(current_chunk))
+                end = normalized.rfind(' ', start, start + limit + 1)
+                if end == -1:
+                    # A single word longer than the budget becomes its own chunk
+                    end = normalized.find(' ', start)
+                    if end == -1:
+                        end = total
+            chunks.append(normalized[start:end])
+            start = end + 1
+            limit = max_length
         
         return chunks
     
-    def _generate_summary(self, text: str) -> str:
+    @staticmethod
+    def _generate_summary(text: str) -> str:
         """Generate a simple summary (placeholder - can be enhanced)"""
-        sentences = text.split('.')
-        if len(sentences) > 1:
-            return sentences[0] + '.'
+        # Only the first sentence is used, so stop at the first '.'
+        first, dot, _ = text.partition('.')
+        if dot:
+            return first + '.'
         return text[:100] + "..."
     
-    def _extract_main_idea(self, text: str) -> str:
+    @staticmethod
+    def _extract_main_idea(text: str) -> str:
         """Extract main idea (placeholder - can be enhanced)"""
-        words = text.split()
+        # At most the first 15 words are used; the 16th item holds the rest
+        words = text.split(None, 15)
         if len(words) > 10:
             return "الفكرة الرئيسية تتعلق بـ " + ' '.join(words[:15]) + "..."
         return "النص يتحدث عن " + text[:50] + "..."
@@ -306,17 +396,202 @@ class TextDataProcessor:
             return text
         
         try:
-            # إعادة تشكيل الأحرف العربية
-            reshaped_text = self.arabic_reshaper.reshape(text)
+            # إعادة تشكيل الأحرف العربية كلمةً كلمة
+            reshaped_text = ' '.join(self._reshape_word(word) for word in text.split(' '))
             
             # ضبط اتجاه النص (من اليمين إلى اليسار)
-            bidi_text = get_display(reshaped_text)
+            bidi_text = self._display(reshaped_text)
             
             return bidi_text
         except Exception as e:
             print(f"⚠️ خطأ في معالجة النص العربي: {e}")
             return text
 
+def _scan_files(directory, extensions) -> List[os.DirEntry]:
+    """Files in one directory read, grouped in the order of `extensions`"""
+    order = {ext: i for i, ext in enumerate(extensions)}
+    with os.scandir(directory) as it:
+        entries = [
+            entry for entry in it
+            if os.path.splitext(entry.name)[1].lower() in order and entry.is_file()
+        ]
+    entries.sort(key=lambda entry: order[os.path.splitext(entry.name)[1].lower()])
+    return entries
+
+# Byte-level equivalents of str.split() / str.splitlines(), so whole-file
+# counts never build a list with one object per word or line
+_ASCII_SPACES = b'\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f '
+# Every byte becomes ' ' (whitespace) or 'x' (part of a word)
+_WORD_TABLE = bytes(32 if b in _ASCII_SPACES else 120 for b in range(256))
+# UTF-8 lead bytes of every non-ASCII whitespace character (U+0085, U+00A0,
+# U+1680, U+2000-U+205F, U+3000); Arabic text normally contains none of them
+_WIDE_SPACE_LEADS = (b'\xc2', b'\xe1', b'\xe2', b'\xe3')
+# Breaks str.splitlines() knows about besides \n, \r and \r\n
+_ASCII_LINE_BREAKS = (b'\x0b', b'\x0c', b'\x1c', b'\x1d', b'\x1e')
+_WIDE_LINE_BREAKS = ((b'\xc2', ('\x85'.encode('utf-8'),)),
+                     (b'\xe2', ('\u2028'.encode('utf-8'), '\u2029'.encode('utf-8'))))
+# Byte classes for the numpy path: 0 part of a word, 1 whitespace,
+# 2 a single-byte line break (also whitespace)
+_CLASS_TABLE = bytes(
+    2 if b in b'\n\r\x0b\x0c\x1c\x1d\x1e' else 1 if b in _ASCII_SPACES else 0
+    for b in range(256)
+)
+
+def _count_words_and_breaks(data: bytes) -> Tuple[int, int]:
+    """
+    Words split on ASCII whitespace, and the number of single-byte line
+    breaks (\n, \r, \v, \f, \x1c-\x1e; a CRLF pair counts twice)
+    """
+    if NUMPY_AVAILABLE and data:
+        # One table pass, then two vectorised reductions over the classes
+        classes = np.frombuffer(data.translate(_CLASS_TABLE), dtype=np.uint8)
+        space = classes != 0
+        words = int(np.count_nonzero(space[:-1] & ~space[1:])) + (not space[0])
+        return words, int(np.count_nonzero(classes == 2))
+    marked = data.translate(_WORD_TABLE)
+    words = marked.count(b' x') + marked.startswith(b'x')
+    breaks = (data.count(b'\n') + data.count(b'\r')
+              + sum(data.count(brk) for brk in _ASCII_LINE_BREAKS))
+    return words, breaks
+
+def _text_stats(data: bytes) -> Tuple[int, int, int, str]:
+    """
+    Character, word and line counts plus a 200-character preview, as if the
+    file were read in text mode (so \r\n counts as one character)
+    """
+    # Decoding validates the file as UTF-8 and is needed for the character
+    # count of non-ASCII text; ASCII is one character per byte
+    ascii_only = data.isascii()
+    characters = len(data) if ascii_only else len(data.decode('utf-8'))
+    
+    words, lines = _count_words_and_breaks(data)
+    if not ascii_only and any(lead in data for lead in _WIDE_SPACE_LEADS):
+        # Possible multi-byte whitespace; let str.split() handle it
+        words = len(data.decode('utf-8').split())
+    
+    line_breaks = list(_ASCII_LINE_BREAKS)
+    for lead, breaks in _WIDE_LINE_BREAKS:
+        if lead in data:
+            line_breaks.extend(breaks)
+            lines += sum(data.count(brk) for brk in breaks)
+    crlf = data.count(b'\r\n') if b'\r' in data else 0
+    ends_open = bool(data) and not data.endswith((b'\n', b'\r', *line_breaks))
+    lines += ends_open - crlf
+    
+    return characters - crlf, words, lines, _preview(data)
+
+def _preview(data) -> str:
+    """First 200 characters of the text, newlines translated as in text mode"""
+    head = data[:1600].decode('utf-8', errors='ignore')
+    return head.replace('\r\n', '\n').replace('\r', '\n')[:200]
+
+def _file_stats(path: str, size: int) -> Tuple[int, int, int, str]:
+    """_text_stats() of a whole file; large files are mapped and counted in blocks"""
+    if size <= MMAP_THRESHOLD:
+        return _text_stats(Path(path).read_bytes())
+    
+    characters = words = lines = 0
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = 0
+        while pos < len(mm):
+            # Cutting right after a \n (or, in a file without one, a space)
+            # keeps CRLF pairs, UTF-8 sequences and words whole, so the
+            # counts simply add up across blocks
+            start = pos + MMAP_BLOCK_SIZE
+            end = mm.find(b'\n', start, start + MMAP_BLOCK_SIZE)
+            open_line = end == -1
+            if open_line:
+                end = mm.find(b' ', start)
+            end = len(mm) if end == -1 else end + 1
+            block_characters, block_words, block_lines, _ = _text_stats(mm[pos:end])
+            characters += block_characters
+            words += block_words
+            # A block cut at a space counted its unfinished last line
+            lines += block_lines - (open_line and end < len(mm))
+            pos = end
+        preview = _preview(mm)
+    return characters, words, lines, preview
+
+def _iter_file_sentences(file_path: Path) -> Iterator[str]:
+    """Same pieces as _iter_sentences() over the file read in text mode"""
+    if file_path.stat().st_size <= MMAP_THRESHOLD:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            yield from _iter_sentences(f.read())
+        return
+    
+    with open(file_path, 'rb') as f, \
+         mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+         memoryview(mm) as view:
+        pos = 0
+        while True:
+            # Blocks are cut at a whole delimiter run, which is ASCII (never
+            # inside a UTF-8 sequence or a CRLF pair) and separates pieces anyway
+            hit = _find_delimiter(mm, pos + MMAP_BLOCK_SIZE)
+            end = len(mm) if hit == -1 else hit
+            while pos < end < len(mm) and mm[end - 1] in SENTENCE_DELIMITERS:
+                end -= 1
+            block = str(view[pos:end], 'utf-8')
+            if '\r' in block:
+                block = block.replace('\r\n', '\n').replace('\r', '\n')
+            yield from _iter_sentences(block)
+            if hit == -1:
+                return
+            # Skip the rest of the run; the next block starts a new piece
+            pos = hit
+            while pos < len(mm) and mm[pos] in SENTENCE_DELIMITERS:
+                pos += 1
+
+def _find_delimiter(mm, start: int) -> int:
+    """Offset of the first sentence delimiter at or after start, or -1"""
+    # One bounded window at a time, so a delimiter that is rare or missing
+    # is not searched for over the whole rest of the file on every call
+    while start < len(mm):
+        stop = start + MMAP_BLOCK_SIZE
+        hits = [i for i in (mm.find(d, start, stop) for d in (b'.', b'!', b'?')) if i != -1]
+        if hits:
+            return min(hits)
+        start = stop
+    return -1
+
+def _iter_sentences(content: str) -> Iterator[str]:
+    """Same pieces as SENTENCE_SPLIT_PATTERN.split(content), produced lazily"""
+    start = 0
+    for match in SENTENCE_SPLIT_PATTERN.finditer(content):
+        yield content[start:match.start()]
+        start = match.end()
+    yield content[start:]
+
+def _encode_record(record: Dict) -> bytes:
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+
+def _chunk_key(chunk: str) -> int:
+    """64-bit content hash of a chunk, identical in every process"""
+    data = chunk.encode('utf-8')
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+def _encode_file_records(job) -> List[Tuple[Optional[int], bytes, int]]:
+    # Top-level so worker processes can unpickle it; returns one file's JSONL
+    # as (chunk key, encoded records, record count) groups. Runs of groups
+    # without a key are merged, since they are written unconditionally.
+    builder, file_path = job
+    groups = []
+    pending = []
+    for key, records in getattr(TextDataProcessor, builder)(file_path):
+        if key is None:
+            pending.extend(records)
+            continue
+        if pending:
+            groups.append((None, b''.join(map(_encode_record, pending)), len(pending)))
+            pending = []
+        groups.append((key, b''.join(map(_encode_record, records)), len(records)))
+    if pending:
+        groups.append((None, b''.join(map(_encode_record, pending)), len(pending)))
+    return groups
+
 def main():
     parser = argparse.ArgumentParser(description="Process text files for Llama training")
     parser.add_argument("--desktop", type=str, help="Path to desktop directory")
@@ -4,24 +4,155 @@ Real-time Training Monitor Web Interface
 Shows training progress, metrics, and logs in real-time
 """
 
+# Run standalone, the monitor serves its socket.io fan-out with gevent's
+# cooperative I/O; patching must precede any import of socket or threading.
+# Embedded in a trainer process it keeps to ordinary threads, so training
+# code is never made cooperative
+ASYNC_MODE = 'threading'
+if __name__ == "__main__":
+    try:
+        from gevent import monkey
+        monkey.patch_all()
+        ASYNC_MODE = 'gevent'
+    except ImportError:
+        pass
+
+import argparse
+import hashlib
+import importlib.util
 import json
+import os
+import queue
+import socket
+import struct
 import time
 import threading
 import webbrowser
-from datetime import datetime
+from collections import deque
 from pathlib import Path
-from flask import Flask, render_template, jsonify, send_from_directory
-from flask_socketio import SocketIO, emit
+from flask import Flask, Response, abort, render_template, jsonify, request
+from flask_socketio import SocketIO, emit, join_room
 import logging
+import requests
+
+# Faster encoding of snapshots and socket.io packets when orjson is available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Queued telemetry beyond which intermediate status updates are dropped;
+# log lines are always kept
+MAX_QUEUED_UPDATES = 10000
+# Broadcasts to more clients than this go out in batches of this size,
+# yielding to the server between batches
+BROADCAST_BATCH_SIZE = 50
+# Room of the dashboards that receive status and log broadcasts
+MONITOR_ROOM = 'monitor'
+# Rolling window kept for logs and each metric history
+HISTORY_LENGTH = 100
+# The trainer API only accepts writes from the local machine; the server
+# binds to every interface so the dashboard can be viewed remotely
+LOOPBACK_ADDRESSES = {'127.0.0.1', '::1', '::ffff:127.0.0.1'}
+# Fields a status update may set, with the type each value is coerced to
+# before it is queued, so bad values raise in the trainer's call
+STATUS_FIELDS = {
+    'current_epoch': int,
+    'total_epochs': int,
+    'current_step': int,
+    'total_steps': int,
+    'loss': float,
+    'learning_rate': float,
+    'elapsed_time': float,
+    'estimated_remaining': float,
+    'model_name': str,
+    'dataset_size': int,
+    'batch_size': int
+}
+# Statuses that are always recorded, whatever the metric period
+MILESTONE_STATUSES = {'starting', 'completed', 'error'}
+# Binary 'metric_frame' layout: seq and the FRAME_FIELDS (NaN when not in
+# the delta), then one (loss, learning_rate, timestamp) record per point
+FRAME_FIELDS = ('last_update', 'current_step', 'elapsed_time', 'estimated_remaining')
+METRIC_FRAME_HEADER = struct.Struct('<I' + 'd' * len(FRAME_FIELDS))
+METRIC_FRAME_POINT = struct.Struct('<ddd')
+FRAME_DELTA_KEYS = {'seq', 'loss', 'learning_rate', 'loss_points', 'learning_rate_points',
+                    *FRAME_FIELDS}
+
+if ORJSON_AVAILABLE:
+    class _OrjsonModule:
+        """json-module stand-in for python-socketio packet encoding"""
+        
+        @staticmethod
+        def dumps(obj, *args, **kwargs):
+            try:
+                return orjson.dumps(obj).decode('utf-8')
+            except TypeError:
+                # e.g. numpy scalars passed by a trainer
+                return json.dumps(obj, *args, **kwargs)
+        
+        loads = staticmethod(orjson.loads)
+    
+    _json_module = _OrjsonModule
+else:
+    _json_module = json
+
+# Extra pywsgi options for socketio.run under gevent
+GEVENT_SERVER_OPTIONS = {}
+if ASYNC_MODE == 'gevent':
+    # With gevent-websocket installed Flask-SocketIO passes its own handler class
+    if importlib.util.find_spec('geventwebsocket') is None:
+        from gevent import pywsgi
+        
+        class _NoDelayHandler(pywsgi.WSGIHandler):
+            """pywsgi handler with Nagle's algorithm off"""
+            
+            def handle(self):
+                # Replies on keep-alive connections (MonitorClient) otherwise
+                # wait ~40 ms for the client's delayed ACK
+                self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                super().handle()
+        
+        GEVENT_SERVER_OPTIONS['handler_class'] = _NoDelayHandler
 
 class TrainingMonitor:
-    def __init__(self, port=5000):
+    def __init__(self, port=5000, flush_interval=0.1, metric_period=None):
         self.app = Flask(__name__)
         self.app.config['SECRET_KEY'] = 'training_monitor_secret'
-        self.socketio = SocketIO(self.app, cors_allowed_origins="*")
+        # Flask's /static/ view already answers conditional GETs; asset names
+        # are not versioned, so browsers only reuse them for five minutes
+        self.app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 300
+        self.socketio = SocketIO(self.app, cors_allowed_origins="*", json=_json_module,
+                                 async_mode=ASYNC_MODE)
         self.port = port
         
-        # Training state
+        # Trainer calls only enqueue; a consumer thread applies them, merges
+        # status changes into one pending delta and broadcasts it at most
+        # once per flush_interval seconds
+        self.flush_interval = flush_interval
+        self._tx_queue = queue.SimpleQueue()
+        # Only every metric_period-th status update is recorded; fields of
+        # the skipped ones are carried into the next recorded update
+        if metric_period is None:
+            metric_period = int(os.environ.get('MONITOR_PERIOD', 1))
+        self.metric_period = max(1, metric_period)
+        self._step_counter = 0
+        self._skipped = {}
+        # Latest status update that arrived while the queue was full
+        self._overflow = None
+        # Guards the trainer-side state above; training_data itself is only
+        # written by the consumer thread, under _pending_lock
+        self._record_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._consumer = None
+        # (body, etag) of /api/status; dropped whenever training_data changes
+        self._encoded_snapshot = None
+        
+        # Training state. Deltas carry only the fields an update changed plus
+        # new history points; session fields and full history reach clients
+        # only in snapshots (connect, session start, /api/status)
         self.training_data = {
             'status': 'idle',
             'current_epoch': 0,
@@ -35,13 +166,16 @@ class TrainingMonitor:
             'model_name': '',
             'dataset_size': 0,
             'batch_size': 0,
-            'logs': [],
-            'metrics_history': {
-                'loss': [],
-                'learning_rate': [],
-                'timestamps': []
-            }
+            # Number of the last broadcast; clients use it to spot missed deltas
+            'seq': 0,
+            'logs': deque(maxlen=HISTORY_LENGTH),
+            'metrics_history': _new_history(),
+            'coarse_history': _new_coarse_history()
         }
+        # Steps between coarse history points; None until a session gives
+        # total_steps, and then only power-of-two steps are kept
+        self._coarse_interval = None
+        self._coarse_step = None
         
         self.setup_routes()
         self.setup_socketio()
@@ -57,68 +191,335 @@ class TrainingMonitor:
         
         @self.app.route('/api/status')
         def get_status():
-            return jsonify(self.training_data)
+            body, etag = self.encoded_snapshot()
+            response = Response(body, mimetype='application/json')
+            # Pollers revalidate every time and get a bodiless 304 while
+            # nothing changed
+            response.set_etag(etag)
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+        
+        # Updates from a trainer running in another process (see MonitorClient)
+        trainer_endpoints = {'post_update', 'post_batch', 'post_log', 'post_session', 'post_finish'}
+        
+        @self.app.before_request
+        def require_local_trainer():
+            if request.endpoint not in trainer_endpoints:
+                return
+            if request.remote_addr not in LOOPBACK_ADDRESSES:
+                abort(403)
+            # A page open in a local browser also sends from loopback; only
+            # MonitorClient (no Origin) or the dashboard itself may write
+            origin = request.headers.get('Origin')
+            if origin is not None and origin != request.host_url.rstrip('/'):
+                abort(403)
+            # A JSON content type forces a CORS preflight, which this app
+            # never answers, so no cross-site form or no-cors fetch gets through
+            if not request.is_json:
+                abort(415)
         
-        @self.app.route('/static/<path:filename>')
-        def static_files(filename):
-            return send_from_directory('static', filename)
+        @self.app.route('/api/update', methods=['POST'])
+        def post_update():
+            data = request.get_json()
+            try:
+                self.update_training_status(data.pop('status'), **data)
+            except (KeyError, TypeError, ValueError) as e:
+                return jsonify(ok=False, error=str(e)), 400
+            return jsonify(ok=True)
+        
+        # A list of push_many events, e.g. from UpdateBatcher
+        @self.app.route('/api/batch', methods=['POST'])
+        def post_batch():
+            events = request.get_json()
+            try:
+                if not isinstance(events, list):
+                    raise TypeError("expected a list of events")
+                self.push_many(events)
+            except (TypeError, ValueError) as e:
+                return jsonify(ok=False, error=str(e)), 400
+            return jsonify(ok=True)
+        
+        @self.app.route('/api/log', methods=['POST'])
+        def post_log():
+            data = request.get_json()
+            try:
+                self.add_log(data['message'], data.get('level', 'info'), data.get('timestamp'))
+            except (KeyError, TypeError, ValueError) as e:
+                return jsonify(ok=False, error=str(e)), 400
+            return jsonify(ok=True)
+        
+        @self.app.route('/api/session', methods=['POST'])
+        def post_session():
+            try:
+                self.start_training_session(**request.get_json())
+            except (TypeError, ValueError) as e:
+                return jsonify(ok=False, error=str(e)), 400
+            return jsonify(ok=True)
+        
+        @self.app.route('/api/finish', methods=['POST'])
+        def post_finish():
+            self.finish_training_session()
+            return jsonify(ok=True)
 
     def setup_socketio(self):
         @self.socketio.on('connect')
         def handle_connect():
-            emit('status_update', self.training_data)
+            with self._pending_lock:
+                # Joined under the lock so the first delta follows the snapshot
+                self._emit_pending()
+                join_room(MONITOR_ROOM)
+                emit('status_update', self._state())
             self.logger.info("Client connected to training monitor")
 
         @self.socketio.on('disconnect')
         def handle_disconnect():
             self.logger.info("Client disconnected from training monitor")
 
+    def _emit_pending(self):
+        """Broadcast the pending delta; call with _pending_lock held so seqs go out in order"""
+        if self._pending:
+            self._encoded_snapshot = None
+            self.training_data['seq'] += 1
+            delta, self._pending = self._pending, {}
+            delta['seq'] = self.training_data['seq']
+            if not self.has_clients():
+                return
+            # Purely numeric deltas go out as a packed binary attachment
+            frame = _metric_frame(delta)
+            if frame is None:
+                self.broadcast('status_delta', delta)
+            else:
+                self.broadcast('metric_frame', frame)
+
+    def _clients(self):
+        return self.socketio.server.manager.rooms.get('/', {}).get(MONITOR_ROOM, ())
+
+    def has_clients(self):
+        """True while at least one dashboard is connected"""
+        return len(self._clients()) > 0
+
+    def broadcast(self, event, data):
+        """Emit to the monitor room without holding the server for a large fan-out"""
+        clients = self._clients()
+        if not clients:
+            # Headless run; a dashboard that connects later gets a snapshot
+            return
+        # A room emit encodes the packet once and sends it to every member
+        if len(clients) <= BROADCAST_BATCH_SIZE:
+            self.socketio.emit(event, data, to=MONITOR_ROOM, namespace='/')
+            return
+        sids = [sid for sid, _ in self.socketio.server.manager.get_participants('/', MONITOR_ROOM)]
+        for i in range(0, len(sids), BROADCAST_BATCH_SIZE):
+            # Each sid is also a room, so one emit encodes the packet once per batch
+            self.socketio.emit(event, data, to=sids[i:i + BROADCAST_BATCH_SIZE], namespace='/')
+            self.socketio.sleep(0)
+
+    def _consume_loop(self):
+        while True:
+            item = self._tx_queue.get()
+            with self._pending_lock:
+                while True:
+                    try:
+                        self._handle(item)
+                    except Exception:
+                        # One bad item must not stop telemetry for the rest of the run
+                        self.logger.exception("Dropped %s telemetry item", item[0])
+                    try:
+                        item = self._tx_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                try:
+                    self._emit_pending()
+                except Exception:
+                    self.logger.exception("Failed to broadcast status delta")
+            self.socketio.sleep(self.flush_interval)
+
+    def _handle(self, item):
+        kind = item[0]
+        if kind == 'status':
+            self._apply_status(*item[1:])
+        elif kind == 'overflow':
+            with self._record_lock:
+                update, self._overflow = self._overflow, None
+            self._apply_status(*update)
+        elif kind == 'log':
+            # Status changes queued before the log line reach clients first
+            self._emit_pending()
+            self._append_log(item[1])
+        else:
+            self._reset_session(*item[1:])
+            # Clients still hold the previous session's history
+            self._emit_snapshot()
+
+    def start_consumer(self):
+        """Start the telemetry consumer thread (once)"""
+        if self._consumer is None:
+            # A greenlet under gevent, a daemon thread otherwise
+            self._consumer = self.socketio.start_background_task(self._consume_loop)
+
+    def snapshot(self):
+        """
+        Copy of the full training state. Pending changes are broadcast first,
+        so the snapshot's seq covers everything it contains.
+        """
+        with self._pending_lock:
+            self._emit_pending()
+            return self._state()
+
+    def encoded_snapshot(self):
+        """snapshot() as JSON bytes plus an ETag, encoded once per state change"""
+        with self._pending_lock:
+            self._emit_pending()
+            if self._encoded_snapshot is None:
+                body = _json_module.dumps(self._state()).encode('utf-8')
+                # Content hash rather than seq: log lines change the state
+                # without a new seq, and a restarted monitor reuses seqs
+                etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+                self._encoded_snapshot = (body, etag)
+            return self._encoded_snapshot
+
+    def _state(self):
+        # JSON-ready copy; log entries and history values are never mutated
+        data = dict(self.training_data)
+        data['logs'] = [_log_entry(record) for record in data['logs']]
+        for history in ('metrics_history', 'coarse_history'):
+            data[history] = {name: list(values) for name, values in data[history].items()}
+        return data
+
+    def broadcast_snapshot(self):
+        """Send the full training state, e.g. after it was reset"""
+        with self._pending_lock:
+            self._emit_snapshot()
+
+    def _emit_snapshot(self):
+        # Pending points belong to the state being replaced
+        self._pending = {}
+        self._encoded_snapshot = None
+        self.training_data['seq'] += 1
+        if self.has_clients():
+            self.broadcast('status_update', self._state())
+
     def update_training_status(self, status, **kwargs):
-        """Update training status and broadcast to connected clients"""
+        """Queue a status update; the consumer thread applies and broadcasts it"""
+        self._record_status(status, _status_fields(status, kwargs), time.time())
+
+    def push_many(self, events):
+        """
+        Queue a batch of ('status', status, fields, timestamp) and
+        ('log', message, level, timestamp) events in order. Every event is
+        checked before any is queued.
+        """
+        checked = []
+        for kind, *args in events:
+            if kind == 'status':
+                status, fields, timestamp = args
+                checked.append((kind, status, _status_fields(status, dict(fields)), float(timestamp)))
+            elif kind == 'log':
+                message, level, timestamp = args
+                checked.append((kind, (float(timestamp), str(level), str(message))))
+            else:
+                raise ValueError(f"unknown event kind: {kind!r}")
+        for kind, *args in checked:
+            if kind == 'status':
+                self._record_status(*args)
+            else:
+                self._tx_queue.put((kind, *args))
+
+    def _record_status(self, status, kwargs, timestamp):
+        # Data-parallel trainers may call in from several threads; the
+        # period counter and carried fields are shared between them
+        with self._record_lock:
+            if self.metric_period > 1:
+                self._step_counter += 1
+                if self._step_counter % self.metric_period and status not in MILESTONE_STATUSES:
+                    self._skipped.update(kwargs)
+                    return
+                if self._skipped:
+                    kwargs = {**self._skipped, **kwargs}
+                    self._skipped = {}
+            update = (status, kwargs, timestamp)
+            if self._overflow is not None:
+                # The consumer is falling behind; keep only the latest values
+                self._overflow = (status, {**self._overflow[1], **kwargs}, timestamp)
+                return
+            if self._tx_queue.qsize() >= MAX_QUEUED_UPDATES:
+                self._overflow = update
+                self._tx_queue.put(('overflow',))
+                return
+            # Put under the lock too, so updates are queued in counter order
+            self._tx_queue.put(('status',) + update)
+
+    def _apply_status(self, status, kwargs, timestamp):
+        delta = self._pending
+        # An unchanged status is left out so the delta can stay numeric
+        if status != self.training_data['status'] or 'status' in delta:
+            delta['status'] = status
         self.training_data['status'] = status
         
         # Update provided fields
         for key, value in kwargs.items():
             if key in self.training_data:
                 self.training_data[key] = value
+                delta[key] = value
         
-        # Add timestamp
-        self.training_data['last_update'] = datetime.now().isoformat()
+        # Add timestamp (epoch seconds; the page formats it)
+        self.training_data['last_update'] = delta['last_update'] = timestamp
         
         # Add to metrics history if loss is provided
         if 'loss' in kwargs:
             self.training_data['metrics_history']['loss'].append(kwargs['loss'])
-            self.training_data['metrics_history']['timestamps'].append(datetime.now().isoformat())
+            self.training_data['metrics_history']['timestamps'].append(timestamp)
+            delta.setdefault('loss_points', []).append([kwargs['loss'], timestamp])
             
-            # Keep only last 100 points
-            if len(self.training_data['metrics_history']['loss']) > 100:
-                self.training_data['metrics_history']['loss'].pop(0)
-                self.training_data['metrics_history']['timestamps'].pop(0)
+            step = self.training_data['current_step']
+            if step != self._coarse_step and self._is_coarse_step(step):
+                self._coarse_step = step
+                self.training_data['coarse_history']['loss'].append(kwargs['loss'])
+                self.training_data['coarse_history']['timestamps'].append(timestamp)
+                delta.setdefault('coarse_points', []).append([kwargs['loss'], timestamp])
         
         if 'learning_rate' in kwargs:
             self.training_data['metrics_history']['learning_rate'].append(kwargs['learning_rate'])
-        
-        # Broadcast to all connected clients
-        self.socketio.emit('status_update', self.training_data)
+            delta.setdefault('learning_rate_points', []).append(kwargs['learning_rate'])
 
-    def add_log(self, message, level='info'):
-        """Add a log message and broadcast to clients"""
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'level': level,
-            'message': message
-        }
-        
-        self.training_data['logs'].append(log_entry)
-        
-        # Keep only last 100 logs
-        if len(self.training_data['logs']) > 100:
-            self.training_data['logs'].pop(0)
+    def _is_coarse_step(self, step):
+        if not isinstance(step, int) or step <= 0:
+            return False
+        if step & (step - 1) == 0:
+            return True
+        return self._coarse_interval is not None and step % self._coarse_interval == 0
+
+    def add_log(self, message, level='info', timestamp=None):
+        """Queue a log message for broadcast to clients"""
+        timestamp = time.time() if timestamp is None else float(timestamp)
+        self._tx_queue.put(('log', (timestamp, str(level), str(message))))
+
+    def _append_log(self, record):
+        # Kept as the queued (timestamp, level, message) tuple; the dict
+        # form is built only for clients
+        self.training_data['logs'].append(record)
+        self._encoded_snapshot = None
         
-        self.socketio.emit('log_update', log_entry)
+        if self.has_clients():
+            self.broadcast('log_update', _log_entry(record))
 
     def start_training_session(self, model_name, total_epochs, dataset_size, batch_size):
         """Initialize a new training session"""
+        model_name = str(model_name)
+        total_epochs, dataset_size, batch_size = int(total_epochs), int(dataset_size), int(batch_size)
+        if batch_size <= 0:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        if total_epochs < 0 or dataset_size < 0:
+            raise ValueError("total_epochs and dataset_size must not be negative")
+        # One clock read shared by the reset and its log lines
+        now = time.time()
+        self._tx_queue.put(('session', model_name, total_epochs, dataset_size, batch_size, now))
+        
+        self.add_log(f"Starting training session for {model_name}", timestamp=now)
+        self.add_log(f"Total epochs: {total_epochs}, Dataset size: {dataset_size}, Batch size: {batch_size}",
+                     timestamp=now)
+
+    def _reset_session(self, model_name, total_epochs, dataset_size, batch_size, start_time):
         self.training_data.update({
             'status': 'starting',
             'model_name': model_name,
@@ -127,23 +528,23 @@ class TrainingMonitor:
             'batch_size': batch_size,
             'current_epoch': 0,
             'current_step': 0,
-            'total_steps': (dataset_size // batch_size) * total_epochs,
-            'start_time': time.time(),
-            'logs': [],
-            'metrics_history': {
-                'loss': [],
-                'learning_rate': [],
-                'timestamps': []
-            }
+            # A last partial batch is still a step
+            'total_steps': -(-dataset_size // batch_size) * total_epochs,
+            'start_time': start_time,
+            'logs': deque(maxlen=HISTORY_LENGTH),
+            'metrics_history': _new_history(),
+            'coarse_history': _new_coarse_history()
         })
-        
-        self.add_log(f"Starting training session for {model_name}")
-        self.add_log(f"Total epochs: {total_epochs}, Dataset size: {dataset_size}, Batch size: {batch_size}")
+        total_steps = self.training_data['total_steps']
+        # About HISTORY_LENGTH coarse points span the whole run
+        self._coarse_interval = -(-total_steps // HISTORY_LENGTH) if total_steps > 0 else None
+        self._coarse_step = None
 
     def finish_training_session(self):
         """Mark training as completed"""
-        self.update_training_status('completed')
-        self.add_log("Training session completed!")
+        now = time.time()
+        self._record_status('completed', {}, now)
+        self.add_log("Training session completed!", timestamp=now)
 
     def run(self, debug=False, open_browser=True):
         """Run the training monitor server"""
@@ -155,8 +556,64 @@ class TrainingMonitor:
             
             threading.Thread(target=open_browser_delayed, daemon=True).start()
         
-        self.logger.info(f"Starting training monitor on http://localhost:{self.port}")
-        self.socketio.run(self.app, host='0.0.0.0', port=self.port, debug=debug, allow_unsafe_werkzeug=True)
+        self.start_consumer()
+        self.logger.info("Starting training monitor on http://localhost:%d", self.port)
+        if ASYNC_MODE == 'threading':
+            # Werkzeug's threaded dev server is the only option without gevent
+            self.socketio.run(self.app, host='0.0.0.0', port=self.port, debug=debug,
+                              allow_unsafe_werkzeug=True)
+        else:
+            self.socketio.run(self.app, host='0.0.0.0', port=self.port, debug=debug,
+                              **GEVENT_SERVER_OPTIONS)
+
+def _status_fields(status, kwargs):
+    if not isinstance(status, str):
+        raise TypeError(f"status must be a string, not {type(status).__name__}")
+    # Unknown fields are ignored, as they always were
+    return {key: STATUS_FIELDS[key](value) for key, value in kwargs.items() if key in STATUS_FIELDS}
+
+def _log_entry(record):
+    timestamp, level, message = record
+    return {'timestamp': timestamp, 'level': level, 'message': message}
+
+def _metric_frame(delta):
+    """Pack a delta as a metric_frame, or None if it does not fit the layout"""
+    if not delta.keys() <= FRAME_DELTA_KEYS:
+        return None
+    loss_points = delta.get('loss_points', ())
+    learning_rate_points = delta.get('learning_rate_points', ())
+    # Records pair each loss with a learning rate
+    if len(loss_points) != len(learning_rate_points):
+        return None
+    nan = float('nan')
+    try:
+        header = METRIC_FRAME_HEADER.pack(delta['seq'], *(delta.get(key, nan) for key in FRAME_FIELDS))
+        return header + b''.join(
+            METRIC_FRAME_POINT.pack(loss, learning_rate, timestamp)
+            for (loss, timestamp), learning_rate in zip(loss_points, learning_rate_points)
+        )
+    except struct.error:
+        # A value that is not a number
+        return None
+
+def _new_history():
+    # Bounded deques rather than numpy ring buffers: at 100 points a deque
+    # append is ~3x cheaper than an indexed array store, list() beats
+    # concatenate().tolist() for every snapshot, and the values the trainer
+    # passes are sent back unchanged instead of rounded to float32
+    return {
+        'loss': deque(maxlen=HISTORY_LENGTH),
+        'learning_rate': deque(maxlen=HISTORY_LENGTH),
+        'timestamps': deque(maxlen=HISTORY_LENGTH)
+    }
+
+def _new_coarse_history():
+    # Long-range view: loss at power-of-two steps and every _coarse_interval
+    # steps, so memory stays bounded however long the run
+    return {
+        'loss': deque(maxlen=HISTORY_LENGTH),
+        'timestamps': deque(maxlen=HISTORY_LENGTH)
+    }
 
 # Global monitor instance
 monitor = TrainingMonitor()
@@ -170,5 +627,62 @@ def start_monitor(port=5000, open_browser=True):
     thread.start()
     return monitor
 
+class MonitorClient:
+    """TrainingMonitor interface for a monitor running in a separate process
+    
+    Calls are forwarded over HTTP, so the trainer and the monitor's
+    SocketIO handlers never share a GIL.
+    """
+    
+    def __init__(self, port=5000):
+        self.base_url = f"http://localhost:{port}"
+        self._http = requests.Session()
+    
+    def wait_until_ready(self, timeout=10):
+        """Poll /api/status until the monitor answers; True if it came up in time"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if self._http.get(f"{self.base_url}/api/status", timeout=1).ok:
+                    return True
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        return False
+    
+    def _post(self, path, payload):
+        try:
+            self._http.post(f"{self.base_url}{path}", json=payload, timeout=2)
+        except requests.RequestException:
+            # The monitor is only a viewer; a dropped update must not stop training
+            pass
+    
+    def update_training_status(self, status, **kwargs):
+        self._post('/api/update', {'status': status, **kwargs})
+    
+    def push_many(self, events):
+        # One POST for the whole batch; tuples travel as JSON arrays
+        self._post('/api/batch', list(events))
+    
+    def add_log(self, message, level='info', timestamp=None):
+        self._post('/api/log', {'message': message, 'level': level, 'timestamp': timestamp})
+    
+    def start_training_session(self, model_name, total_epochs, dataset_size, batch_size):
+        self._post('/api/session', {'model_name': model_name, 'total_epochs': total_epochs,
+                                    'dataset_size': dataset_size, 'batch_size': batch_size})
+    
+    def finish_training_session(self):
+        self._post('/api/finish', {})
+
 if __name__ == "__main__":
-    monitor.run(debug=True)
+    parser = argparse.ArgumentParser(description="Real-time training monitor")
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--flush-interval', type=float, default=0.1,
+                        help="seconds between status broadcasts")
+    parser.add_argument('--no-browser', action='store_true', help="don't open a browser window")
+    parser.add_argument('--no-debug', action='store_true', help="disable the Flask debugger and reloader")
+    args = parser.parse_args()
+    
+    monitor.port = args.port
+    monitor.flush_interval = args.flush_interval
+    monitor.run(debug=not args.no_debug, open_browser=not args.no_browser)